@@ -61,16 +61,28 @@ class ComfyClient:
             print(f"Error getting image: {e}")
             return None
 
-    def generate_image(self, workflow):
+    def generate_image(self, workflow, cancel_event=None):
         """
         Full generation loop: Queue -> Wait -> Download
         Returns a list of image bytes.
+
+        cancel_event: optional threading.Event; when set, the wait for
+        completion and the image downloads are abandoned and None is returned.
         """
+        def cancelled():
+            return cancel_event is not None and cancel_event.is_set()
+
         if not self.ws:
             if not self.connect():
                 return None
+        if cancel_event is not None:
+            # Wake up periodically so a cancel request is noticed promptly
+            self.ws.settimeout(0.5)
 
         # Queue Prompt
+        if cancelled():
+            self.disconnect()
+            return None
         response = self.queue_prompt(workflow)
         if not response:
             return None
@@ -80,6 +92,9 @@ class ComfyClient:
         
         # Wait for completion
         while True:
+            if cancelled():
+                self.disconnect()
+                return None
             try:
                 out = self.ws.recv()
                 if isinstance(out, str):
@@ -88,6 +103,8 @@ class ComfyClient:
                         data = message['data']
                         if data['node'] is None and data['prompt_id'] == prompt_id:
                             break # Execution is done
+            except websocket.WebSocketTimeoutException:
+                continue
             except Exception as e:
                 print(f"WebSocket receive error: {e}")
                 break
@@ -104,6 +121,8 @@ class ComfyClient:
             node_output = history['outputs'][node_id]
             if 'images' in node_output:
                 for image in node_output['images']:
+                    if cancelled():
+                        return None
                     image_data = self.get_image(image['filename'], image['subfolder'], image['type'])
                     if image_data:
                         images_output.append(image_data)
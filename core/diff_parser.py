@@ -17,6 +17,101 @@ from typing import Any
 from core.diff_engine import FileEdit, EditBatch
 from core.path_resolver import PathResolver
 
+# PATCH directives, matched per line of every :::PATCH::: block
+_PATCH_RANGE_RE = re.compile(r"L(\d+)\s*-\s*L(\d+):\s*(.*)")
+_PATCH_REPLACE_RE = re.compile(r"L(\d+):\s*(.+?)\s*(?:=>|->)\s*(.+)")
+_PATCH_LINE_RE = re.compile(r"L(\d+):\s*(.*)")
+_PATCH_LINE_START_RE = re.compile(r"\s*L\d+:")
+_PATCH_RANGE_START_RE = re.compile(r"\s*L\d+\s*-\s*L\d+:")
+
+
+def find_update_blocks(text: str) -> list[tuple[int, int, str, str]]:
+    """Locate :::UPDATE path::: ... :::END::: blocks with a linear scan.
+
+    Finds the same blocks as the non-greedy DOTALL regex this replaced, but
+    never backtracks on long or malformed responses.
+
+    Returns:
+        List of (start, end, path, content) tuples; start/end span the whole
+        block, path is stripped and content is raw.
+    """
+    blocks = []
+    pos = 0
+    n = len(text)
+    while True:
+        start = text.find(":::UPDATE", pos)
+        if start == -1:
+            break
+        path_start = start + 9
+
+        # Header ends at the first ':::' followed by whitespace containing a newline
+        content_start = -1
+        marker = text.find(":::", path_start)
+        while marker != -1:
+            i = marker + 3
+            last_newline = -1
+            while i < n and text[i].isspace():
+                if text[i] == "\n":
+                    last_newline = i
+                i += 1
+            if last_newline != -1:
+                content_start = last_newline + 1
+                break
+            marker = text.find(":::", marker + 1)
+        if content_start == -1:
+            break
+
+        close = text.find(":::", content_start)
+        if close == -1:
+            break
+        if text.startswith(":::END:::", close):
+            end = close + 9
+        elif text.startswith(":::END", close):
+            end = close + 6
+        else:
+            end = close + 3
+
+        blocks.append((start, end, text[path_start:marker].strip(), text[content_start:close]))
+        pos = end
+    return blocks
+
+
+def find_generate_image_blocks(text: str) -> list[str]:
+    """Return the bodies of :::GENERATE_IMAGE::: ... :::END::: blocks with a linear scan.
+
+    A body starts on the line after the header and runs to the next ':::'
+    with trailing whitespace trimmed, as with the lazy DOTALL regex this
+    replaced. Headers not followed by a newline are skipped.
+    """
+    header = ":::GENERATE_IMAGE:::"
+    bodies = []
+    pos = 0
+    n = len(text)
+    while True:
+        start = text.find(header, pos)
+        if start == -1:
+            break
+        i = pos = start + len(header)
+        last_newline = -1
+        while i < n and text[i].isspace():
+            if text[i] == "\n":
+                last_newline = i
+            i += 1
+        if last_newline == -1:
+            continue
+
+        close = text.find(":::", last_newline + 1)
+        if close == -1:
+            break
+        bodies.append(text[last_newline + 1:close].rstrip())
+        if text.startswith(":::END:::", close):
+            pos = close + 9
+        elif text.startswith(":::END", close):
+            pos = close + 6
+        else:
+            pos = close + 3
+    return bodies
+
 
 class DiffParser:
     """Unified parser for all diff/patch formats.
@@ -50,13 +145,19 @@ class DiffParser:
         """
         all_edits: list[FileEdit] = []
         
-        # Parse each format (order matters - more specific first)
-        all_edits.extend(self._parse_update_blocks(response, active_file))
-        all_edits.extend(self._parse_patch_blocks(response, active_file))
-        all_edits.extend(self._parse_unified_diffs(response, active_file))
+        # Parse each format (order matters - more specific first). Each one
+        # needs a literal marker, so a substring check skips the regex scans
+        # on responses that cannot contain it.
+        has_directive = ":::" in response
+        has_fence = "```" in response
+        if has_directive:
+            all_edits.extend(self._parse_update_blocks(response, active_file))
+            all_edits.extend(self._parse_patch_blocks(response, active_file))
+        if has_fence and "```diff" in response:
+            all_edits.extend(self._parse_unified_diffs(response, active_file))
         
         # Fallback: parse code blocks only if no explicit edits found
-        if not all_edits and active_file:
+        if not all_edits and active_file and has_fence:
             all_edits.extend(self._parse_fallback_code_blocks(response, active_file))
         
         # Deduplicate by (path, content) pairs
@@ -149,11 +250,8 @@ class DiffParser:
         Returns:
             List of FileEdit objects
         """
-        pattern = r":::UPDATE\s*(.*?)\s*:::\s*\n(.*?)\s*(?::::END:::|:::END|:::)"
-        matches = re.findall(pattern, response, re.DOTALL)
-        
         edits = []
-        for raw_path, content in matches:
+        for _, _, raw_path, content in find_update_blocks(response):
             path = self.path_resolver.normalize_path(raw_path.strip(), active_file)
             content = content.strip().replace('\\n', '\n')
             
@@ -412,7 +510,7 @@ class DiffParser:
                 continue
             
             # Range replacement: L10-L15:
-            m_range = re.match(r"L(\d+)\s*-\s*L(\d+):\s*(.*)", line)
+            m_range = _PATCH_RANGE_RE.match(line)
             if m_range:
                 start_no = int(m_range.group(1))
                 end_no = int(m_range.group(2))
@@ -425,7 +523,7 @@ class DiffParser:
                 # Capture subsequent lines
                 while i < len(raw_lines):
                     peek = raw_lines[i]
-                    if re.match(r"\s*L\d+:", peek):
+                    if _PATCH_LINE_START_RE.match(peek):
                         break
                     repl_lines.append(peek)
                     i += 1
@@ -442,7 +540,7 @@ class DiffParser:
                 continue
             
             # Line replacement: L42: old => new
-            m = re.match(r"L(\d+):\s*(.+?)\s*(?:=>|->)\s*(.+)", line)
+            m = _PATCH_REPLACE_RE.match(line)
             if m:
                 line_no = int(m.group(1))
                 old_text = m.group(2)
@@ -458,7 +556,7 @@ class DiffParser:
                 continue
             
             # Simple replacement: L42: new text
-            m2 = re.match(r"L(\d+):\s*(.*)", line)
+            m2 = _PATCH_LINE_RE.match(line)
             if m2:
                 line_no = int(m2.group(1))
                 first_line = m2.group(2).strip()
@@ -470,9 +568,9 @@ class DiffParser:
                 # Capture subsequent lines
                 while i < len(raw_lines):
                     peek = raw_lines[i]
-                    if re.match(r"\s*L\d+:", peek):
+                    if _PATCH_LINE_START_RE.match(peek):
                         break
-                    if re.match(r"\s*L\d+\s*-\s*L\d+:", peek):
+                    if _PATCH_RANGE_START_RE.match(peek):
                         break
                     new_lines.append(peek.rstrip())
                     i += 1
@@ -18,6 +18,8 @@ class LMStudioProvider(LLMProvider):
             base_url: Base URL of LM Studio service
         """
         self.base_url = base_url.rstrip("/")
+        # Providers are reused across turns; keep the HTTP connection alive between them
+        self.session = requests.Session()
 
     def chat(self, messages, model="local-model"):
         """Send chat message to LM Studio.
@@ -74,7 +76,7 @@ class LMStudioProvider(LLMProvider):
             "max_tokens": 1024,
         }
         try:
-            response = requests.post(
+            response = self.session.post(
                 url,
                 json=payload,
                 headers={"Content-Type": "application/json"},
@@ -143,7 +145,7 @@ class LMStudioProvider(LLMProvider):
         """
         try:
             url = f"{self.base_url}/v1/models"
-            response = requests.get(url)
+            response = self.session.get(url)
             response.raise_for_status()
             data = response.json()
             # Expected shape: {"data": [{"id": "...", ...}, ...]}
@@ -169,7 +171,7 @@ class LMStudioProvider(LLMProvider):
         """
         try:
             url = f"{self.base_url}/v1/models"
-            response = requests.get(url, timeout=5)
+            response = self.session.get(url, timeout=5)
             response.raise_for_status()
             data = response.json()
             
@@ -199,7 +201,7 @@ class LMStudioProvider(LLMProvider):
             return False
         try:
             url = f"{self.base_url}/v1/models"
-            response = requests.get(url)
+            response = self.session.get(url)
             response.raise_for_status()
             data = response.json()
             for m in data.get('data', []):
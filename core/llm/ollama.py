@@ -7,9 +7,8 @@ from .base import LLMProvider
 class OllamaProvider(LLMProvider):
     """Provider for local Ollama models."""
     
-    # Ollama library has streaming capability via chat(stream=True)
-    # Currently set to False - will enable in Phase 2 of streaming implementation
-    supports_streaming = False
+    # Streams tokens via the Ollama library's chat(stream=True)
+    supports_streaming = True
     
     def __init__(self, base_url="http://localhost:11434"):
         """Initialize Ollama provider.
@@ -67,6 +66,44 @@ class OllamaProvider(LLMProvider):
             traceback.print_exc()
             return f"Error: {e}"
 
+    def chat_stream(self, messages, model="llama3", progress_callback=None):
+        """Stream a chat response from Ollama token by token.
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            model: Model name
+            progress_callback: Optional callable receiving progress events
+            
+        Yields:
+            Response text fragments as they are generated
+        """
+        def emit(phase, detail=None):
+            if progress_callback:
+                try:
+                    progress_callback({"phase": phase, "detail": detail})
+                except Exception:
+                    pass
+
+        try:
+            emit("connecting", str(self.client._client.base_url))
+            stream = self.client.chat(model=model, messages=messages, stream=True)
+            emit("receiving")
+            for part in stream:
+                message = part.get('message') if isinstance(part, dict) else getattr(part, 'message', None)
+                if isinstance(message, dict):
+                    content = message.get('content')
+                else:
+                    content = getattr(message, 'content', None)
+                if content:
+                    yield content
+            emit("complete")
+        except ollama.ResponseError as e:
+            emit("error", e.error)
+            yield f"Error: {e.error}"
+        except Exception as e:
+            emit("error", str(e))
+            yield f"Error: {e}"
+
     def list_models(self):
         """List available Ollama models.
         
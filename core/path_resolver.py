@@ -8,6 +8,8 @@ import os
 import re
 from pathlib import Path
 
+_LINE_MARKER_RE = re.compile(r"\s+L\d+:")
+
 
 class PathResolver:
     """Centralized path normalization and resolution service.
@@ -71,7 +73,7 @@ class PathResolver:
             path = path.splitlines()[0].strip()
         
         # Remove line markers like " L12:"
-        path = re.split(r"\s+L\d+:", path)[0].strip()
+        path = _LINE_MARKER_RE.split(path)[0].strip()
         
         # Remove stray block terminators
         for marker in (":::END:::", ":::END", ":::"):
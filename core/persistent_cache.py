@@ -0,0 +1,119 @@
+"""SQLite store that lets response and embedding caches survive restarts."""
+
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+
+# Rows kept per table; the oldest are pruned when the database is opened
+PERSISTENT_CACHE_MAX_ROWS = 5000
+
+
+def default_cache_path() -> Path:
+    """Global cache database in the user's home, next to the custom dictionary."""
+    return Path.home() / ".inkwell" / "cache.db"
+
+
+class PersistentCache:
+    """Write-through backing store for ResponseCache and RAG query embeddings.
+
+    The database is opened lazily on first use. Any SQLite error disables the
+    store for the rest of the session, so the in-memory caches keep working.
+    """
+
+    def __init__(self, db_path=None, max_rows=PERSISTENT_CACHE_MAX_ROWS):
+        self.db_path = Path(db_path) if db_path else default_cache_path()
+        self.max_rows = max_rows
+        self._conn = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or self._failed:
+            return self._conn
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS chat_cache (key TEXT PRIMARY KEY, response TEXT, ts REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS embedding_cache (key TEXT PRIMARY KEY, embedding BLOB, ts REAL)")
+            for table in ("chat_cache", "embedding_cache"):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE key NOT IN "
+                    f"(SELECT key FROM {table} ORDER BY ts DESC LIMIT ?)",
+                    (self.max_rows,),
+                )
+            conn.commit()
+            self._conn = conn
+        except (sqlite3.Error, OSError) as e:
+            print(f"DEBUG: Persistent cache disabled ({self.db_path}): {e}")
+            self._failed = True
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple = (), fetch: bool = False):
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            try:
+                cursor = conn.execute(sql, params)
+                if fetch:
+                    return cursor.fetchone()
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"DEBUG: Persistent cache error: {e}")
+                self._failed = True
+                self._conn = None
+                conn.close()
+            return None
+
+    def get_response(self, key: str, max_age: float) -> Optional[str]:
+        """Return a stored response newer than max_age seconds, or None."""
+        row = self._execute(
+            "SELECT response FROM chat_cache WHERE key = ? AND ts > ?",
+            (key, time.time() - max_age),
+            fetch=True,
+        )
+        return row[0] if row else None
+
+    def set_response(self, key: str, response: str):
+        """Store or refresh a response."""
+        self._execute(
+            "INSERT OR REPLACE INTO chat_cache (key, response, ts) VALUES (?, ?, ?)",
+            (key, response, time.time()),
+        )
+
+    def clear_responses(self):
+        """Drop all stored responses."""
+        self._execute("DELETE FROM chat_cache")
+
+    def get_embedding(self, key: str) -> Optional[List[float]]:
+        """Return a stored embedding, or None."""
+        row = self._execute("SELECT embedding FROM embedding_cache WHERE key = ?", (key,), fetch=True)
+        if not row:
+            return None
+        vector = array("f")
+        vector.frombytes(row[0])
+        return vector.tolist()
+
+    def set_embedding(self, key: str, vector: Sequence[float]):
+        """Store an embedding as raw float32 bytes."""
+        self._execute(
+            "INSERT OR REPLACE INTO embedding_cache (key, embedding, ts) VALUES (?, ?, ?)",
+            (key, array("f", vector).tobytes(), time.time()),
+        )
+
+    def clear_embeddings(self):
+        """Drop all stored embeddings."""
+        self._execute("DELETE FROM embedding_cache")
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
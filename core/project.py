@@ -1,13 +1,38 @@
 import os
 import base64
+import hashlib
 import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from core.system_prompts import SystemPromptsManager
 
+# Recently read files kept in memory, keyed on (path, mtime_ns, size)
+FILE_READ_CACHE_SIZE = 64
+# Base64-encoded images for vision requests; entries can be megabytes each
+IMAGE_BASE64_CACHE_SIZE = 16
+
+
+@lru_cache(maxsize=8)
+def project_settings_key(path: str) -> str:
+    """Short opaque key for per-project entries in QSettings."""
+    return hashlib.blake2b(path.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def legacy_project_settings_key(path: str) -> str:
+    """Key that older versions stored per-project settings under."""
+    return hashlib.md5(path.encode()).hexdigest()
+
+
 class ProjectManager:
     def __init__(self, assets_folder: str = "assets"):
         self.root_path = None
         self.tool_config = {}
         self.system_prompts_manager = SystemPromptsManager(assets_folder)
+        self._file_read_cache = OrderedDict()  # full_path -> ((mtime_ns, size), content)
+        self._file_read_lock = threading.Lock()  # read_file is also called from worker threads
+        self._image_base64_cache = OrderedDict()  # full_path -> ((mtime_ns, size), base64 text)
+        self._structure_cache = None  # (root, {dir: mtime_ns}, structure text)
 
     def open_project(self, path):
         """Sets the root path for the project."""
@@ -256,12 +281,26 @@ class ProjectManager:
             full_path = path
             
         try:
+            st = os.stat(full_path)
+            stamp = (st.st_mtime_ns, st.st_size)
+            with self._file_read_lock:
+                cached = self._file_read_cache.get(full_path)
+                if cached is not None and cached[0] == stamp:
+                    self._file_read_cache.move_to_end(full_path)
+                    return cached[1]
             with open(full_path, 'r', encoding='utf-8') as f:
-                return f.read()
+                content = f.read()
         except Exception as e:
             print(f"Error reading file {full_path}: {e}")
             return None
 
+        with self._file_read_lock:
+            self._file_read_cache[full_path] = (stamp, content)
+            self._file_read_cache.move_to_end(full_path)
+            if len(self._file_read_cache) > FILE_READ_CACHE_SIZE:
+                self._file_read_cache.popitem(last=False)
+        return content
+
     def save_file(self, path, content):
         """Saves content to a file. Path can be absolute or relative to root."""
         if not self.root_path:
@@ -272,6 +311,8 @@ class ProjectManager:
         else:
             full_path = path
 
+        with self._file_read_lock:
+            self._file_read_cache.pop(full_path, None)
         try:
             with open(full_path, 'w', encoding='utf-8') as f:
                 f.write(content)
@@ -281,16 +322,34 @@ class ProjectManager:
             return False
 
     def get_project_structure(self):
-        """Returns a string representation of the project file structure."""
+        """Returns a string representation of the project file structure.
+
+        The listing is reused while no directory's mtime has changed; adding,
+        removing or renaming an entry updates its parent directory's mtime,
+        so checking costs one stat per directory instead of a full walk.
+        """
         if not self.root_path:
             return "No project opened."
-            
+
+        cached = self._structure_cache
+        if cached is not None and cached[0] == self.root_path:
+            try:
+                if all(os.stat(d).st_mtime_ns == mtime for d, mtime in cached[1].items()):
+                    return cached[2]
+            except OSError:
+                pass  # A directory went away; rebuild
+
         structure = []
+        dir_mtimes = {}
         ignore_dirs = {'.git', '.idea', '__pycache__', 'venv', 'node_modules', '.gemini', '.debug', '.inkwell_rag', '.venv'}
         
         for root, dirs, files in os.walk(self.root_path):
             # Modify dirs in-place to exclude ignored
             dirs[:] = [d for d in dirs if d not in ignore_dirs]
+            try:
+                dir_mtimes[root] = os.stat(root).st_mtime_ns
+            except OSError:
+                pass
             
             level = root.replace(self.root_path, '').count(os.sep)
             indent = '  ' * level
@@ -302,11 +361,17 @@ class ProjectManager:
             subindent = '  ' * (level + 1)
             for f in files:
                 structure.append(f"{subindent}{f}")
-                
-        return "\n".join(structure)
+
+        text = "\n".join(structure)
+        self._structure_cache = (self.root_path, dir_mtimes, text)
+        return text
 
     def get_image_base64(self, path):
-        """Reads an image file and returns base64 encoded string."""
+        """Reads an image file and returns base64 encoded string.
+
+        Encodings are reused until the file's mtime or size changes, so images
+        attached to every chat turn are only read once.
+        """
         if not self.root_path:
             return None
             
@@ -315,16 +380,29 @@ class ProjectManager:
         else:
             full_path = path
 
-        if not os.path.exists(full_path):
+        try:
+            st = os.stat(full_path)
+        except OSError:
             return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._image_base64_cache.get(full_path)
+        if cached is not None and cached[0] == stamp:
+            self._image_base64_cache.move_to_end(full_path)
+            return cached[1]
 
         try:
             with open(full_path, "rb") as image_file:
-                return base64.b64encode(image_file.read()).decode('utf-8')
+                encoded = base64.b64encode(image_file.read()).decode('utf-8')
         except Exception as e:
             print(f"Error reading image {full_path}: {e}")
             return None
 
+        self._image_base64_cache[full_path] = (stamp, encoded)
+        self._image_base64_cache.move_to_end(full_path)
+        if len(self._image_base64_cache) > IMAGE_BASE64_CACHE_SIZE:
+            self._image_base64_cache.popitem(last=False)
+        return encoded
+
     def find_images_in_text(self, text, max_images=10):
         """
         Scans project for images and returns paths of images mentioned in the text.
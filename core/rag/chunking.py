@@ -12,6 +12,11 @@ DEFAULT_CHUNK_TOKENS = 500
 MAX_CHUNK_TOKENS = 1500
 CHUNK_OVERLAP_TOKENS = 50
 
+_YAML_FRONTMATTER_RE = re.compile(r'^---\n(.*?)\n---\n(.*)', re.DOTALL)
+_TOML_FRONTMATTER_RE = re.compile(r'^\+\+\+\n(.*?)\n\+\+\+\n(.*)', re.DOTALL)
+_HEADING_RE = re.compile(r'^(#{1,6})\s+(.+)$')
+_CODE_FENCE_RE = re.compile(r'^```(\w*)')
+
 
 class MarkdownChunker:
     """Intelligent chunker for Markdown documents."""
@@ -30,18 +35,18 @@ class MarkdownChunker:
     def _extract_frontmatter(self, text: str) -> Tuple[Optional[str], str]:
         """Extract YAML/TOML frontmatter if present. Returns (frontmatter, remaining_text)."""
         if text.startswith('---'):
-            match = re.match(r'^---\n(.*?)\n---\n(.*)', text, re.DOTALL)
+            match = _YAML_FRONTMATTER_RE.match(text)
             if match:
                 return match.group(1), match.group(2)
         elif text.startswith('+++'):
-            match = re.match(r'^\+\+\+\n(.*?)\n\+\+\+\n(.*)', text, re.DOTALL)
+            match = _TOML_FRONTMATTER_RE.match(text)
             if match:
                 return match.group(1), match.group(2)
         return None, text
     
     def _is_heading(self, line: str) -> Tuple[bool, int, str]:
         """Check if line is a heading. Returns (is_heading, level, text)."""
-        match = re.match(r'^(#{1,6})\s+(.+)$', line)
+        match = _HEADING_RE.match(line)
         if match:
             level = len(match.group(1))
             text = match.group(2).strip()
@@ -50,7 +55,7 @@ class MarkdownChunker:
     
     def _is_code_fence(self, line: str) -> Tuple[bool, str]:
         """Check if line starts a code fence. Returns (is_fence, language)."""
-        match = re.match(r'^```(\w*)', line)
+        match = _CODE_FENCE_RE.match(line)
         if match:
             return True, match.group(1) or "text"
         return False, ""
@@ -1,8 +1,13 @@
 """Main RAG engine orchestrating search and retrieval."""
 
+import hashlib
 import os
+import threading
 import time
+from collections import OrderedDict
+
 import chromadb
+from chromadb.utils import embedding_functions
 from typing import List, Tuple, Optional, Dict
 
 from .metadata import ChunkMetadata
@@ -22,6 +27,9 @@ FILE_RECENCY_WEIGHT = 0.15
 RECENCY_FULL_SECONDS = 6 * 3600
 RECENCY_ZERO_SECONDS = 30 * 24 * 3600
 
+# Query embeddings kept for repeated/retried questions
+EMBED_CACHE_SIZE = 1024
+
 # Directories to exclude from indexing and querying
 EXCLUDED_DIRS = {".inkwell_rag", ".debug", ".git", "node_modules", "__pycache__", "venv", ".venv"}
 
@@ -34,8 +42,13 @@ class RAGEngine:
         # Initialize Client
         self.client = chromadb.PersistentClient(path=self.db_path)
         
+        # Embedding function for the collection, reused by embed() for ad-hoc text
+        self._embedder = embedding_functions.DefaultEmbeddingFunction()
+
         # Create or get collection
-        self.collection = self.client.get_or_create_collection(name="project_docs")
+        self.collection = self.client.get_or_create_collection(
+            name="project_docs", embedding_function=self._embedder
+        )
         
         # Cache of indexed file mtimes for status tracking
         self._indexed_files = {}  # path -> mtime
@@ -59,6 +72,13 @@ class RAGEngine:
         # Track recency for context prioritization
         self._file_access_times = {}  # source -> timestamp of last query result inclusion
 
+        # Bumped whenever indexed content changes, so callers can key caches on it
+        self.index_version = 0
+
+        self._query_embed_cache = OrderedDict()  # blake2b(text) -> embedding
+        self._embed_lock = threading.Lock()  # embed() is also called from worker threads
+        self.embedding_store = None  # optional PersistentCache shared across sessions
+
     def _should_exclude_file(self, file_path: str) -> bool:
         """Check if a file path should be excluded from RAG.
         
@@ -138,8 +158,12 @@ class RAGEngine:
         
         return recency_bonus
 
-    def index_file(self, file_path, content, invalidate_cache=True):
-        """Indexes a single file using Markdown-aware chunking."""
+    def index_file(self, file_path, content, invalidate_cache=True, update_bm25=True):
+        """Indexes a single file using Markdown-aware chunking.
+
+        Bulk callers pass update_bm25=False and call _rebuild_bm25() once at
+        the end, since rebuilding reads back the whole collection.
+        """
         if not content:
             return
 
@@ -166,12 +190,11 @@ class RAGEngine:
             ids=ids
         )
         
-        # Update BM25 index with all documents
-        all_docs = self.collection.get()
-        if all_docs['documents']:
-            self._all_chunks = list(zip(all_docs['ids'], all_docs['documents']))
-            self.bm25.index(all_docs['documents'])
+        if update_bm25:
+            self._rebuild_bm25()
         
+        self.index_version += 1
+
         # Invalidate cache for this file (unless bulk indexing)
         if invalidate_cache:
             self.query_cache.invalidate_file(file_path)
@@ -208,7 +231,7 @@ class RAGEngine:
         # If hybrid search is disabled or BM25 not ready, use semantic search only
         if not use_hybrid or not self._all_chunks:
             results = self.collection.query(
-                query_texts=[query_text],
+                query_embeddings=[self.embed(query_text)],
                 n_results=n_results * 2  # Get more to account for filtering
             )
             result_docs_raw = results['documents'][0] if results['documents'] else []
@@ -252,7 +275,7 @@ class RAGEngine:
         
         # 1. Get semantic results from Chroma
         semantic_results = self.collection.query(
-            query_texts=[query_text],
+            query_embeddings=[self.embed(query_text)],
             n_results=n_results * 2  # Get more results to re-rank
         )
         
@@ -435,6 +458,38 @@ class RAGEngine:
 
         return optimized_text, stats
 
+    def embed(self, text: str) -> List[float]:
+        """Embed text with the same model the collection uses for documents.
+
+        Results are cached, so a question that is retried, re-queried for
+        RAG and checked against the semantic response cache is embedded once.
+        """
+        # Embed exactly the text the key is made from, so equal keys mean equal vectors
+        normalized = text.strip()
+        key = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+        with self._embed_lock:
+            vector = self._query_embed_cache.get(key)
+            if vector is not None:
+                self._query_embed_cache.move_to_end(key)
+                return vector
+
+        # Persisted vectors are only valid for the same embedding model
+        store_key = None
+        if self.embedding_store is not None:
+            model = getattr(self._embedder, "model_name", None) or type(self._embedder).__name__
+            store_key = f"{model}:{key.hex()}"
+            vector = self.embedding_store.get_embedding(store_key)
+        if vector is None:
+            vector = [float(x) for x in self._embedder([normalized])[0]]
+            if store_key is not None:
+                self.embedding_store.set_embedding(store_key, vector)
+        with self._embed_lock:
+            self._query_embed_cache[key] = vector
+            self._query_embed_cache.move_to_end(key)
+            if len(self._query_embed_cache) > EMBED_CACHE_SIZE:
+                self._query_embed_cache.popitem(last=False)
+        return vector
+
     def get_file_index_status(self, file_path):
         """Get index status for a file.
         Returns: 'indexed', 'needs_reindex', 'not_indexed'
@@ -485,6 +540,7 @@ class RAGEngine:
                 self.bm25.index([doc for _, doc in self._all_chunks])
             
             # Clear cache since index changed
+            self.index_version += 1
             self.query_cache.invalidate_all()
             
             print(f"[RAG] Removed {len(excluded_ids)} chunks from excluded directories.")
@@ -517,28 +573,65 @@ class RAGEngine:
             if file_path in self._indexed_files:
                 del self._indexed_files[file_path]
             # Clear cache since index changed
+            self.index_version += 1
             self.query_cache.invalidate_file(file_path)
             print(f"[RAG] Removed {len(file_ids)} chunks for {file_path}")
     
-    def index_project(self):
-        """Walks the project and indexes all markdown files."""
-        # Invalidate entire cache for bulk reindexing
-        self.query_cache.invalidate_all()
-        
-        excluded_dirs = EXCLUDED_DIRS
+    def _rebuild_bm25(self):
+        """Rebuild the BM25 keyword index from everything in the collection."""
+        all_docs = self.collection.get()
+        if all_docs['documents']:
+            self._all_chunks = list(zip(all_docs['ids'], all_docs['documents']))
+            self.bm25.index(all_docs['documents'])
 
+    def indexable_files(self):
+        """Markdown/text files in the project, smallest first so progress moves early."""
+        found = []
         for root, dirs, files in os.walk(self.project_path):
             # Prune excluded directories to avoid descending into them
-            dirs[:] = [d for d in dirs if d not in excluded_dirs]
-            if any(excluded in root for excluded in excluded_dirs):
+            dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+            if any(excluded in root for excluded in EXCLUDED_DIRS):
                 continue
             for file in files:
                 if file.endswith((".md", ".txt")):
                     path = os.path.join(root, file)
                     try:
-                        with open(path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        # Don't invalidate cache individually during bulk indexing
-                        self.index_file(path, content, invalidate_cache=False)
-                    except Exception as e:
-                        print(f"[RAG] Error indexing {path}: {e}")
+                        size = os.path.getsize(path)
+                    except OSError:
+                        size = 0
+                    found.append((size, path))
+        found.sort()
+        return [path for _, path in found]
+
+    def index_project(self, progress_callback=None, stop_event=None):
+        """Walks the project and indexes all markdown files.
+
+        Args:
+            progress_callback: Optional callable(current, total, path), called
+                before each file
+            stop_event: Optional threading.Event; indexing stops after the
+                current file once it is set
+        """
+        # Invalidate entire cache for bulk reindexing
+        self.index_version += 1
+        self.query_cache.invalidate_all()
+
+        files = self.indexable_files()
+        total = len(files)
+        for current, path in enumerate(files, 1):
+            if stop_event is not None and stop_event.is_set():
+                return
+            if progress_callback:
+                progress_callback(current, total, path)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                # Don't invalidate cache or rebuild BM25 per file during bulk indexing
+                self.index_file(path, content, invalidate_cache=False, update_bm25=False)
+            except Exception as e:
+                print(f"[RAG] Error indexing {path}: {e}")
+
+        self._rebuild_bm25()
+        # Results cached while indexing ran only saw part of the project
+        self.query_cache.invalidate_all()
+        self.index_version += 1
@@ -0,0 +1,209 @@
+"""Caches for complete LLM chat responses (exact and semantic match)."""
+
+import hashlib
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+
+# Cache settings
+RESPONSE_CACHE_TTL_SECONDS = 3600  # 1 hour
+RESPONSE_CACHE_MAX_ENTRIES = 100
+
+# Semantic (approximate-match) tier
+SEMANTIC_CACHE_THRESHOLD = 0.93  # minimum cosine similarity for a hit
+SEMANTIC_CACHE_TABLES = 4        # independent LSH tables
+SEMANTIC_CACHE_BITS = 6          # hyperplanes (signature bits) per table
+
+
+class ResponseCache:
+    """LRU cache of chat responses with TTL, keyed on the full request.
+
+    A hit means the model, system prompt, history, retrieved context and
+    request options are all identical to an earlier turn, so the stored
+    answer can be shown without another LLM roundtrip. An optional
+    PersistentCache is consulted on memory misses and written through on set.
+    """
+
+    def __init__(self, ttl_seconds=RESPONSE_CACHE_TTL_SECONDS, max_entries=RESPONSE_CACHE_MAX_ENTRIES, store=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.store = store
+        self.cache = OrderedDict()  # {key: (response, timestamp)}
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model, system_prompt, history, context=None, **options) -> str:
+        """Hash everything that shapes the model's answer into a cache key."""
+        payload = (
+            model,
+            system_prompt,
+            [(m.get("role"), m.get("content")) for m in history],
+            context or [],
+            sorted((k, sorted(v) if isinstance(v, (set, frozenset)) else v) for k, v in options.items()),
+        )
+        return hashlib.blake2b(repr(payload).encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response, or None if missing or expired."""
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                response, timestamp = entry
+                if time.time() - timestamp <= self.ttl_seconds:
+                    self.cache.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return response
+                del self.cache[key]
+
+        response = self.store.get_response(key, self.ttl_seconds) if self.store else None
+        with self._lock:
+            if response is None:
+                self.stats["misses"] += 1
+                return None
+            self._remember(key, response)
+            self.stats["hits"] += 1
+            return response
+
+    def _remember(self, key: str, response: str):
+        self.cache[key] = (response, time.time())
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+    def set(self, key: str, response: str):
+        """Store a response, evicting the least recently used entry when full."""
+        with self._lock:
+            self._remember(key, response)
+        if self.store:
+            self.store.set_response(key, response)
+
+    def clear(self):
+        """Drop all cached responses, including persisted ones."""
+        with self._lock:
+            self.cache.clear()
+        if self.store:
+            self.store.clear_responses()
+
+    def get_stats(self) -> Dict:
+        """Return cache statistics."""
+        total = self.stats["hits"] + self.stats["misses"]
+        hit_rate = (self.stats["hits"] / total * 100) if total > 0 else 0
+        return {
+            "hits": self.stats["hits"],
+            "misses": self.stats["misses"],
+            "hit_rate": f"{hit_rate:.1f}%",
+            "cached_responses": len(self.cache),
+        }
+
+
+class SemanticResponseCache:
+    """Approximate-match tier that finds answers to reworded questions.
+
+    Query embeddings are bucketed by random-projection LSH signatures, one
+    bit per hyperplane, across a few independent tables. Bucket candidates
+    are confirmed with exact cosine similarity. Entries only match within
+    the same scope, a hash of everything in the request except the message.
+    """
+
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD, tables=SEMANTIC_CACHE_TABLES,
+                 bits=SEMANTIC_CACHE_BITS, ttl_seconds=RESPONSE_CACHE_TTL_SECONDS,
+                 max_entries=RESPONSE_CACHE_MAX_ENTRIES, seed=0):
+        self.threshold = threshold
+        self.tables = tables
+        self.bits = bits
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._rng = random.Random(seed)
+        self._planes = None  # built once the embedding dimension is known
+        self.entries = OrderedDict()  # {entry_id: (scope, signatures, unit_vector, response, timestamp)}
+        self.buckets = {}  # {(table, scope, signature): set(entry_id)}
+        self.stats = {"hits": 0, "misses": 0}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> Optional[List[float]]:
+        norm = math.sqrt(sum(x * x for x in vector))
+        if norm == 0:
+            return None
+        return [x / norm for x in vector]
+
+    def _signatures(self, unit: List[float]) -> List[int]:
+        if self._planes is None or len(self._planes[0][0]) != len(unit):
+            dim = len(unit)
+            self._planes = [
+                [[self._rng.gauss(0.0, 1.0) for _ in range(dim)] for _ in range(self.bits)]
+                for _ in range(self.tables)
+            ]
+            # Signatures from another dimension are meaningless
+            self.entries.clear()
+            self.buckets.clear()
+        signatures = []
+        for planes in self._planes:
+            sig = 0
+            for plane in planes:
+                sig = (sig << 1) | (sum(p * x for p, x in zip(plane, unit)) >= 0)
+            signatures.append(sig)
+        return signatures
+
+    def _remove(self, entry_id):
+        scope, signatures, _, _, _ = self.entries.pop(entry_id)
+        for table, sig in enumerate(signatures):
+            bucket = self.buckets.get((table, scope, sig))
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self.buckets[(table, scope, sig)]
+
+    def get(self, scope: str, vector: Sequence[float]) -> Optional[str]:
+        """Return the answer whose query is most similar to vector, if close enough."""
+        unit = self._normalize(vector)
+        with self._lock:
+            if unit is None or not self.entries:
+                self.stats["misses"] += 1
+                return None
+            now = time.time()
+            candidates = set()
+            for table, sig in enumerate(self._signatures(unit)):
+                candidates |= self.buckets.get((table, scope, sig), set())
+            best_id, best_sim = None, self.threshold
+            for entry_id in candidates:
+                _, _, other, _, timestamp = self.entries[entry_id]
+                if now - timestamp > self.ttl_seconds:
+                    self._remove(entry_id)
+                    continue
+                sim = sum(a * b for a, b in zip(unit, other))
+                if sim >= best_sim:
+                    best_id, best_sim = entry_id, sim
+            if best_id is None:
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(best_id)
+            self.stats["hits"] += 1
+            return self.entries[best_id][3]
+
+    def set(self, scope: str, vector: Sequence[float], response: str):
+        """Store a response under the query embedding, evicting the oldest when full."""
+        unit = self._normalize(vector)
+        if unit is None:
+            return
+        with self._lock:
+            signatures = self._signatures(unit)
+            entry_id = self._next_id
+            self._next_id += 1
+            self.entries[entry_id] = (scope, signatures, unit, response, time.time())
+            for table, sig in enumerate(signatures):
+                self.buckets.setdefault((table, scope, sig), set()).add(entry_id)
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+
+    def clear(self):
+        """Drop all cached responses."""
+        with self._lock:
+            self.entries.clear()
+            self.buckets.clear()
@@ -13,6 +13,7 @@ class SystemPromptsManager:
         """
         self.assets_folder = assets_folder
         self.prompts_folder = os.path.join(assets_folder, "SystemPrompts")
+        self._file_cache = {}  # filename -> ((mtime_ns, size), content)
         self._ensure_prompts_folder()
     
     def _ensure_prompts_folder(self):
@@ -31,19 +32,30 @@ class SystemPromptsManager:
         if not os.path.exists(self.prompts_folder):
             return prompts
         
+        # Files are only re-read when their mtime or size changes; this is
+        # consulted on every chat message via the active persona.
+        file_cache = {}
         try:
-            for filename in os.listdir(self.prompts_folder):
-                # Support .txt and .md files
-                if filename.endswith(('.txt', '.md')):
-                    file_path = os.path.join(self.prompts_folder, filename)
-                    
-                    # Skip directories
-                    if not os.path.isfile(file_path):
+            with os.scandir(self.prompts_folder) as entries:
+                for entry in entries:
+                    filename = entry.name
+                    # Support .txt and .md files
+                    if not filename.endswith(('.txt', '.md')):
                         continue
                     
                     try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read().strip()
+                        # Skip directories
+                        if not entry.is_file():
+                            continue
+                        st = entry.stat()
+                        sig = (st.st_mtime_ns, st.st_size)
+                        cached = self._file_cache.get(filename)
+                        if cached is not None and cached[0] == sig:
+                            content = cached[1]
+                        else:
+                            with open(entry.path, 'r', encoding='utf-8') as f:
+                                content = f.read().strip()
+                        file_cache[filename] = (sig, content)
                         
                         # Use filename without extension as the name
                         name = os.path.splitext(filename)[0]
@@ -54,6 +66,7 @@ class SystemPromptsManager:
         except Exception as e:
             print(f"WARN: Failed to read system prompts folder: {e}")
         
+        self._file_cache = file_cache
         return prompts
     
     def get_prompt(self, name: str) -> str | None:
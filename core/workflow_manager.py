@@ -2,6 +2,8 @@ import json
 import os
 import re
 
+PLACEHOLDER_RE = re.compile(r'%([A-Z_]+)%')
+
 class WorkflowManager:
     def __init__(self, assets_dir=None):
         if assets_dir is None:
@@ -10,10 +12,12 @@ class WorkflowManager:
         # Workflows are stored in assets_dir/workflows
         self.workflows_dir = os.path.join(assets_dir, "workflows")
         self.workflows = {} # name -> json_content
+        self._placeholder_cache = {} # name -> sorted placeholder list
         self.reload_workflows()
 
     def reload_workflows(self):
         self.workflows = {}
+        self._placeholder_cache = {}
         if not os.path.exists(self.workflows_dir):
             os.makedirs(self.workflows_dir)
             return
@@ -40,6 +44,10 @@ class WorkflowManager:
 
     def get_placeholders(self, name):
         """Extracts %PLACEHOLDERS% from the workflow."""
+        cached = self._placeholder_cache.get(name)
+        if cached is not None:
+            return list(cached)
+
         workflow = self.workflows.get(name)
         if not workflow:
             return []
@@ -47,8 +55,9 @@ class WorkflowManager:
         # Convert to string to search
         text = json.dumps(workflow)
         # Find all %WORD% patterns
-        matches = re.findall(r'%([A-Z_]+)%', text)
-        return sorted(list(set(matches)))
+        placeholders = sorted(set(PLACEHOLDER_RE.findall(text)))
+        self._placeholder_cache[name] = placeholders
+        return list(placeholders)
 
     def process_workflow(self, name, values):
         """
@@ -2,7 +2,7 @@ import html
 
 import markdown
 from PySide6 import QtGui
-from PySide6.QtCore import Signal, Qt, QSize, QRect, QPoint
+from PySide6.QtCore import Signal, Qt, QSize, QRect, QPoint, QTimer
 from PySide6.QtGui import QClipboard, QKeySequence, QFont, QShortcut
 from PySide6.QtWidgets import (
     QWidget,
@@ -110,6 +110,83 @@ class ChatBrowser(QTextBrowser):
             return
         super().setSource(url)
 
+
+# Streamed answers are redrawn at most this often
+STREAM_REDRAW_MS = 30
+
+_UPDATE_OPEN = ":::UPDATE"
+_BLOCK_END = ":::END:::"
+
+
+def _partial_marker_len(text, marker):
+    """Length of the longest suffix of text that is a prefix of marker."""
+    for n in range(min(len(marker) - 1, len(text)), 0, -1):
+        if text.endswith(marker[:n]):
+            return n
+    return 0
+
+
+class StreamPreview:
+    """Incrementally renders a streaming answer as HTML.
+
+    Chunks are scanned once as they arrive. Text outside :::UPDATE blocks is
+    shown as-is; a block's file content is skipped and replaced by a short
+    note, so a long rewrite never fills the chat while it is being written.
+    """
+
+    def __init__(self):
+        self.chunks = []  # everything received, joined once when the answer completes
+        self._pending = []  # chunks not scanned yet
+        self._html = []  # rendered fragments for the scanned part
+        self._tail = ""  # scanned text that may still start a marker
+        self._update_path = None  # path of the :::UPDATE block being streamed
+
+    def feed(self, chunk):
+        self.chunks.append(chunk)
+        self._pending.append(chunk)
+
+    def text(self):
+        return "".join(self.chunks)
+
+    def _scan(self):
+        text = self._tail + "".join(self._pending)
+        self._pending.clear()
+        while True:
+            if self._update_path is None:
+                start = text.find(_UPDATE_OPEN)
+                if start == -1:
+                    keep = _partial_marker_len(text, _UPDATE_OPEN)
+                    self._html.append(html.escape(text[:len(text) - keep]))
+                    text = text[len(text) - keep:]
+                    break
+                self._html.append(html.escape(text[:start]))
+                header_end = text.find(":::", start + len(_UPDATE_OPEN))
+                if header_end == -1:
+                    text = text[start:]  # wait for the rest of the header
+                    break
+                self._update_path = text[start + len(_UPDATE_OPEN):header_end].strip()
+                text = text[header_end + 3:]
+            else:
+                end = text.find(_BLOCK_END)
+                if end == -1:
+                    keep = _partial_marker_len(text, _BLOCK_END)
+                    text = text[len(text) - keep:]  # block content is not displayed
+                    break
+                self._html.append(f"<i>[Edit for {html.escape(self._update_path)}]</i>")
+                self._update_path = None
+                text = text[end + len(_BLOCK_END):]
+        self._tail = text
+
+    def render(self):
+        """HTML for everything received so far."""
+        self._scan()
+        parts = ['<div style="white-space: pre-wrap;">', "".join(self._html)]
+        # The unscanned tail is only ever a possible marker, so it is not shown yet
+        if self._update_path is not None:
+            parts.append(f"<i>[Writing {html.escape(self._update_path)}…]</i>")
+        parts.append("</div>")
+        return "".join(parts)
+
 class ChatWidget(QWidget):
     message_sent = Signal(str)
     link_clicked = Signal(str)
@@ -136,6 +213,7 @@ class ChatWidget(QWidget):
         super().__init__(parent)
         self.layout = QVBoxLayout(self)
         self.messages = []  # Store messages as (sender, text) tuples
+        self.settings = QSettings("InkwellAI", "InkwellAI")
         
         # Apply font settings
         self.apply_font_settings()
@@ -279,7 +357,9 @@ class ChatWidget(QWidget):
         self.thinking_title = "Assistant is thinking…"
         self.current_mode = "edit"  # Default mode: edit or ask
         self.streaming_response = False  # Track if we're currently streaming a response
-        self._streaming_buffer = ""  # Buffer for accumulating streaming chunks
+        self._stream = None  # StreamPreview for the answer being streamed
+        self._stream_cursor = None  # Selects the preview in the history document
+        self._stream_redraw_pending = False
         self.raw_view = False  # Track if raw view is active
         
         # Chat Control Buttons - Wrappable layout
@@ -402,7 +482,7 @@ class ChatWidget(QWidget):
     
     def apply_font_settings(self):
         """Apply font settings from QSettings to chat history and input."""
-        settings = QSettings("InkwellAI", "InkwellAI")
+        settings = self.settings
         font_family = settings.value("editor_font_family", "Monospace")
         font_size = int(settings.value("editor_font_size", 11))
         
@@ -645,7 +725,7 @@ class ChatWidget(QWidget):
         """Persist schema selection and emit signal."""
         sid = self.schema_combo.itemData(index)
         # Store in settings for controller/worker use
-        settings = QSettings("InkwellAI", "InkwellAI")
+        settings = self.settings
         settings.setValue("structured_schema_id", sid or "None")
         self.schema_changed.emit(sid or "None")
         self._update_structured_indicator()
@@ -681,7 +761,7 @@ class ChatWidget(QWidget):
             self.schema_combo.addItem(label, sid)
 
         # Restore previous selection from settings
-        settings = QSettings("InkwellAI", "InkwellAI")
+        settings = self.settings
         saved = settings.value("structured_schema_id", "None")
         # Find index by data
         for i in range(self.schema_combo.count()):
@@ -692,7 +772,7 @@ class ChatWidget(QWidget):
         self.schema_combo.blockSignals(False)
 
     def _update_structured_indicator(self):
-        settings = QSettings("InkwellAI", "InkwellAI")
+        settings = self.settings
         enabled = bool(settings.value("structured_enabled", False, type=bool))
         sid = settings.value("structured_schema_id", "None")
         if enabled and sid and sid != "None":
@@ -845,6 +925,7 @@ class ChatWidget(QWidget):
     def rebuild_chat_display(self):
         """Rebuild the entire chat display from stored messages."""
         self.history.clear()
+        self._stream_cursor = None  # The preview is redrawn at the end on the next chunk
         temp_messages = list(self.messages)
         self.messages.clear()
         for msg_tuple in temp_messages:
@@ -1084,20 +1165,20 @@ class ChatWidget(QWidget):
                 cursor.deletePreviousChar()
 
     def begin_streaming_response(self):
-        """Prepare to accumulate a streaming response in a buffer.
+        """Start showing a streaming response as its chunks arrive.
         
-        Don't add anything to the chat display yet - just initialize the buffer.
-        The complete message will be added when streaming finishes.
+        The preview is redrawn at most every STREAM_REDRAW_MS and replaced by
+        the parsed message when streaming finishes.
         """
         if not self.streaming_response:
             self.streaming_response = True
             # Store index where streaming message will be inserted
             self._streaming_msg_index = len(self.messages)
-            # Initialize streaming buffer for this message
-            self._streaming_buffer = ""
+            self._stream = StreamPreview()
+            self._stream_cursor = None
     
     def finish_streaming_response(self, final_text: str, raw_text: str = None):
-        """Add the streamed response to the chat as a complete message.
+        """Replace the streamed preview with the complete message.
         
         Args:
             final_text: Final formatted response after parsing
@@ -1108,31 +1189,55 @@ class ChatWidget(QWidget):
         
         self.streaming_response = False
         
-        # If no final_text provided, use the accumulated streaming buffer
-        if not final_text and hasattr(self, '_streaming_buffer'):
-            final_text = self._streaming_buffer
+        # If no final_text provided, use the accumulated stream
+        if not final_text and self._stream is not None:
+            final_text = self._stream.text()
+        self._remove_stream_preview()
+        self._stream = None
         
         # Add the complete response as a single message (seamless)
         self.append_message("Assistant", final_text, raw_text=raw_text or final_text)
-        
-        # Clear the streaming buffer
-        self._streaming_buffer = ""
 
     def append_response_chunk(self, chunk: str):
         """Append a chunk of streaming response to the chat.
         
-        Called as tokens arrive from the LLM during streaming.
-        Accumulates chunks in a buffer without displaying them yet.
-        The full message will be displayed when streaming is complete.
+        Called as tokens arrive from the LLM during streaming. Redraws are
+        coalesced so a fast stream repaints once per STREAM_REDRAW_MS.
         
         Args:
             chunk: String token/chunk to append
         """
-        if not self.streaming_response or not hasattr(self, '_streaming_buffer'):
+        if not self.streaming_response or self._stream is None:
             return
-        
-        # Just accumulate the chunk - don't display it yet
-        self._streaming_buffer += chunk
+        self._stream.feed(chunk)
+        if not self._stream_redraw_pending:
+            self._stream_redraw_pending = True
+            QTimer.singleShot(STREAM_REDRAW_MS, self._redraw_stream_preview)
+
+    def _redraw_stream_preview(self):
+        self._stream_redraw_pending = False
+        if not self.streaming_response or self._stream is None:
+            return
+        autoscroll = self._should_autoscroll()
+        cursor = self._remove_stream_preview()
+        if cursor is None:
+            cursor = QtGui.QTextCursor(self.history.document())
+            cursor.movePosition(QtGui.QTextCursor.End)
+        start = cursor.position()
+        cursor.insertBlock()
+        cursor.insertHtml(self._stream.render())
+        # Keep the preview selected; the cursor follows edits made above it
+        cursor.setPosition(start, QtGui.QTextCursor.KeepAnchor)
+        self._stream_cursor = cursor
+        if autoscroll:
+            self._scroll_to_bottom()
+
+    def _remove_stream_preview(self):
+        """Remove the streamed preview, returning a cursor where it was."""
+        cursor, self._stream_cursor = self._stream_cursor, None
+        if cursor is not None:
+            cursor.removeSelectedText()
+        return cursor
 
     def handle_copy_message(self, msg_index):
         """Copy a single message's raw text to clipboard."""
@@ -1195,7 +1300,8 @@ class ChatWidget(QWidget):
         self.thinking_active = False
         self.thinking_present = False
         self.thinking_expanded = False
-        self._streaming_buffer = ""
+        self._stream = None
+        self._stream_cursor = None
         self.streaming_response = False
 
     def show_thinking(self):
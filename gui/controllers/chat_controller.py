@@ -10,23 +10,158 @@ This controller handles all chat-related operations including:
 
 import os
 import re
-import uuid
 import hashlib
+import secrets
 import html as _html
 import json
+from collections import OrderedDict
 from PySide6.QtWidgets import QMessageBox, QFileDialog
 from PySide6.QtCore import QSettings, QTimer
 
-from gui.workers import ChatWorker, ToolWorker
-from gui.dialogs.diff_dialog import DiffDialog
-from gui.dialogs.batch_diff_dialog import BatchDiffDialog
-from gui.dialogs.chat_history_dialog import ChatHistoryDialog
-from gui.dialogs.image_dialog import ImageSelectionDialog
-from gui.editor import DocumentWidget, ImageViewerWidget
+from gui.workers import ChatWorker, RagQueryWorker, ToolWorker, start_pooled
+from gui.editor import DocumentWidget
+from gui.settings_utils import settings_list
 from core.diff_engine import EditBatch, FileEdit
-from core.diff_parser import DiffParser
+from core.diff_parser import DiffParser, find_generate_image_blocks, find_update_blocks
 from core.path_resolver import PathResolver
+from core.project import project_settings_key
 from core.model_manager import ModelPreferenceStore, ModelSettings
+from core.persistent_cache import PersistentCache, default_cache_path
+from core.response_cache import ResponseCache, SemanticResponseCache
+
+# Static prompt text, built once at import. Keeping these byte-identical
+# across turns also lets providers reuse their cached prompt prefix.
+DEFAULT_SYSTEM_PROMPT = (
+    "You are Inkwell AI, a creative writing assistant. Help users with their "
+    "fiction, characters, worldbuilding, and storytelling."
+)
+
+_EDIT_FORMATS = (
+    "\n\n## Tools and Directives\n"
+    "\n"
+    "When the user requests searches or image lookups, IMMEDIATELY use the appropriate tool:\n"
+    "- For image searches (Derpibooru, Tantabus, E621): :::TOOL:TOOLNAME:query:::\n"
+    "- For web searches: :::TOOL:SEARCH:query:::\n"
+    "- For image search: :::TOOL:IMAGE:query:::\n"
+    "Stop after outputting the tool command. Do not add explanations before the tool.\n"
+    "\n"
+    "## Edit Formats\n"
+    "Use PATCH for line-level edits or range replacements:\n"
+    ":::PATCH path/to/file.md\n"
+    "L42: old text => new text\n"
+    "L20-L23:\n"
+    "New content for lines 20-23...\n"
+    "Multiple lines here...\n"
+    ":::END:::\n"
+    "\n"
+    "Use UPDATE when replacing entire file or large sections:\n"
+    ":::UPDATE path/to/file.md\n"
+    "Complete new file content...\n"
+    ":::END:::\n"
+)
+
+_IMAGE_GEN_FORMAT = (
+    "\n"
+    "Image generation:\n"
+    ":::GENERATE_IMAGE:::\n"
+    "Prompt: Description...\n"
+    ":::END:::\n"
+)
+
+_EDIT_RULES = (
+    "\n"
+    "CRITICAL RULES:\n"
+    "- ALWAYS use :::PATCH::: or :::UPDATE::: directives for file edits\n"
+    "- Output ONLY the directive blocks (:::PATCH...:::END:::)\n"
+    "- Do NOT wrap directives in code fences (no ```text or ```patch)\n"
+    "- Do NOT output edit: links or HTML anchors\n"
+    "- Do NOT include reminders or instructions in your response\n"
+    "- Do NOT include footnotes or citations unless specifically requested\n"
+    "- Explanations can come AFTER the directive block\n"
+    "- When editing selections repeatedly, continue using :::PATCH::: format for each edit\n"
+)
+
+# Keyed by whether image generation is enabled
+_DEFAULT_EDIT_INSTRUCTIONS = {
+    True: _EDIT_FORMATS + _IMAGE_GEN_FORMAT + _EDIT_RULES,
+    False: _EDIT_FORMATS + _EDIT_RULES,
+}
+
+_ASK_MODE_HEADER = (
+    "\n\n" + "="*60 + "\n"
+    "CRITICAL: YOU ARE IN ASK MODE\n"
+    "="*60 + "\n"
+    "DO NOT generate file edits, patches, diffs, or any UPDATE/PATCH blocks.\n"
+    "DO NOT use :::UPDATE::: or :::PATCH::: markers.\n"
+    "When asked to rewrite, modify, or edit code/text:\n"
+    "  - Show the revised content as plain text in your response\n"
+    "  - Format it nicely with code blocks if appropriate\n"
+    "  - The user will manually copy what they need\n"
+    "You are a READ-ONLY assistant in this mode.\n"
+    "="*60 + "\n"
+)
+
+_ASK_MODE_REMINDER = (
+    "\n\n" + "="*60 + "\n"
+    "REMINDER: ASK MODE - No file modifications, no patches, no diffs.\n"
+    "Provide helpful information and plain text suggestions only.\n"
+    "="*60
+)
+
+# Most recent history messages sent to the model each turn (0 = everything)
+MAX_HISTORY_MESSAGES = 12
+# ...and at most this many characters of them; the newest message always goes (0 = no limit)
+MAX_HISTORY_CHARS = 32000
+
+# Retrieval results kept per (index version, query)
+RAG_QUERY_CACHE_SIZE = 256
+
+# Unreviewed edits kept across turns; the oldest links stop working past this
+MAX_PENDING_EDITS = 64
+
+# Characters of each open file sent per turn in Ask mode; longer files keep their tail (0 = no limit).
+# Edit mode always sends whole files, since an UPDATE block replaces the complete file.
+MAX_OPEN_FILE_CHARS = 32000
+
+# Every edit/tool block needs one of these; responses without them are plain prose
+_BLOCK_MARKERS = (":::", "```", 'href="edit:')
+
+# Edits proposed for binary files are redirected to a .txt sibling
+_NON_TEXT_EXTENSIONS = frozenset({
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp',
+    '.mp4', '.avi', '.mov', '.mp3', '.wav',
+    '.pdf', '.zip', '.tar', '.gz', '.exe', '.bin',
+})
+
+# Response-parsing patterns, compiled once instead of on every reply
+_TOOL_RE = re.compile(r":::TOOL:(.*?):(.*?):::")
+_EDIT_ID_RE = re.compile(r"edit:([0-9a-fA-F-]{6,})")
+_REMINDER_RE = re.compile(r"^[^\n]*REMINDER[^\n]*:.*?\n+", re.IGNORECASE)
+_GEN_FIELD_RE = re.compile(r"^[ \t]*(prompt|workflow):(.*)$", re.IGNORECASE | re.MULTILINE)
+_FENCED_PATCH_RE = re.compile(
+    r"```[a-z]*\s*\n\s*:::PATCH\s+([^\n:]+)\s*(?:::\s*)?\n((?:(?!:::END:::)[\s\S])*?)\s*:::END:::\s*\n```",
+    re.DOTALL | re.IGNORECASE,
+)
+_PATCH_RE = re.compile(r":::PATCH\s+([^\n]+?)\s*(?:::\s*)?\n(.*?)(?:\s*(?::::END:::|:::END|:::)|\s*$)", re.DOTALL)
+_DIFF_BLOCK_RE = re.compile(r"```diff\s*\n(.*?)```", re.DOTALL)
+_CODE_BLOCK_RE = re.compile(r"```(?:markdown|md|text)?\s*\n(.*?)```", re.DOTALL)
+_EDIT_LINK_RE = re.compile(r'<br><b><a href="edit:([^"]+)">.*?</a></b><br>')
+_PATH_LINE_SUFFIX_RE = re.compile(r"\s+L\d+:")
+# Blocks added to earlier user turns, stripped from history before each request
+_PRIOR_CONTEXT_RE = re.compile(r"\n\nContext:\n.*?(?=$|\n\nREMINDER:)", re.DOTALL)
+_PRIOR_CITATIONS_RE = re.compile(r"\n\nCitations:\n.*?(?=$|\n\nREMINDER:)", re.DOTALL)
+_PRIOR_SELECTION_RE = re.compile(
+    r"\n\nSelected Range in .*?: L\d+-L\d+\nSelected Text:\n```text\n.*?\n```\n.*?(?=$)", re.DOTALL
+)
+_CITATIONS_RE = re.compile(r"\*\*Citations:\*\*.*$", re.DOTALL | re.MULTILINE)
+_FOOTNOTE_RE = re.compile(r"\[\^\d+\]")
+# PATCH directives, matched once per patch line
+_PATCH_RANGE_RE = re.compile(r"L(\d+)\s*-\s*L(\d+):\s*(.*)")
+_PATCH_REPLACE_RE = re.compile(r"L(\d+):\s*(.+?)\s*(?:=>|->)\s*(.+)")
+_PATCH_LINE_RE = re.compile(r"L(\d+):\s*(.*)")
+_PATCH_LINE_START_RE = re.compile(r"\s*L\d+:")
+_PATCH_RANGE_START_RE = re.compile(r"\s*L\d+\s*-\s*L\d+:")
+_HUNK_HEADER_RE = re.compile(r"@@\s*-([0-9]+)(?:,([0-9]+))?\s*\+([0-9]+)(?:,([0-9]+))?\s*@@")
 
 
 def estimate_tokens(text: str) -> int:
@@ -50,9 +185,10 @@ class ChatController:
             main_window: The MainWindow instance
         """
         self.window = main_window
-        self.settings = QSettings("InkwellAI", "InkwellAI")
+        # Share the window's QSettings rather than opening another handle
+        self.settings = getattr(main_window, "settings", None) or QSettings("InkwellAI", "InkwellAI")
         self.chat_history = []  # List of {"role": "user/assistant", "content": "..."}
-        self.pending_edits = {}  # id -> (path, content) - legacy single edits
+        self.pending_edits = OrderedDict()  # id -> (path, content) - legacy single edits
         self.pending_edit_batches = {}  # batch_id -> EditBatch - new batch system
         self._raw_ai_responses = []  # Track raw AI responses before parsing
         self._last_selection_info = None  # Store selection context
@@ -61,10 +197,19 @@ class ChatController:
         self.chat_mode = "edit"  # Default mode: edit or ask
         self.tools_enabled = True  # Default tools enabled state
         self.worker = None
+        self._running_chat_workers = set()  # keeps pool runnables alive until done
+        self._running_tool_workers = set()
+        self._running_rag_workers = set()
         self.tool_worker = None
         self.batch_worker = None
         self._last_progress_note = None
         self._structured_support_cache = {}
+        self.response_cache = ResponseCache()
+        self.apply_cache_settings()
+        self.semantic_cache = SemanticResponseCache()
+        self._rag_query_cache = OrderedDict()  # (index version, query, n_results) -> (chunks, query embedding or None)
+        self._rag_cache_engine = None
+        self._active_file_cache = None  # ((path, digest), prompt block, tokens)
         self._current_model_settings: ModelSettings | None = None
         self._current_model_supports_structured: bool | None = None
         self._current_provider: str | None = None
@@ -128,7 +273,8 @@ class ChatController:
             # Also display the user command in chat
             self.window.chat.append_message("User", message)
             return
-        self.chat_history.append({"role": "user", "content": message})
+        user_entry = {"role": "user", "content": message}
+        self.chat_history.append(user_entry)
         self._last_progress_note = None
         # Update planned context list as chat content changes
         try:
@@ -151,15 +297,8 @@ class ChatController:
         token_usage = estimate_tokens(message)
         token_breakdown = {"User message": token_usage}
 
-        # Update chat header to reflect current model
-        loaded_models = None
-        try:
-            models = provider.list_models()
-            vision_models = [m for m in models if provider.is_vision_model(m)]
-            loaded_models = provider.get_loaded_models() if hasattr(provider, "get_loaded_models") else None
-            self.window.chat.update_model_info(provider_name, model, models, vision_models, loaded_models)
-        except Exception:
-            pass
+        # Refresh the model list only if the current model's capabilities aren't known yet
+        self.window.ensure_model_info()
 
         # Inform the user about model load status and proactively load if needed
         try:
@@ -176,9 +315,7 @@ class ChatController:
                     pass
                 self.window.chat.append_message("System", f"Model '{model}' is not loaded. Loading now…")
                 try:
-                    from core.model_manager import ModelManager, build_default_sources
-                    sources = build_default_sources(self.settings)
-                    mgr = ModelManager(sources)
+                    mgr = self.window.get_model_manager()
                     ok, err = mgr.load_model(provider_name, model)
                     if ok:
                         # Allow provider to update internal state (~1s is enough in practice)
@@ -201,24 +338,44 @@ class ChatController:
                         pass
             elif loaded_state is True:
                 self.window.chat.append_message("System", f"Model '{model}' is already loaded.")
-            else:
-                # Unknown loaded state; show currently loaded roster if available
-                if loaded_models is not None:
-                    roster = ", ".join(loaded_models) if loaded_models else "none"
-                    self.window.chat.append_message("System", f"Loaded models: {roster}.")
         except Exception:
             pass
-        
-        # Retrieve context if RAG is active and context level allows
-        context = []
+
+        self.window.chat.show_thinking()
+
+        # Retrieve context if RAG is active and context level allows, and embed the
+        # message for the semantic response cache. Both run the embedder, so they
+        # go to the thread pool and the request is built once the results arrive.
+        use_rag = self.context_level != "none"
+        semantic = self.settings.value("semantic_cache_enabled", False, type=bool)
+        if self.window.rag_engine and (use_rag or semantic):
+            if use_rag:
+                print(f"DEBUG: Querying RAG for: {message}")
+
+            def send(context, query_vector):
+                # A new chat or project may have replaced this turn meanwhile
+                if not self.chat_history or self.chat_history[-1] is not user_entry:
+                    return
+                self._send_chat_message(message, provider, provider_name, model, token_usage, token_breakdown,
+                                        context, query_vector)
+
+            self._query_rag(message, send, n_results=3 if use_rag else 0, embed_query=semantic)
+        else:
+            self._send_chat_message(message, provider, provider_name, model, token_usage, token_breakdown, [])
+
+    def _send_chat_message(self, message, provider, provider_name, model, token_usage, token_breakdown, context,
+                           query_vector=None):
+        """Build the system prompt around the retrieved context and start the ChatWorker.
+
+        query_vector is the message's embedding when the semantic response
+        cache is enabled, computed off the UI thread by _query_rag.
+        """
         mentioned_files = set()
         included_files = set()  # Track all files already included in system prompt
-        
-        if self.context_level != "none" and self.window.rag_engine:
-            print(f"DEBUG: Querying RAG for: {message}")
-            context = self.window.rag_engine.query(message, n_results=3, include_metadata=True)
+
+        if context:
             print(f"DEBUG: Retrieved {len(context)} chunks")
-            
+
             # Extract mentioned file paths (do NOT add full-file tokens; we only count chunk text later)
             rag_file_info = []
             for chunk in context:
@@ -238,44 +395,37 @@ class ChatController:
                 print(f"DEBUG: Files from RAG context: {', '.join(rag_file_info)}")
             
         # Get base system prompt and enhance it with edit format instructions
-        self.window.chat.show_thinking()
-        
         base_system_prompt = self.window.project_manager.get_system_prompt(
-            self.settings.value("system_prompt", "You are Inkwell AI, a creative writing assistant. Help users with their fiction, characters, worldbuilding, and storytelling.")
+            self.settings.value("system_prompt", DEFAULT_SYSTEM_PROMPT)
         )
         
         # Check if image generation is enabled
         enabled_tools = self.window.project_manager.get_enabled_tools()
         image_gen_enabled = enabled_tools is None or "GENERATE_IMAGE" in enabled_tools
         
+        # The prompt is collected in pieces and joined once; file blocks can be large
+        prompt_parts = [base_system_prompt]
         # Add edit format instructions only in edit mode
-        system_prompt = base_system_prompt
         if self.chat_mode == "edit":
-            edit_instructions = self._get_edit_instructions(image_gen_enabled)
-            system_prompt += edit_instructions
+            prompt_parts.append(self._get_edit_instructions(image_gen_enabled))
         else:
             # In ask mode, explicitly instruct to not generate patches/diffs
-            ask_mode_header = (
-                "\n\n" + "="*60 + "\n"
-                "CRITICAL: YOU ARE IN ASK MODE\n"
-                "="*60 + "\n"
-                "DO NOT generate file edits, patches, diffs, or any UPDATE/PATCH blocks.\n"
-                "DO NOT use :::UPDATE::: or :::PATCH::: markers.\n"
-                "When asked to rewrite, modify, or edit code/text:\n"
-                "  - Show the revised content as plain text in your response\n"
-                "  - Format it nicely with code blocks if appropriate\n"
-                "  - The user will manually copy what they need\n"
-                "You are a READ-ONLY assistant in this mode.\n"
-                "="*60 + "\n"
-            )
-            system_prompt += ask_mode_header
+            prompt_parts.append(_ASK_MODE_HEADER)
+
+        # Model capability goes before any file content: everything up to here is
+        # identical across turns, so the provider can reuse its cached prefix.
+        is_vision = self.window.is_vision_model(model)
+        if is_vision:
+            prompt_parts.append("\n\n[System] Current model is VISION CAPABLE. You can see images provided in the context.")
+        else:
+            prompt_parts.append("\n\n[System] Current model is TEXT ONLY.")
             
         # Add Active File Context based on context level
         active_path, active_content = self.window.editor.get_current_file()
 
         # Include manual context files selected by user (ahead of active/other open files)
-        system_prompt, token_usage, token_breakdown = self._inject_manual_context(
-            system_prompt,
+        token_usage = self._inject_manual_context(
+            prompt_parts,
             token_usage,
             token_breakdown,
             included_files,
@@ -287,9 +437,9 @@ class ChatController:
             if self.window.rag_engine and self.window.rag_engine._should_exclude_file(active_path):
                 print(f"DEBUG: Skipping active file {active_path} (in excluded directory)")
             else:
-                tokens = estimate_tokens(active_content)
+                block, tokens = self._active_file_block(active_path, active_content)
                 print(f"DEBUG: Including active file in context: {active_path} ({tokens} tokens)")
-                system_prompt += f"\nCurrently Open File ({active_path}):\n{active_content}\n"
+                prompt_parts.append(block)
                 token_usage += tokens
                 token_breakdown[f"Active: {active_path}"] = tokens
                 included_files.add(active_path)  # Mark as included
@@ -298,20 +448,15 @@ class ChatController:
         
         # Add other open tabs if context level is "visible_tabs", "all_open" or "full"
         if self.context_level in ("visible_tabs", "all_open", "full"):
-            open_files = self._collect_open_files(active_path, system_prompt, token_usage, token_breakdown, included_files)
+            open_files, open_tokens = self._collect_open_files(active_path, prompt_parts, token_breakdown, included_files)
+            token_usage += open_tokens
             if open_files:
                 print(f"DEBUG: Including open tabs in context: {', '.join(open_files)}")
         
-        # Check Vision Capability and collect images
-        is_vision = provider.is_vision_model(model)
-        attached_images, attached_image_names = self._collect_images(is_vision, message, system_prompt)
-        
-        if is_vision:
-            system_prompt += "\n\n[System] Current model is VISION CAPABLE. You can see images provided in the context."
-            if attached_image_names:
-                self.window.chat.append_message("System", f"<i>Attached images: {', '.join(attached_image_names)}</i>")
-        else:
-            system_prompt += "\n\n[System] Current model is TEXT ONLY."
+        # Collect images for vision models
+        attached_images, attached_image_names = self._collect_images(is_vision, message)
+        if attached_image_names:
+            self.window.chat.append_message("System", f"<i>Attached images: {', '.join(attached_image_names)}</i>")
 
         # Inject Project Structure only for "full" context to prevent overflow
         if self.context_level == "full" and self.window.project_manager.root_path:
@@ -319,7 +464,7 @@ class ChatController:
             # Be conservative: cap to ~8000 chars (~2000 tokens heuristically)
             if len(structure) > 8000:
                 structure = structure[:8000] + "\n... (truncated)"
-            system_prompt += f"\n\nProject Structure:\n{structure}"
+            prompt_parts.append(f"\n\nProject Structure:\n{structure}")
             est = estimate_tokens(structure)
             token_usage += est
             token_breakdown["Project structure"] = est
@@ -330,12 +475,8 @@ class ChatController:
         # Add final reminder for ask mode
         if self.chat_mode == "ask":
             print("DEBUG: ASK MODE ACTIVE - Disabling edit instructions")
-            system_prompt += (
-                "\n\n" + "="*60 + "\n"
-                "REMINDER: ASK MODE - No file modifications, no patches, no diffs.\n"
-                "Provide helpful information and plain text suggestions only.\n"
-                "="*60
-            )
+            prompt_parts.append(_ASK_MODE_REMINDER)
+        system_prompt = "".join(prompt_parts)
         
         # Disable tools if tools checkbox is unchecked
         if not self.tools_enabled:
@@ -346,26 +487,63 @@ class ChatController:
         print(f"DEBUG: Chat mode: {self.chat_mode}")
         print(f"DEBUG: Tools enabled: {self.tools_enabled}")
         print(f"DEBUG: Token usage total={token_usage} breakdown={token_breakdown}")
-             
+
+        structured_enabled = bool(self.settings.value("structured_enabled", False, type=bool))
+        schema_id = self._select_schema_id(enabled_tools, self.chat_mode) if structured_enabled else None
+
+        # Identical requests reuse the earlier answer (Regenerate bypasses this).
+        # Image attachments are not part of the key, so those turns always go out.
+        cache_key = semantic_scope = None
+        if not (is_vision and attached_images):
+            cache_options = {
+                "provider": provider_name,
+                "enabled_tools": enabled_tools,
+                "mode": self.chat_mode,
+                "schema_id": schema_id,
+            }
+            history = self._history_window()
+            cache_key = ResponseCache.make_key(model, system_prompt, history, context, **cache_options)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                print(f"DEBUG: Response cache hit ({self.response_cache.get_stats()['hit_rate']} hit rate)")
+            elif query_vector is not None:
+                # Same conversation so far, reworded question: match on the query embedding
+                semantic_scope = ResponseCache.make_key(model, system_prompt, history[:-1], None, **cache_options)
+                cached = self.semantic_cache.get(semantic_scope, query_vector)
+                if cached is not None:
+                    print("DEBUG: Semantic response cache hit")
+            if cached is not None:
+                self.on_chat_response(cached)
+                # A reused answer may belong to a similar question; say so
+                self.window.chat.append_message("System", "<i>(cached reply; use Regenerate for a fresh one)</i>")
+                self._refresh_context_file_view()
+                self.window._update_token_dashboard(token_usage, token_breakdown)
+                return
+
         self.worker = ChatWorker(
             provider,
-            self.chat_history,
+            self._history_window(),
             model,
             context,
             system_prompt,
             images=attached_images if is_vision else None,
             enabled_tools=enabled_tools,
             mode=self.chat_mode,
-            structured_enabled=bool(self.settings.value("structured_enabled", False, type=bool)),
-            schema_id=self._select_schema_id(enabled_tools, self.chat_mode) if self.settings.value("structured_enabled", False, type=bool) else None,
+            structured_enabled=structured_enabled,
+            schema_id=schema_id,
         )
-        self.worker.response_thinking_start.connect(self.on_chat_thinking_start)
-        self.worker.response_thinking_chunk.connect(self.on_chat_thinking_chunk)
-        self.worker.response_thinking_done.connect(self.on_chat_thinking_done)
-        self.worker.response_chunk.connect(self.on_chat_chunk)
-        self.worker.response_received.connect(self.on_chat_response)
-        self.worker.progress_update.connect(self.on_chat_progress)
-        self.worker.start()
+        if cache_key is not None:
+            self.worker.signals.response_received.connect(
+                lambda response, key=cache_key, scope=semantic_scope, vector=query_vector:
+                    self._cache_response(key, response, scope, vector)
+            )
+        self.worker.signals.response_thinking_start.connect(self.on_chat_thinking_start)
+        self.worker.signals.response_thinking_chunk.connect(self.on_chat_thinking_chunk)
+        self.worker.signals.response_thinking_done.connect(self.on_chat_thinking_done)
+        self.worker.signals.response_chunk.connect(self.on_chat_chunk)
+        self.worker.signals.response_received.connect(self.on_chat_response)
+        self.worker.signals.progress_update.connect(self.on_chat_progress)
+        self._start_chat_worker(self.worker)
 
         # Keep context file list in sync in UI
         self._refresh_context_file_view()
@@ -374,6 +552,147 @@ class ChatController:
         # RAG chunk tokens were already counted above to avoid double counting
         self.window._update_token_dashboard(token_usage, token_breakdown)
 
+    def _start_chat_worker(self, worker):
+        """Run a ChatWorker on the shared thread pool."""
+        start_pooled(worker, self._running_chat_workers, worker.signals.done)
+
+    def _start_tool_worker(self, worker, on_finished):
+        """Run a ToolWorker on the shared thread pool."""
+        worker.signals.finished.connect(on_finished)
+        start_pooled(worker, self._running_tool_workers, worker.signals.finished)
+
+    def apply_cache_settings(self):
+        """Attach or detach the on-disk store per the persistent_response_cache setting."""
+        persist = self.settings.value("persistent_response_cache", False, type=bool)
+        store = self.response_cache.store
+        if persist and store is None:
+            store = PersistentCache()
+        elif not persist and store is not None:
+            store.close()
+            store = None
+        self.response_cache.store = store
+        rag_engine = getattr(self.window, "rag_engine", None)
+        if rag_engine is not None:
+            rag_engine.embedding_store = store
+
+    def clear_response_caches(self):
+        """Forget every cached reply and query embedding, in memory and on disk."""
+        self.response_cache.clear()
+        self.semantic_cache.clear()
+        store = self.response_cache.store
+        if store is None and default_cache_path().exists():
+            # Persistence is off now, but replies from earlier sessions may remain
+            store = PersistentCache()
+            store.clear_responses()
+        if store is not None:
+            store.clear_embeddings()
+            if store is not self.response_cache.store:
+                store.close()
+
+    def _cache_response(self, key, response, semantic_scope=None, query_vector=None):
+        """Remember a finished response unless it is an error or needs continuing."""
+        if not response or response.startswith("Error"):
+            return
+        if not self.is_response_complete(response):
+            return
+        self.response_cache.set(key, response)
+        if semantic_scope is not None and query_vector is not None:
+            self.semantic_cache.set(semantic_scope, query_vector, response)
+
+    def _active_file_block(self, path, content):
+        """Return the system-prompt block and token estimate for the active file.
+
+        Reused while the file is unchanged, so repeated turns build a
+        byte-identical prompt without re-counting the whole file.
+        """
+        limit = self._open_file_limit()
+        sig = (path, hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest(), limit)
+        if self._active_file_cache is None or self._active_file_cache[0] != sig:
+            content = self._file_excerpt(content, limit)
+            block = f"\nCurrently Open File ({path}):\n{content}\n"
+            self._active_file_cache = (sig, block, estimate_tokens(content))
+        return self._active_file_cache[1], self._active_file_cache[2]
+
+    def _open_file_limit(self):
+        """Characters of each open file to send this turn (0 = the whole file)."""
+        if self.chat_mode != "ask":
+            return 0
+        return self.settings.value("max_open_file_chars", MAX_OPEN_FILE_CHARS, type=int)
+
+    @staticmethod
+    def _file_excerpt(content, limit):
+        """Return content, or its last `limit` characters behind an omission marker."""
+        if not limit or len(content) <= limit:
+            return content
+        # Start the tail on a line boundary and say where, so line numbers stay usable
+        cut = content.find("\n", len(content) - limit) + 1 or len(content) - limit
+        first_line = content.count("\n", 0, cut) + 1
+        return f"[Lines 1-{first_line - 1} omitted; text below starts at line {first_line}]\n{content[cut:]}"
+
+    def _history_window(self):
+        """Return the tail of chat history that is sent to the model.
+
+        Older turns are dropped so prefill cost stops growing with the
+        conversation, first by message count and then by total characters
+        (a few pasted chapters can outweigh dozens of short turns). The
+        window always starts at a user message.
+        """
+        window = self.chat_history
+        limit = self.settings.value("max_history_messages", MAX_HISTORY_MESSAGES, type=int)
+        if limit and len(window) > limit:
+            window = window[-limit:]
+        budget = self.settings.value("max_history_chars", MAX_HISTORY_CHARS, type=int)
+        if budget and len(window) > 1:
+            start, total = len(window), 0
+            while start > 0:
+                total += len(window[start - 1].get("content") or "")
+                if total > budget and start < len(window):
+                    break
+                start -= 1
+            if start:
+                window = window[start:]
+        if window is self.chat_history:
+            return window
+        for i, msg in enumerate(window):
+            if msg.get("role") == "user":
+                return window[i:]
+        return window
+
+    def _query_rag(self, message, on_result, n_results=3, embed_query=False):
+        """Query RAG with metadata and pass the chunks to on_result.
+
+        on_result(context, query_vector) also receives the message's
+        embedding when embed_query is set (None otherwise, or if embedding
+        failed). Results are reused until the index changes; a cache miss
+        runs on the thread pool and calls on_result when it finishes.
+        """
+        engine = self.window.rag_engine
+        if engine is not self._rag_cache_engine:
+            # A different project's index; nothing cached applies
+            self._rag_query_cache.clear()
+            self._rag_cache_engine = engine
+        key = (engine.index_version, message, n_results)
+        cached = self._rag_query_cache.get(key)
+        if cached is not None and (cached[1] is not None or not embed_query):
+            self._rag_query_cache.move_to_end(key)
+            print("DEBUG: RAG query cache hit")
+            on_result(cached[0], cached[1] if embed_query else None)
+            return
+
+        worker = RagQueryWorker(engine, message, n_results, embed_query)
+
+        def finished(context, query_vector):
+            # Don't file results from a closed project's index under the new one
+            if (context or query_vector is not None) and engine is self._rag_cache_engine:
+                self._rag_query_cache[key] = (context, query_vector)
+                self._rag_query_cache.move_to_end(key)
+                if len(self._rag_query_cache) > RAG_QUERY_CACHE_SIZE:
+                    self._rag_query_cache.popitem(last=False)
+            on_result(context, query_vector)
+
+        worker.signals.finished.connect(finished)
+        start_pooled(worker, self._running_rag_workers, worker.signals.finished)
+
     def _prune_prior_context_from_history(self):
         """Strip any previously injected context blocks from older user messages.
 
@@ -402,17 +721,14 @@ class ChatController:
                 # Remove any prior Context: ... block (greedy until end or citations)
                 # Matches a "Context:" header followed by any content up to the end
                 # of the message or before a trailing reminder line.
-                cleaned = re.sub(r"\n\nContext:\n.*?(?=$|\n\nREMINDER:)",
-                                 "", content, flags=re.DOTALL)
+                cleaned = _PRIOR_CONTEXT_RE.sub("", content)
 
                 # Remove any prior Citations: ... block
-                cleaned = re.sub(r"\n\nCitations:\n.*?(?=$|\n\nREMINDER:)",
-                                 "", cleaned, flags=re.DOTALL)
+                cleaned = _PRIOR_CITATIONS_RE.sub("", cleaned)
 
                 # Also remove any previously appended selection hint header to avoid
                 # unintended carry-over (keeps the raw message concise).
-                cleaned = re.sub(r"\n\nSelected Range in .*?: L\d+-L\d+\nSelected Text:\n```text\n.*?\n```\n.*?(?=$)",
-                                 "", cleaned, flags=re.DOTALL)
+                cleaned = _PRIOR_SELECTION_RE.sub("", cleaned)
 
                 if cleaned != content:
                     self.chat_history[i]['content'] = cleaned
@@ -439,59 +755,19 @@ class ChatController:
             return custom_instructions
         
         # Use default instructions
-        edit_instructions = (
-            "\n\n## Tools and Directives\n"
-            "\n"
-            "When the user requests searches or image lookups, IMMEDIATELY use the appropriate tool:\n"
-            "- For image searches (Derpibooru, Tantabus, E621): :::TOOL:TOOLNAME:query:::\n"
-            "- For web searches: :::TOOL:SEARCH:query:::\n"
-            "- For image search: :::TOOL:IMAGE:query:::\n"
-            "Stop after outputting the tool command. Do not add explanations before the tool.\n"
-            "\n"
-            "## Edit Formats\n"
-            "Use PATCH for line-level edits or range replacements:\n"
-            ":::PATCH path/to/file.md\n"
-            "L42: old text => new text\n"
-            "L20-L23:\n"
-            "New content for lines 20-23...\n"
-            "Multiple lines here...\n"
-            ":::END:::\n"
-            "\n"
-            "Use UPDATE when replacing entire file or large sections:\n"
-            ":::UPDATE path/to/file.md\n"
-            "Complete new file content...\n"
-            ":::END:::\n"
-        )
-        
-        if image_gen_enabled:
-            edit_instructions += (
-                "\n"
-                "Image generation:\n"
-                ":::GENERATE_IMAGE:::\n"
-                "Prompt: Description...\n"
-                ":::END:::\n"
-            )
-        
-        edit_instructions += (
-            "\n"
-            "CRITICAL RULES:\n"
-            "- ALWAYS use :::PATCH::: or :::UPDATE::: directives for file edits\n"
-            "- Output ONLY the directive blocks (:::PATCH...:::END:::)\n"
-            "- Do NOT wrap directives in code fences (no ```text or ```patch)\n"
-            "- Do NOT output edit: links or HTML anchors\n"
-            "- Do NOT include reminders or instructions in your response\n"
-            "- Do NOT include footnotes or citations unless specifically requested\n"
-            "- Explanations can come AFTER the directive block\n"
-            "- When editing selections repeatedly, continue using :::PATCH::: format for each edit\n"
-        )
-        return edit_instructions
+        return _DEFAULT_EDIT_INSTRUCTIONS[bool(image_gen_enabled)]
     
-    def _collect_open_files(self, active_path, system_prompt, token_usage, token_breakdown, included_files=None):
-        """Collect content from open tabs, skipping already-included files."""
+    def _collect_open_files(self, active_path, prompt_parts, token_breakdown, included_files=None):
+        """Append content from open tabs to prompt_parts, skipping already-included files.
+        
+        Returns the list of included files and their total token estimate.
+        """
         if included_files is None:
             included_files = set()
         
         open_files = []
+        total_tokens = 0
+        limit = self._open_file_limit()
         for i in range(self.window.editor.tabs.count()):
             tab_widget = self.window.editor.tabs.widget(i)
             tab_path = tab_widget.property("file_path") if hasattr(tab_widget, 'property') else None
@@ -506,10 +782,11 @@ class ChatController:
                 try:
                     content = self.window.project_manager.read_file(tab_path)
                     if content:
+                        content = self._file_excerpt(content, limit)
                         tokens = estimate_tokens(content)
                         open_files.append(f"{tab_path} ({tokens} tokens)")
-                        system_prompt += f"\nOpen File ({tab_path}):\n{content}\n"
-                        token_usage += tokens
+                        prompt_parts.append(f"\nOpen File ({tab_path}):\n{content}\n")
+                        total_tokens += tokens
                         token_breakdown[f"Open tab: {tab_path}"] = tokens
                         included_files.add(tab_path)  # Mark as included
                 except Exception:
@@ -517,29 +794,28 @@ class ChatController:
             elif tab_path and tab_path in included_files:
                 print(f"DEBUG: Skipping open file {tab_path} (already included in context)")
         
-        return open_files
+        return open_files, total_tokens
     
-    def _collect_images(self, is_vision, message, system_prompt):
+    def _collect_images(self, is_vision, message):
         """Collect images from open tabs and message references."""
         attached_images = []
         attached_image_names = []
+        seen_paths = set()  # absolute paths already attached
         
         if not is_vision:
             return attached_images, attached_image_names
             
         # Collect all open images from tabs
-        for i in range(self.window.editor.tabs.count()):
-            widget = self.window.editor.tabs.widget(i)
-            if isinstance(widget, ImageViewerWidget):
-                path = widget.property("file_path")
-                if path and os.path.exists(path):
-                    try:
-                        b64 = self.window.project_manager.get_image_base64(path)
-                        if b64:
-                            attached_images.append(b64)
-                            attached_image_names.append(os.path.basename(path))
-                    except Exception as e:
-                        print(f"DEBUG: Error reading open image {path}: {e}")
+        for path in self.window.editor.open_image_paths():
+            if os.path.exists(path):
+                try:
+                    b64 = self.window.project_manager.get_image_base64(path)
+                    if b64:
+                        attached_images.append(b64)
+                        attached_image_names.append(os.path.basename(path))
+                        seen_paths.add(os.path.abspath(path))
+                except Exception as e:
+                    print(f"DEBUG: Error reading open image {path}: {e}")
         
         # Also auto-detect images referenced in the message
         found_paths = self.window.project_manager.find_images_in_text(message)
@@ -547,8 +823,9 @@ class ChatController:
             print(f"DEBUG: Found referenced images in message: {found_paths}")
             for p in found_paths:
                 # Skip if already added from open tabs
-                if any(b64 == self.window.project_manager.get_image_base64(p) for b64 in attached_images):
+                if os.path.abspath(p) in seen_paths:
                     continue
+                seen_paths.add(os.path.abspath(p))
                 b64 = self.window.project_manager.get_image_base64(p)
                 if b64:
                     attached_images.append(b64)
@@ -735,9 +1012,12 @@ class ChatController:
             print("DEBUG: ASK MODE - Skipping patch parsing, returning response as plain markdown")
             return response
         
-        # Check for tool execution requests first
-        tool_pattern = r":::TOOL:(.*?):(.*?):::"
-        tool_match = re.search(tool_pattern, response)
+        # Plain prose (the common case) has no tool call or edit block to find
+        if not any(marker in response for marker in _BLOCK_MARKERS):
+            return response
+        
+        # Check for tool execution requests first; most edit replies have none
+        tool_match = _TOOL_RE.search(response) if ":::TOOL:" in response else None
         if tool_match:
             tool_name = tool_match.group(1).strip()
             query = tool_match.group(2).strip()
@@ -750,8 +1030,7 @@ class ChatController:
                 enabled_tools=self.window.project_manager.get_enabled_tools(),
                 project_manager=self.window.project_manager
             )
-            self.tool_worker.finished.connect(self.on_tool_finished)
-            self.tool_worker.start()
+            self._start_tool_worker(self.tool_worker, self.on_tool_finished)
             return response  # Stop further processing
         
         # Use new batch parsing system if enabled and diff parser is available
@@ -830,31 +1109,28 @@ class ChatController:
         Returns:
             Formatted response with individual edit links
         """
+        # Plain prose (the common case) can skip every block regex below
+        if not any(marker in response for marker in _BLOCK_MARKERS):
+            return response
+
         # Capture any edit:XYZ ids already present in the response
-        provided_edit_ids = re.findall(r"edit:([0-9a-fA-F-]{6,})", response)
+        provided_edit_ids = _EDIT_ID_RE.findall(response)
         seen_ids = set()
         provided_edit_ids = [eid for eid in provided_edit_ids if not (eid in seen_ids or seen_ids.add(eid))]
 
         def next_edit_id() -> str:
             if provided_edit_ids:
                 return provided_edit_ids.pop(0)
-            return str(uuid.uuid4())
+            return self._new_edit_id()
 
         processing_response = response
         
         # Strip reminder text
-        reminder_pattern = r"^[^\n]*REMINDER[^\n]*:.*?\n+"
-        processing_response = re.sub(reminder_pattern, "", processing_response, flags=re.IGNORECASE)
+        processing_response = _REMINDER_RE.sub("", processing_response)
 
-        # Parse UPDATE blocks
-        pattern = r":::UPDATE\s*(.*?)\s*:::\s*\n(.*?)\s*(?::::END:::|:::END|:::)"
-        matches = re.findall(pattern, processing_response, re.DOTALL)
-        
         # Parse PATCH blocks (multiple formats)
         patch_matches = self._parse_patch_blocks(processing_response)
         
-        print(f"DEBUG: Found {len(matches)} UPDATE blocks and {len(patch_matches)} PATCH blocks")
-        
         display_response = response
         
         # Get active file for path normalization
@@ -863,51 +1139,48 @@ class ChatController:
         except Exception:
             active_path = None
         
-        non_text_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp',
-                               '.mp4', '.avi', '.mov', '.mp3', '.wav',
-                               '.pdf', '.zip', '.tar', '.gz', '.exe', '.bin'}
-
-        # Process UPDATE blocks
-        if matches:
-            def replace_match(match):
-                m_path = self._normalize_edit_path(match.group(1).strip(), active_path)
-                m_content = match.group(2).strip().replace('\\n', '\n')
+        # Process UPDATE blocks in a single pass, swapping each for a review link
+        update_blocks = find_update_blocks(display_response)
+        if update_blocks:
+            parts = []
+            last = 0
+            for start, end, m_path, m_content in update_blocks:
+                m_path = self._normalize_edit_path(m_path, active_path)
+                m_content = m_content.strip().replace('\\n', '\n')
 
                 file_ext = os.path.splitext(m_path)[1].lower()
-                if file_ext in non_text_extensions:
+                if file_ext in _NON_TEXT_EXTENSIONS:
                     m_path = os.path.splitext(m_path)[0] + '.txt'
 
                 m_id = next_edit_id()
-                self.pending_edits[m_id] = (m_path, m_content)
-                return f'<br><b><a href="edit:{m_id}">Review Changes for {m_path}</a></b><br>'
+                self._add_pending_edit(m_id, m_path, m_content)
+                parts.append(display_response[last:start])
+                parts.append(f'<br><b><a href="edit:{m_id}">Review Changes for {m_path}</a></b><br>')
+                last = end
+            parts.append(display_response[last:])
+            display_response = "".join(parts)
+        update_count = len(update_blocks)
 
-            display_response = re.sub(pattern, replace_match, display_response, flags=re.DOTALL)
+        print(f"DEBUG: Found {update_count} UPDATE blocks and {len(patch_matches)} PATCH blocks")
 
         # Process PATCH blocks
         if patch_matches:
-            display_response = self._process_patch_blocks(patch_matches, display_response, active_path, next_edit_id, non_text_extensions)
+            display_response = self._process_patch_blocks(patch_matches, display_response, active_path, next_edit_id)
 
         # Process unified diff blocks
-        display_response = self._process_diff_blocks(processing_response, display_response, active_path, next_edit_id, non_text_extensions)
+        display_response = self._process_diff_blocks(processing_response, display_response, active_path, next_edit_id)
 
         # Process fallback code blocks
-        display_response = self._process_code_blocks(processing_response, display_response, active_path, next_edit_id, matches or patch_matches)
+        display_response = self._process_code_blocks(processing_response, display_response, active_path, next_edit_id, bool(update_count or patch_matches))
+
+        # Parse GENERATE_IMAGE blocks; the substring test skips the scan for most replies
+        if ":::GENERATE_IMAGE" in response:
+            for content in find_generate_image_blocks(response):
+                # One scan for both keys; later lines win if a key is repeated
+                fields = {key.lower(): value for key, value in _GEN_FIELD_RE.findall(content)}
+                prompt = fields.get("prompt", "").strip()
+                workflow = fields["workflow"].strip() if "workflow" in fields else None
 
-        # Parse GENERATE_IMAGE blocks
-        gen_pattern = r":::GENERATE_IMAGE:::\s*\n(.*?)\s*(?::::END:::|:::END|:::)"
-        gen_matches = re.findall(gen_pattern, response, re.DOTALL)
-        
-        if gen_matches:
-            for content in gen_matches:
-                prompt = ""
-                workflow = None
-                
-                for line in content.split('\n'):
-                    if line.lower().startswith("prompt:"):
-                        prompt = line[7:].strip()
-                    elif line.lower().startswith("workflow:"):
-                        workflow = line[9:].strip()
-                
                 if not prompt and content:
                     prompt = content.strip()
 
@@ -1056,9 +1329,7 @@ class ChatController:
 
         support: bool | None = None
         try:
-            from core.model_manager import ModelManager, build_default_sources
-
-            mgr = ModelManager(build_default_sources(self.settings))
+            mgr = self.window.get_model_manager()
             infos = mgr.list_models(refresh=False)
             for info in infos:
                 self._structured_support_cache[(info.provider, info.name)] = info.supports_structured_output
@@ -1298,13 +1569,14 @@ class ChatController:
 
     def _inject_manual_context(
         self,
-        system_prompt: str,
+        prompt_parts: list,
         token_usage: int,
         token_breakdown: dict,
         included_files: set,
-    ) -> tuple[str, int, dict]:
+    ) -> int:
+        """Append pinned context files to prompt_parts and return the updated token usage."""
         if not self.manual_context_files:
-            return system_prompt, token_usage, token_breakdown
+            return token_usage
 
         root = self.window.project_manager.get_root_path()
         rag = self.window.rag_engine
@@ -1327,12 +1599,12 @@ class ChatController:
                 continue
 
             tokens = estimate_tokens(content)
-            system_prompt += f"\nPinned Context ({path}):\n{content}\n"
+            prompt_parts.append(f"\nPinned Context ({path}):\n{content}\n")
             token_usage += tokens
             token_breakdown[f"Manual: {path}"] = tokens
             included_files.add(path)
 
-        return system_prompt, token_usage, token_breakdown
+        return token_usage
 
     def _render_structured_payload(self, payload: dict, schema_id: str) -> str:
         """Render a structured payload to a human-readable text, and enqueue diffs.
@@ -1422,25 +1694,17 @@ class ChatController:
                     active_path = self.window.editor.get_current_file()[0]
                 except Exception:
                     pass
-                seen_ids = set()
                 for edit in edits:
                     path = edit.get('path') or active_path or 'unknown.txt'
                     after = edit.get('after') or ''
                     # Non-text extension fallback
                     ext = os.path.splitext(path)[1].lower()
-                    non_text_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp',
-                                           '.mp4', '.avi', '.mov', '.mp3', '.wav',
-                                           '.pdf', '.zip', '.tar', '.gz', '.exe', '.bin'}
-                    if ext in non_text_extensions:
+                    if ext in _NON_TEXT_EXTENSIONS:
                         path = os.path.splitext(path)[0] + '.txt'
                     # Normalize path similar to UPDATE handler
                     path = self._normalize_edit_path(path, active_path)
-                    # Create id
-                    eid = str(uuid.uuid4())
-                    while eid in seen_ids:
-                        eid = str(uuid.uuid4())
-                    seen_ids.add(eid)
-                    self.pending_edits[eid] = (path, after)
+                    eid = self._new_edit_id()
+                    self._add_pending_edit(eid, path, after)
                     out.append(f"<b><a href=\"edit:{eid}\">Review Changes for {path}</a></b>")
                 if warnings:
                     out.append("**Warnings**\n\n" + "\n".join(warnings))
@@ -1463,7 +1727,7 @@ class ChatController:
             self.settings.setValue("llm_provider", provider_name)
         model = self.settings.value("ollama_model", "llama3") if provider_name == "Ollama" else self.settings.value("lm_studio_model", "llama3")
         system_prompt = self.window.project_manager.get_system_prompt(
-            self.settings.value("system_prompt", "You are Inkwell AI, a creative writing assistant.")
+            self.settings.value("system_prompt", DEFAULT_SYSTEM_PROMPT)
         )
 
         # Ensure model is loaded with user-facing messages
@@ -1476,8 +1740,7 @@ class ChatController:
                 except Exception:
                     pass
                 self.window.chat.append_message("System", f"Model '{model}' is not loaded. Loading now…")
-                from core.model_manager import ModelManager, build_default_sources
-                mgr = ModelManager(build_default_sources(self.settings))
+                mgr = self.window.get_model_manager()
                 ok, err = mgr.load_model(provider_name, model)
                 if ok:
                     import time
@@ -1500,7 +1763,7 @@ class ChatController:
 
         self.worker = ChatWorker(
             provider,
-            self.chat_history,
+            self._history_window(),
             model,
             [],
             system_prompt,
@@ -1508,12 +1771,12 @@ class ChatController:
             enabled_tools=self.window.project_manager.get_enabled_tools(),
             mode=self.chat_mode,
         )
-        self.worker.response_thinking_start.connect(self.on_chat_thinking_start)
-        self.worker.response_thinking_chunk.connect(self.on_chat_thinking_chunk)
-        self.worker.response_thinking_done.connect(self.on_chat_thinking_done)
-        self.worker.response_chunk.connect(self.on_chat_chunk)
-        self.worker.response_received.connect(self.on_chat_response)
-        self.worker.start()
+        self.worker.signals.response_thinking_start.connect(self.on_chat_thinking_start)
+        self.worker.signals.response_thinking_chunk.connect(self.on_chat_thinking_chunk)
+        self.worker.signals.response_thinking_done.connect(self.on_chat_thinking_done)
+        self.worker.signals.response_chunk.connect(self.on_chat_chunk)
+        self.worker.signals.response_received.connect(self.on_chat_response)
+        self._start_chat_worker(self.worker)
         self.window._update_token_dashboard()
 
     def handle_continue(self):
@@ -1533,7 +1796,7 @@ class ChatController:
         # Clear chat history and UI
         self.chat_history = []
         self.window.chat.clear_chat()
-        self.pending_edits = {}
+        self.pending_edits.clear()
         
         # Clear selection info
         self._last_selection_info = None
@@ -1625,12 +1888,11 @@ class ChatController:
                 except Exception:
                     pass
                 self.window.chat.append_message("System", f"Model '{model}' is not loaded. Loading now…")
-                from core.model_manager import ModelManager, build_default_sources
                 # Map deprecated name if needed
                 if provider_name == "LM Studio":
                     provider_name = "LM Studio (Native SDK)"
                     self.settings.setValue("llm_provider", provider_name)
-                mgr = ModelManager(build_default_sources(self.settings))
+                mgr = self.window.get_model_manager()
                 ok, err = mgr.load_model(provider_name, model)
                 if ok:
                     import time
@@ -1659,7 +1921,7 @@ class ChatController:
         
         # Build system prompt
         system_prompt = self.window.project_manager.get_system_prompt(
-            self.settings.value("system_prompt", "You are Inkwell AI, a creative writing assistant.")
+            self.settings.value("system_prompt", DEFAULT_SYSTEM_PROMPT)
         )
         
         # Include project structure
@@ -1667,12 +1929,12 @@ class ChatController:
             structure = self.window.project_manager.get_project_structure()
             if len(structure) > 20000:
                 structure = structure[:20000] + "\n... (truncated)"
-            system_prompt += f"\n\nProject Structure:\n{structure}"
+            system_prompt = "".join((system_prompt, "\n\nProject Structure:\n", structure))
         
         enabled_tools = self.window.project_manager.get_enabled_tools()
         self.worker = ChatWorker(
             provider,
-            self.chat_history,
+            self._history_window(),
             model,
             context,
             system_prompt,
@@ -1680,12 +1942,12 @@ class ChatController:
             enabled_tools=enabled_tools,
             mode=self.chat_mode,
         )
-        self.worker.response_thinking_start.connect(self.on_chat_thinking_start)
-        self.worker.response_thinking_chunk.connect(self.on_chat_thinking_chunk)
-        self.worker.response_thinking_done.connect(self.on_chat_thinking_done)
-        self.worker.response_chunk.connect(self.on_chat_chunk)
-        self.worker.response_received.connect(self.on_chat_response)
-        self.worker.start()
+        self.worker.signals.response_thinking_start.connect(self.on_chat_thinking_start)
+        self.worker.signals.response_thinking_chunk.connect(self.on_chat_thinking_chunk)
+        self.worker.signals.response_thinking_done.connect(self.on_chat_thinking_done)
+        self.worker.signals.response_chunk.connect(self.on_chat_chunk)
+        self.worker.signals.response_received.connect(self.on_chat_response)
+        self._start_chat_worker(self.worker)
 
     def handle_message_deleted(self, msg_index):
         """Handle message deletion from chat history.
@@ -1717,7 +1979,7 @@ class ChatController:
             print("DEBUG: No project path, cannot save chat history")
             return
             
-        key = hashlib.md5(project_path.encode()).hexdigest()
+        key = project_settings_key(project_path)
         
         # Save chat history
         import json
@@ -1732,9 +1994,7 @@ class ChatController:
         
         # Get existing sessions
         sessions_key = f"chat_history/{key}"
-        existing = self.settings.value(sessions_key, [])
-        if not isinstance(existing, list):
-            existing = []
+        existing = settings_list(self.settings, sessions_key)
         
         existing.append(session_data)
         
@@ -1742,7 +2002,6 @@ class ChatController:
         existing = existing[-50:]
         
         self.settings.setValue(sessions_key, existing)
-        self.settings.sync()
         
         print(f"DEBUG: Chat session saved. Total sessions for this project: {len(existing)}")
 
@@ -1753,6 +2012,7 @@ class ChatController:
             return
         
         project_path = self.window.project_manager.root_path
+        from gui.dialogs.chat_history_dialog import ChatHistoryDialog
         dialog = ChatHistoryDialog(self.settings, self.window, project_path)
         dialog.message_copy_requested.connect(self.copy_message_to_current_chat)
         dialog.exec()
@@ -1889,6 +2149,7 @@ class ChatController:
                 except:
                     old_content = ""
                     
+                from gui.dialogs.diff_dialog import DiffDialog
                 dialog = DiffDialog(path, old_content, new_content, parent=self.window)
                 if dialog.exec():
                     # Apply the edit - update editor only, don't save to disk
@@ -1937,6 +2198,7 @@ class ChatController:
         batch = self.pending_edit_batches[batch_id]
         
         # Show batch diff dialog
+        from gui.dialogs.batch_diff_dialog import BatchDiffDialog
         dialog = BatchDiffDialog(batch, parent=self.window)
         if dialog.exec():
             # Apply enabled edits
@@ -2041,7 +2303,7 @@ class ChatController:
         # Drop line markers or closers
         if '\n' in path:
             path = path.splitlines()[0].strip()
-        path = re.split(r"\s+L\d+:", path)[0].strip()
+        path = _PATH_LINE_SUFFIX_RE.split(path)[0].strip()
         
         for marker in (":::END:::", ":::END", ":::"):
             if marker in path:
@@ -2107,15 +2369,13 @@ class ChatController:
         Returns list of (path, body) tuples.
         """
         # Fenced PATCH blocks
-        fenced_patch_pattern = r"```[a-z]*\s*\n\s*:::PATCH\s+([^\n:]+)\s*(?:::\s*)?\n((?:(?!:::END:::)[\s\S])*?)\s*:::END:::\s*\n```"
-        fenced_matches = re.findall(fenced_patch_pattern, response, re.DOTALL | re.IGNORECASE)
+        fenced_matches = _FENCED_PATCH_RE.findall(response)
         
         # Remove fenced blocks from response to avoid double-parsing
-        response_no_fenced = re.sub(fenced_patch_pattern, '', response, flags=re.DOTALL | re.IGNORECASE)
+        response_no_fenced = _FENCED_PATCH_RE.sub('', response) if fenced_matches else response
         
         # Bare PATCH blocks (allow optional closing ::: after path)
-        patch_pattern = r":::PATCH\s+([^\n]+?)\s*(?:::\s*)?\n(.*?)(?:\s*(?::::END:::|:::END|:::)|\s*$)"
-        bare_matches = re.findall(patch_pattern, response_no_fenced, re.DOTALL)
+        bare_matches = _PATCH_RE.findall(response_no_fenced)
         
         all_matches = list(fenced_matches) + list(bare_matches)
         
@@ -2130,13 +2390,12 @@ class ChatController:
         
         return unique
 
-    def _process_patch_blocks(self, patch_matches, display_response, active_path, next_edit_id, non_text_extensions):
+    def _process_patch_blocks(self, patch_matches, display_response, active_path, next_edit_id):
         """Process PATCH blocks and append review links."""
         def _clean_patch_body(body: str) -> str:
             cleaned = body.strip()
-            link_pattern = r'<br><b><a href="edit:[^"]+">.*?</a></b><br>'
-            if re.search(link_pattern, cleaned):
-                cleaned = re.sub(link_pattern, '', cleaned).strip()
+            if _EDIT_LINK_RE.search(cleaned):
+                cleaned = _EDIT_LINK_RE.sub('', cleaned).strip()
             if ':::END:::' in cleaned:
                 cleaned = cleaned.split(':::END:::')[0]
             return cleaned
@@ -2157,7 +2416,7 @@ class ChatController:
                 continue
 
             file_ext = os.path.splitext(m_path)[1].lower()
-            if file_ext in non_text_extensions:
+            if file_ext in _NON_TEXT_EXTENSIONS:
                 m_path = os.path.splitext(m_path)[0] + '.txt'
 
             dedupe_key = (m_path, m_new_content)
@@ -2166,7 +2425,7 @@ class ChatController:
             seen.add(dedupe_key)
 
             m_id = next_edit_id()
-            self.pending_edits[m_id] = (m_path, m_new_content)
+            self._add_pending_edit(m_id, m_path, m_new_content)
             links_html.append(f'<br><b><a href="edit:{m_id}">Review Changes for {m_path}</a></b><br>')
 
             # Strip original patch block from the displayed response to avoid clutter
@@ -2178,12 +2437,9 @@ class ChatController:
 
         return display_response
 
-    def _process_diff_blocks(self, processing_response, display_response, active_path, next_edit_id, non_text_extensions):
+    def _process_diff_blocks(self, processing_response, display_response, active_path, next_edit_id):
         """Process unified diff blocks."""
-        diff_pattern = r"```diff\s*\n(.*?)```"
-        diff_blocks = re.findall(diff_pattern, processing_response, re.DOTALL)
-        
-        if not diff_blocks:
+        if not _DIFF_BLOCK_RE.search(processing_response):
             return display_response
 
         def replace_diff_block(match):
@@ -2200,30 +2456,27 @@ class ChatController:
                 return match.group(0)
 
             file_ext = os.path.splitext(norm_path)[1].lower()
-            if file_ext in non_text_extensions:
+            if file_ext in _NON_TEXT_EXTENSIONS:
                 norm_path = os.path.splitext(norm_path)[0] + '.txt'
 
             m_id = next_edit_id()
-            self.pending_edits[m_id] = (norm_path, m_new)
+            self._add_pending_edit(m_id, norm_path, m_new)
             return f'<br><b><a href="edit:{m_id}">Review Changes for {norm_path}</a></b><br>'
 
-        return re.sub(diff_pattern, replace_diff_block, display_response, flags=re.DOTALL)
+        return _DIFF_BLOCK_RE.sub(replace_diff_block, display_response)
 
     def _process_code_blocks(self, processing_response, display_response, active_path, next_edit_id, has_explicit_edits):
         """Process fallback code blocks as full-file updates."""
-        code_block_pattern = r"```(?:markdown|md|text)?\s*\n(.*?)```"
-        code_blocks = re.findall(code_block_pattern, processing_response, re.DOTALL)
-        
-        if not code_blocks or not active_path or has_explicit_edits:
+        if not active_path or has_explicit_edits or not _CODE_BLOCK_RE.search(processing_response):
             return display_response
 
         def replace_code_block(m):
             full_text = m.group(1)
             edit_id = next_edit_id()
-            self.pending_edits[edit_id] = (active_path, full_text.strip())
+            self._add_pending_edit(edit_id, active_path, full_text.strip())
             return f'<br><b><a href="edit:{edit_id}">Review Changes for {active_path}</a></b><br>'
 
-        return re.sub(code_block_pattern, replace_code_block, display_response, flags=re.DOTALL)
+        return _CODE_BLOCK_RE.sub(replace_code_block, display_response)
 
     def _extract_diff_target_path(self, diff_text: str) -> str | None:
         """Extract target file path from unified diff headers."""
@@ -2241,6 +2494,21 @@ class ChatController:
                 return p
         return None
 
+    def _new_edit_id(self) -> str:
+        """Short random id for an edit link.
+
+        The prefix keeps it from parsing as an int, which ChatWidget treats
+        as a message index.
+        """
+        return "e" + secrets.token_urlsafe(6)
+
+    def _add_pending_edit(self, edit_id, path, content):
+        """Remember an edit for review, dropping the oldest beyond MAX_PENDING_EDITS."""
+        self.pending_edits[edit_id] = (path, content)
+        self.pending_edits.move_to_end(edit_id)
+        while len(self.pending_edits) > MAX_PENDING_EDITS:
+            self.pending_edits.popitem(last=False)
+
     def _strip_unknown_edit_links(self, html: str) -> str:
         """Remove edit links that don't correspond to pending edits."""
         def check_link(match):
@@ -2249,7 +2517,7 @@ class ChatController:
                 return match.group(0)
             return ""
         
-        return re.sub(r'<br><b><a href="edit:([^"]+)">.*?</a></b><br>', check_link, html)
+        return _EDIT_LINK_RE.sub(check_link, html)
 
     def _clean_patch_body(self, patch_body: str) -> str:
         """Clean patch body by removing citations and footnote markers.
@@ -2265,12 +2533,10 @@ class ChatController:
             Cleaned patch body
         """
         # Remove Citations section (everything from **Citations:** onwards)
-        citations_pattern = r'\*\*Citations:\*\*.*$'
-        patch_body = re.sub(citations_pattern, '', patch_body, flags=re.DOTALL | re.MULTILINE)
+        patch_body = _CITATIONS_RE.sub('', patch_body)
         
         # Remove footnote markers like [^1], [^2], [^3], etc.
-        footnote_pattern = r'\[\^\d+\]'
-        patch_body = re.sub(footnote_pattern, '', patch_body)
+        patch_body = _FOOTNOTE_RE.sub('', patch_body)
         
         # Clean up any trailing whitespace left behind
         patch_body = patch_body.rstrip()
@@ -2314,7 +2580,7 @@ class ChatController:
                 continue
             
             # Range replacement: L10-L15:
-            m_range = re.match(r"L(\d+)\s*-\s*L(\d+):\s*(.*)", line)
+            m_range = _PATCH_RANGE_RE.match(line)
             if m_range:
                 start_no = int(m_range.group(1))
                 end_no = int(m_range.group(2))
@@ -2327,7 +2593,7 @@ class ChatController:
                 # Capture subsequent lines
                 while i < len(raw_lines):
                     peek = raw_lines[i]
-                    if re.match(r"\s*L\d+:", peek):
+                    if _PATCH_LINE_START_RE.match(peek):
                         break
                     repl_lines.append(peek)
                     i += 1
@@ -2344,7 +2610,7 @@ class ChatController:
                 continue
             
             # Line replacement: L42: old => new
-            m = re.match(r"L(\d+):\s*(.+?)\s*(?:=>|->)\s*(.+)", line)
+            m = _PATCH_REPLACE_RE.match(line)
             if m:
                 line_no = int(m.group(1))
                 old_text = m.group(2)
@@ -2360,7 +2626,7 @@ class ChatController:
                 continue
             
             # Simple replacement/insertion: L42: new text (can span multiple lines)
-            m2 = re.match(r"L(\d+):\s*(.*)", line)
+            m2 = _PATCH_LINE_RE.match(line)
             if m2:
                 line_no = int(m2.group(1))
                 first_line = m2.group(2).strip()
@@ -2374,10 +2640,10 @@ class ChatController:
                 while i < len(raw_lines):
                     peek = raw_lines[i]
                     # Stop if we hit another line directive
-                    if re.match(r"\s*L\d+:", peek):
+                    if _PATCH_LINE_START_RE.match(peek):
                         break
                     # Stop if we hit a range directive
-                    if re.match(r"\s*L\d+\s*-\s*L\d+:", peek):
+                    if _PATCH_RANGE_START_RE.match(peek):
                         break
                     new_lines.append(peek.rstrip())
                     i += 1
@@ -2425,7 +2691,6 @@ class ChatController:
         while i < len(lines) and (lines[i].startswith('--- ') or lines[i].startswith('+++ ')):
             i += 1
 
-        hunk_header_re = re.compile(r"@@\s*-([0-9]+)(?:,([0-9]+))?\s*\+([0-9]+)(?:,([0-9]+))?\s*@@")
         any_applied = False
 
         while i < len(lines):
@@ -2433,7 +2698,7 @@ class ChatController:
                 i += 1
                 continue
 
-            m = hunk_header_re.match(lines[i])
+            m = _HUNK_HEADER_RE.match(lines[i])
             i += 1
             
             if not m:
@@ -2518,14 +2783,11 @@ class ChatController:
             # Store extra settings for later use (if needed)
             self.tool_worker.extra_settings = extra_settings or {}
             
-            # Connect signals
-            self.tool_worker.finished.connect(self._on_tool_from_menu_finished)
-            
             # Show thinking indicator
             self.window.chat.show_thinking()
             
             # Start worker
-            self.tool_worker.start()
+            self._start_tool_worker(self.tool_worker, self._on_tool_from_menu_finished)
             
         except Exception as e:
             QMessageBox.critical(
@@ -2578,14 +2840,11 @@ class ChatController:
             # Store settings including page
             self.tool_worker.extra_settings = settings_with_page
             
-            # Connect signals
-            self.tool_worker.finished.connect(self._on_tool_from_menu_finished)
-            
             # Show thinking indicator
             self.window.chat.show_thinking()
             
             # Start worker
-            self.tool_worker.start()
+            self._start_tool_worker(self.tool_worker, self._on_tool_from_menu_finished)
             
         except Exception as e:
             QMessageBox.critical(
@@ -2,8 +2,17 @@
 
 import os
 import shutil
+from PySide6.QtCore import QThreadPool, QTimer
 from PySide6.QtWidgets import QMessageBox
 
+from gui.workers import FileReadWorker, ReindexWorker, SaveWorker, start_pooled
+
+# Saves within this window are re-indexed together, off the UI thread
+REINDEX_DEBOUNCE_MS = 1500
+
+# Opened by the image viewer, which loads them itself
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.bmp'}
+
 
 class EditorController:
     """Handles file operations (rename, move, undo/redo)."""
@@ -17,6 +26,24 @@ class EditorController:
         self.window = main_window
         self.file_ops_history = []  # list of {"type": "rename"|"move", "old": str, "new": str}
         self.file_ops_redo = []     # stack for redo
+        self._pending_reindex = {}  # path -> content saved since the last reindex (None: read from disk)
+        self._pending_removals = set()  # paths renamed or moved away since the last reindex
+        self._reindex_engine = None  # RAG engine the pending saves belong to
+        self._reindex_workers = set()  # keeps pool runnables alive until finished
+        self._reindex_timer = QTimer()
+        self._reindex_timer.setSingleShot(True)
+        self._reindex_timer.setInterval(REINDEX_DEBOUNCE_MS)
+        self._reindex_timer.timeout.connect(self._flush_reindex)
+        self._save_workers = {}  # path -> in-flight SaveWorker
+        self._pending_saves = {}  # path -> newer content to write once that finishes
+        self._read_workers = {}  # path -> FileReadWorker for files being opened
+        # Save action state changes are applied once per event-loop turn
+        self._save_enabled = False  # state last applied to the Save action
+        self._save_enabled_pending = False
+        self._save_state_timer = QTimer()
+        self._save_state_timer.setSingleShot(True)
+        self._save_state_timer.setInterval(0)
+        self._save_state_timer.timeout.connect(self._apply_save_button_state)
         
     def on_file_renamed(self, old_path, new_path):
         """Handle file rename from sidebar.
@@ -33,26 +60,10 @@ class EditorController:
         self.file_ops_history.append({"type": "rename", "old": old_path, "new": new_path})
         self.file_ops_redo.clear()  # Clear redo stack on new action
         
-        # Update RAG index for renamed files
-        try:
-            if self.window.rag_engine and new_path.endswith((".md", ".txt")):
-                # Remove old chunks
-                self.window.rag_engine.remove_file(old_path)
-                # Index with new path
-                try:
-                    with open(new_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    self.window.rag_engine.index_file(new_path, content)
-                    # Update sidebar status
-                    if hasattr(self.window, 'sidebar'):
-                        self.window.sidebar.update_file_status("Project")
-                        # Also update Assets if it's a section
-                        if "Assets" in self.window.sidebar.project_sections:
-                            self.window.sidebar.update_file_status("Assets")
-                except Exception as e:
-                    print(f"DEBUG: Failed to reindex renamed file {new_path}: {e}")
-        except Exception as e:
-            print(f"DEBUG: RAG update on rename failed: {e}")
+        # Move the file's chunks to the new path in the background
+        if self.window.rag_engine and new_path.endswith((".md", ".txt")):
+            self.schedule_removal(old_path)
+            self.schedule_reindex(new_path)
         
         # Update project state
         self.window.save_project_state()
@@ -72,42 +83,20 @@ class EditorController:
         self.file_ops_history.append({"type": "move", "old": old_path, "new": new_path})
         self.file_ops_redo.clear()
         
-        # Update RAG index for moved files/folders
-        try:
-            if self.window.rag_engine:
-                # Handle both single file and folder moves
-                if os.path.isfile(new_path) and new_path.endswith((".md", ".txt")):
-                    # Single file move
-                    self.window.rag_engine.remove_file(old_path)
-                    try:
-                        with open(new_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        self.window.rag_engine.index_file(new_path, content)
-                    except Exception as e:
-                        print(f"DEBUG: Failed to reindex moved file {new_path}: {e}")
-                elif os.path.isdir(new_path):
-                    # Folder move - reindex all md/txt files inside
-                    for root, dirs, files in os.walk(new_path):
-                        for file in files:
-                            if file.endswith((".md", ".txt")):
-                                file_new_path = os.path.join(root, file)
-                                # Compute old path
-                                rel_path = os.path.relpath(file_new_path, new_path)
-                                file_old_path = os.path.join(old_path, rel_path)
-                                self.window.rag_engine.remove_file(file_old_path)
-                                try:
-                                    with open(file_new_path, 'r', encoding='utf-8') as f:
-                                        content = f.read()
-                                    self.window.rag_engine.index_file(file_new_path, content)
-                                except Exception as e:
-                                    print(f"DEBUG: Failed to reindex {file_new_path}: {e}")
-                # Update sidebar status
-                if hasattr(self.window, 'sidebar'):
-                    self.window.sidebar.update_file_status("Project")
-                    if "Assets" in self.window.sidebar.project_sections:
-                        self.window.sidebar.update_file_status("Assets")
-        except Exception as e:
-            print(f"DEBUG: RAG update on move failed: {e}")
+        # Move the chunks of moved files/folders to their new paths in the background
+        if self.window.rag_engine:
+            if os.path.isfile(new_path) and new_path.endswith((".md", ".txt")):
+                self.schedule_removal(old_path)
+                self.schedule_reindex(new_path)
+            elif os.path.isdir(new_path):
+                # Folder move - reindex all md/txt files inside
+                for root, dirs, files in os.walk(new_path):
+                    for file in files:
+                        if file.endswith((".md", ".txt")):
+                            file_new_path = os.path.join(root, file)
+                            rel_path = os.path.relpath(file_new_path, new_path)
+                            self.schedule_removal(os.path.join(old_path, rel_path))
+                            self.schedule_reindex(file_new_path)
         
         # Update project state
         self.window.save_project_state()
@@ -189,43 +178,134 @@ class EditorController:
         Args:
             modified: Whether the current document is modified
         """
-        self.window.save_act.setEnabled(modified)
+        self._save_enabled_pending = bool(modified)
+        if not self._save_state_timer.isActive():
+            self._save_state_timer.start()
+
+    def _apply_save_button_state(self):
+        # setEnabled makes every menu and toolbar showing the action update
+        if self._save_enabled_pending != self._save_enabled:
+            self._save_enabled = self._save_enabled_pending
+            self.window.save_act.setEnabled(self._save_enabled)
         
     def save_current_file(self):
-        """Save the currently open file."""
+        """Save the currently open file; the write happens on the thread pool."""
         path, content = self.window.editor.get_current_file()
         if not path or content is None:
             return
         
-        try:
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            self.window.editor.mark_current_saved()
-            self.window.statusBar().showMessage(f"Saved: {os.path.basename(path)}", 3000)
-            # Trigger RAG reindex for saved markdown/text files
+        # Edits made while the write is in flight mark the tab modified again
+        self.window.editor.mark_current_saved()
+        if path in self._save_workers:
+            # Writes to one path stay in order; keep only the newest content
+            self._pending_saves[path] = content
+            return
+        self._start_save(path, content)
+
+    def _start_save(self, path, content):
+        worker = SaveWorker(path, content)
+        self._save_workers[path] = worker
+        worker.signals.saved.connect(lambda p, c=content: self._on_file_saved(p, c))
+        worker.signals.failed.connect(self._on_save_failed)
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_file_saved(self, path, content):
+        self._save_workers.pop(path, None)
+        self.window.statusBar().showMessage(f"Saved: {os.path.basename(path)}", 3000)
+        # Queue a debounced RAG reindex for saved markdown/text files
+        if self.window.rag_engine and path.endswith((".md", ".txt")):
+            self.schedule_reindex(path, content)
+        self._start_pending_save(path)
+
+    def _on_save_failed(self, path, error):
+        self._save_workers.pop(path, None)
+        widget = self.window.editor.open_files.get(path)
+        if hasattr(widget, "set_modified"):
+            widget.set_modified(True)
+        QMessageBox.critical(self.window, "Error", f"Could not save file: {error}")
+        self._start_pending_save(path)
+
+    def _start_pending_save(self, path):
+        content = self._pending_saves.pop(path, None)
+        if content is not None:
+            self._start_save(path, content)
+
+    def flush_saves(self, timeout=5.0):
+        """Wait for in-flight writes and write queued ones directly (used on exit)."""
+        for worker in list(self._save_workers.values()):
+            worker.done_event.wait(timeout)
+        pending, self._pending_saves = self._pending_saves, {}
+        for path, content in pending.items():
             try:
-                if self.window.rag_engine and path.endswith((".md", ".txt")):
-                    self.window.rag_engine.index_file(path, content)
-                    # Update sidebar status indicators
-                    if hasattr(self.window, 'sidebar'):
-                        self.window.sidebar.update_file_status("Project")
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(content)
             except Exception as e:
-                # Non-fatal; log and continue
-                print(f"DEBUG: RAG reindex on save failed for {path}: {e}")
-        except Exception as e:
-            QMessageBox.critical(self.window, "Error", f"Could not save file: {e}")
+                print(f"Error saving {path} on shutdown: {e}")
             
-    def on_file_double_clicked(self, index):
-        """Handle file double-click in sidebar.
+    def _reindex_queue_for_current_engine(self):
+        if self.window.rag_engine is not self._reindex_engine:
+            # Changes queued for another project's index no longer apply
+            self._pending_reindex = {}
+            self._pending_removals = set()
+            self._reindex_engine = self.window.rag_engine
+
+    def schedule_reindex(self, path, content=None):
+        """Re-index a file shortly, coalescing rapid repeated saves.
+
+        Without content the file is read from disk when the reindex runs.
+        """
+        self._reindex_queue_for_current_engine()
+        self._pending_reindex[path] = content
+        self._reindex_timer.start()
+
+    def schedule_removal(self, path):
+        """Drop a file that was renamed or moved away from the index shortly."""
+        self._reindex_queue_for_current_engine()
+        self._pending_reindex.pop(path, None)
+        self._pending_removals.add(path)
+        self._reindex_timer.start()
+
+    def _flush_reindex(self):
+        """Hand all pending changes to a single background reindex."""
+        pending, self._pending_reindex = self._pending_reindex, {}
+        removed, self._pending_removals = self._pending_removals, set()
+        rag_engine = self.window.rag_engine
+        if not (pending or removed) or not rag_engine or rag_engine is not self._reindex_engine:
+            return
+        worker = ReindexWorker(rag_engine, pending, removed)
+        worker.signals.finished.connect(self._on_reindex_finished)
+        start_pooled(worker, self._reindex_workers, worker.signals.finished)
+
+    def _on_reindex_finished(self):
+        # Update sidebar status indicators
+        if hasattr(self.window, 'sidebar'):
+            self.window.sidebar.update_file_status("Project")
+            if "Assets" in self.window.sidebar.project_sections:
+                self.window.sidebar.update_file_status("Assets")
+
+    def on_file_double_clicked(self, file_path):
+        """Open a file double-clicked in the sidebar, reading text off the UI thread.
         
         Args:
-            index: QModelIndex of clicked item
+            file_path: Full path to the file that was clicked
         """
-        path = self.window.sidebar.model.filePath(index)
-        if os.path.isfile(path):
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                self.window.editor.open_file(path, content)
-            except Exception as e:
-                QMessageBox.warning(self.window, "Error", f"Could not open file: {e}")
+        if not os.path.isfile(file_path):
+            return
+        editor = self.window.editor
+        # Already open (content ignored, keeps unsaved changes) or an image the viewer loads itself
+        if file_path in editor.open_files or os.path.splitext(file_path)[1].lower() in IMAGE_EXTENSIONS:
+            editor.open_file(file_path, None)
+            return
+        if file_path in self._read_workers:
+            return  # Already loading
+        worker = FileReadWorker(self.window.project_manager.read_file, file_path)
+        self._read_workers[file_path] = worker
+        worker.signals.loaded.connect(self._on_file_loaded)
+        self.window.statusBar().showMessage(f"Opening {os.path.basename(file_path)}...")
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_file_loaded(self, path, content):
+        self._read_workers.pop(path, None)
+        self.window.statusBar().clearMessage()
+        if content is not None:
+            self.window.editor.open_file(path, content)
@@ -1,7 +1,79 @@
 """Menu bar and toolbar manager for MainWindow."""
 
 from PySide6.QtWidgets import QMenuBar, QToolBar, QStyle
-from PySide6.QtGui import QAction, QIcon, QKeySequence
+from PySide6.QtGui import QAction, QKeySequence
+
+from gui.icons import get_icon
+
+
+# Action tables: (text, slot path on the window, icon, shortcut, status tip); None is a separator.
+# Icons are a QStyle pixmap, a theme name, or (theme name, fallback QStyle pixmap).
+_FILE_MENU = [
+    ("Open Project Folder", "open_project_dialog", None, None, None),
+    ("Save", "save_current_file", None, "Ctrl+S", None),
+    ("Close Project", "close_project", None, None, None),
+    ("Exit", "close", None, None, None),
+]
+
+_EDIT_MENU = [
+    ("Undo", "editor.undo", None, "Ctrl+Z", None),
+    ("Redo", "editor.redo", None, "Ctrl+Y", None),
+    None,
+    ("Cut", "editor.cut", None, "Ctrl+X", None),
+    ("Copy", "editor.copy", None, "Ctrl+C", None),
+    ("Paste", "editor.paste", None, "Ctrl+V", None),
+    None,
+    ("Find & Replace...", "editor.show_search", None, "Ctrl+H", None),
+]
+
+_SETTINGS_MENU = [
+    ("Preferences...", "open_settings_dialog", None, None, None),
+    ("Model Manager...", "open_model_manager", None, None, None),
+]
+
+_DEBUG_MENU = [
+    ("Export Debug Log & Chat", "export_debug_log", None, None, None),
+]
+
+_VIEW_MENU = [
+    ("Image Studio", "open_image_studio", None, None, None),
+    ("Chat History...", "open_chat_history", None, None, None),
+]
+
+_MAIN_TOOLBAR = [
+    ("Save", "save_current_file", QStyle.SP_DriveFDIcon, None, "Save current file"),
+    None,
+    ("Undo File Change", "undo_file_change", ("edit-undo", QStyle.SP_ArrowBack), "Ctrl+Alt+Z",
+     "Undo last file rename/move"),
+    ("Redo File Change", "redo_file_change", ("edit-redo", QStyle.SP_ArrowForward), "Ctrl+Alt+Y",
+     "Redo last undone file rename/move"),
+    ("Open Project", "open_project_dialog", QStyle.SP_DirOpenIcon, None, "Open a project folder"),
+    ("Close Project", "close_project", QStyle.SP_DialogCloseButton, None, "Close current project"),
+    None,
+    ("Cut", "editor.cut", "edit-cut", None, None),
+    ("Copy", "editor.copy", "edit-copy", None, None),
+    ("Paste", "editor.paste", "edit-paste", None, None),
+    None,
+    ("Undo", "editor.undo", QStyle.SP_ArrowBack, None, None),
+    ("Redo", "editor.redo", QStyle.SP_ArrowForward, None, None),
+    None,
+    ("Image Studio", "open_image_studio", QStyle.SP_DesktopIcon, None, "Open Image Studio"),
+    ("Settings", "open_settings_dialog", QStyle.SP_FileDialogDetailedView, None, None),
+]
+
+_FORMAT_TOOLBAR = [
+    ("Bold", "editor.format_bold", "format-text-bold", None, None),
+    ("Italic", "editor.format_italic", "format-text-italic", None, None),
+    ("Code Block", "editor.format_code_block", "format-text-code", None, None),
+    ("Quote", "editor.format_quote", "format-text-blockquote", None, None),
+    None,
+    ("H1", "editor.format_h1", None, None, None),
+    ("H2", "editor.format_h2", None, None, None),
+    ("H3", "editor.format_h3", None, None, None),
+    None,
+    ("Link", "editor.insert_link", "insert-link", None, None),
+    ("Image", "editor.insert_image", "insert-image", None, None),
+]
 
 
 class MenuBarManager:
@@ -27,62 +99,11 @@ class MenuBarManager:
         
     def _create_file_menu(self):
         """Create File menu."""
-        file_menu = self.menu_bar.addMenu("File")
-        
-        open_action = QAction("Open Project Folder", self.window)
-        open_action.triggered.connect(self.window.open_project_dialog)
-        file_menu.addAction(open_action)
-        
-        save_action = QAction("Save", self.window)
-        save_action.setShortcut("Ctrl+S")
-        save_action.triggered.connect(self.window.save_current_file)
-        file_menu.addAction(save_action)
-        
-        close_project_action = QAction("Close Project", self.window)
-        close_project_action.triggered.connect(self.window.close_project)
-        file_menu.addAction(close_project_action)
-        
-        exit_action = QAction("Exit", self.window)
-        exit_action.triggered.connect(self.window.close)
-        file_menu.addAction(exit_action)
+        self._add_actions(self.menu_bar.addMenu("File"), _FILE_MENU)
         
     def _create_edit_menu(self):
         """Create Edit menu."""
-        edit_menu = self.menu_bar.addMenu("Edit")
-        
-        undo_action = QAction("Undo", self.window)
-        undo_action.setShortcut("Ctrl+Z")
-        undo_action.triggered.connect(lambda: self.window.editor.undo())
-        edit_menu.addAction(undo_action)
-        
-        redo_action = QAction("Redo", self.window)
-        redo_action.setShortcut("Ctrl+Y")
-        redo_action.triggered.connect(lambda: self.window.editor.redo())
-        edit_menu.addAction(redo_action)
-        
-        edit_menu.addSeparator()
-        
-        cut_action = QAction("Cut", self.window)
-        cut_action.setShortcut("Ctrl+X")
-        cut_action.triggered.connect(lambda: self.window.editor.cut())
-        edit_menu.addAction(cut_action)
-        
-        copy_action = QAction("Copy", self.window)
-        copy_action.setShortcut("Ctrl+C")
-        copy_action.triggered.connect(lambda: self.window.editor.copy())
-        edit_menu.addAction(copy_action)
-        
-        paste_action = QAction("Paste", self.window)
-        paste_action.setShortcut("Ctrl+V")
-        paste_action.triggered.connect(lambda: self.window.editor.paste())
-        edit_menu.addAction(paste_action)
-        
-        edit_menu.addSeparator()
-        
-        find_action = QAction("Find & Replace...", self.window)
-        find_action.setShortcut("Ctrl+H")
-        find_action.triggered.connect(lambda: self.window.editor.show_search())
-        edit_menu.addAction(find_action)
+        self._add_actions(self.menu_bar.addMenu("Edit"), _EDIT_MENU)
         
     def _create_tools_menu(self):
         """Create Tools menu with dialog-enabled tools."""
@@ -105,23 +126,23 @@ class MenuBarManager:
             placeholder.setEnabled(False)
             tools_menu.addAction(placeholder)
         else:
-            # Add actions for each dialog-enabled tool
-            for tool_name, tool in sorted(dialog_tools):
-                action = QAction(tool_name, self.window)
-                action.triggered.connect(lambda checked=False, t=tool: self.window.on_tool_dialog_triggered(t))
-                tools_menu.addAction(action)
+            # Add actions for each dialog-enabled tool; one menu-level connection
+            # dispatches them all, so no per-action closures are kept alive
+            self._dialog_tools = {}
+            for tool_name, tool in sorted(dialog_tools, key=lambda item: item[0]):
+                self._dialog_tools[tools_menu.addAction(tool_name)] = tool
+            tools_menu.triggered.connect(self._on_tool_action)
+
+    def _on_tool_action(self, action):
+        """Open the dialog for the tool behind a Tools menu action."""
+        tool = self._dialog_tools.get(action)
+        if tool is not None:
+            self.window.on_tool_dialog_triggered(tool)
         
     def _create_settings_menu(self):
         """Create Settings menu."""
         settings_menu = self.menu_bar.addMenu("Settings")
-        settings_action = QAction("Preferences...", self.window)
-        settings_action.triggered.connect(self.window.open_settings_dialog)
-        settings_menu.addAction(settings_action)
-
-        model_mgr_action = QAction("Model Manager...", self.window)
-        model_mgr_action.triggered.connect(self.window.open_model_manager)
-        settings_menu.addAction(model_mgr_action)
-        
+        self._add_actions(settings_menu, _SETTINGS_MENU)
         settings_menu.addSeparator()
         
         # Spell-checking toggle
@@ -151,110 +172,49 @@ class MenuBarManager:
         
     def _create_debug_menu(self):
         """Create Debug menu."""
-        debug_menu = self.menu_bar.addMenu("Debug")
-        export_debug_action = QAction("Export Debug Log & Chat", self.window)
-        export_debug_action.triggered.connect(self.window.export_debug_log)
-        debug_menu.addAction(export_debug_action)
+        self._add_actions(self.menu_bar.addMenu("Debug"), _DEBUG_MENU)
         
     def _create_view_menu(self):
         """Create View menu."""
-        view_menu = self.menu_bar.addMenu("View")
-        
-        image_studio_action = QAction("Image Studio", self.window)
-        image_studio_action.triggered.connect(self.window.open_image_studio)
-        view_menu.addAction(image_studio_action)
-        
-        chat_history_action = QAction("Chat History...", self.window)
-        chat_history_action.triggered.connect(self.window.open_chat_history)
-        view_menu.addAction(chat_history_action)
-        
+        self._add_actions(self.menu_bar.addMenu("View"), _VIEW_MENU)
+        
+    def _resolve_slot(self, path):
+        """Look up a dotted attribute path such as "editor.undo" on the window."""
+        target = self.window
+        for name in path.split("."):
+            target = getattr(target, name)
+        return target
+
+    def _add_actions(self, container, spec):
+        """Create QActions from a spec table and add them to a menu or toolbar.
+
+        Each entry is (text, slot path, icon, shortcut, status tip); None adds a separator.
+        Returns the created actions keyed by text.
+        """
+        actions = {}
+        for entry in spec:
+            if entry is None:
+                container.addSeparator()
+                continue
+            text, slot, icon_spec, shortcut, tip = entry
+            icon = get_icon(icon_spec) if icon_spec is not None else None
+            action = QAction(icon, text, self.window) if icon is not None else QAction(text, self.window)
+            if shortcut:
+                action.setShortcut(QKeySequence(shortcut))
+            if tip:
+                action.setStatusTip(tip)
+            action.triggered.connect(self._resolve_slot(slot))
+            container.addAction(action)
+            actions[text] = action
+        return actions
+
     def create_toolbar(self):
         """Create main toolbar."""
         toolbar = self.window.addToolBar("Main Toolbar")
         toolbar.setMovable(False)
-        style = self.window.style()
-        
-        # Save File
-        self.window.save_act = QAction(style.standardIcon(QStyle.SP_DriveFDIcon), "Save", self.window)
-        self.window.save_act.setStatusTip("Save current file")
-        self.window.save_act.triggered.connect(self.window.save_current_file)
+        actions = self._add_actions(toolbar, _MAIN_TOOLBAR)
+        self.window.save_act = actions["Save"]
         self.window.save_act.setEnabled(False)
-        toolbar.addAction(self.window.save_act)
-        
-        toolbar.addSeparator()
-
-        # Undo File Change
-        file_undo_act = QAction(QIcon.fromTheme("edit-undo"), "Undo File Change", self.window)
-        if file_undo_act.icon().isNull():
-            file_undo_act.setIcon(style.standardIcon(QStyle.SP_ArrowBack))
-        file_undo_act.setStatusTip("Undo last file rename/move")
-        file_undo_act.setShortcut(QKeySequence("Ctrl+Alt+Z"))
-        file_undo_act.triggered.connect(self.window.undo_file_change)
-        toolbar.addAction(file_undo_act)
-
-        # Redo File Change
-        file_redo_act = QAction(QIcon.fromTheme("edit-redo"), "Redo File Change", self.window)
-        if file_redo_act.icon().isNull():
-            file_redo_act.setIcon(style.standardIcon(QStyle.SP_ArrowForward))
-        file_redo_act.setStatusTip("Redo last undone file rename/move")
-        file_redo_act.setShortcut(QKeySequence("Ctrl+Alt+Y"))
-        file_redo_act.triggered.connect(self.window.redo_file_change)
-        toolbar.addAction(file_redo_act)
-        
-        # Open Project
-        open_act = QAction(style.standardIcon(QStyle.SP_DirOpenIcon), "Open Project", self.window)
-        open_act.setStatusTip("Open a project folder")
-        open_act.triggered.connect(self.window.open_project_dialog)
-        toolbar.addAction(open_act)
-        
-        # Close Project
-        close_act = QAction(style.standardIcon(QStyle.SP_DialogCloseButton), "Close Project", self.window)
-        close_act.setStatusTip("Close current project")
-        close_act.triggered.connect(self.window.close_project)
-        toolbar.addAction(close_act)
-        
-        toolbar.addSeparator()
-        
-        # Cut
-        cut_act = QAction(QIcon.fromTheme("edit-cut"), "Cut", self.window)
-        cut_act.triggered.connect(lambda: self.window.editor.cut())
-        toolbar.addAction(cut_act)
-        
-        # Copy
-        copy_act = QAction(QIcon.fromTheme("edit-copy"), "Copy", self.window)
-        copy_act.triggered.connect(lambda: self.window.editor.copy())
-        toolbar.addAction(copy_act)
-        
-        # Paste
-        paste_act = QAction(QIcon.fromTheme("edit-paste"), "Paste", self.window)
-        paste_act.triggered.connect(lambda: self.window.editor.paste())
-        toolbar.addAction(paste_act)
-        
-        toolbar.addSeparator()
-        
-        # Undo
-        undo_act = QAction(style.standardIcon(QStyle.SP_ArrowBack), "Undo", self.window)
-        undo_act.triggered.connect(lambda: self.window.editor.undo())
-        toolbar.addAction(undo_act)
-        
-        # Redo
-        redo_act = QAction(style.standardIcon(QStyle.SP_ArrowForward), "Redo", self.window)
-        redo_act.triggered.connect(lambda: self.window.editor.redo())
-        toolbar.addAction(redo_act)
-        
-        toolbar.addSeparator()
-        
-        # Image Studio
-        img_act = QAction(style.standardIcon(QStyle.SP_DesktopIcon), "Image Studio", self.window)
-        img_act.setStatusTip("Open Image Studio")
-        img_act.triggered.connect(self.window.open_image_studio)
-        toolbar.addAction(img_act)
-        
-        # Settings
-        settings_act = QAction(style.standardIcon(QStyle.SP_FileDialogDetailedView), "Settings", self.window)
-        settings_act.triggered.connect(self.window.open_settings_dialog)
-        toolbar.addAction(settings_act)
-        
         self.window.toolbar = toolbar
         
     def create_format_toolbar(self):
@@ -262,56 +222,5 @@ class MenuBarManager:
         self.window.addToolBarBreak()  # Start new row
         format_toolbar = self.window.addToolBar("Formatting")
         format_toolbar.setMovable(False)
-        
-        # Bold
-        bold_act = QAction(QIcon.fromTheme("format-text-bold"), "Bold", self.window)
-        bold_act.triggered.connect(lambda: self.window.editor.format_bold())
-        format_toolbar.addAction(bold_act)
-        
-        # Italic
-        italic_act = QAction(QIcon.fromTheme("format-text-italic"), "Italic", self.window)
-        italic_act.triggered.connect(lambda: self.window.editor.format_italic())
-        format_toolbar.addAction(italic_act)
-        
-        # Code Block
-        code_act = QAction(QIcon.fromTheme("format-text-code"), "Code Block", self.window) 
-        if code_act.icon().isNull():
-            code_act.setText("Code Block")
-        code_act.triggered.connect(lambda: self.window.editor.format_code_block())
-        format_toolbar.addAction(code_act)
-        
-        # Quote
-        quote_act = QAction(QIcon.fromTheme("format-text-blockquote"), "Quote", self.window)
-        if quote_act.icon().isNull():
-            quote_act.setText("Quote")
-        quote_act.triggered.connect(lambda: self.window.editor.format_quote())
-        format_toolbar.addAction(quote_act)
-        
-        format_toolbar.addSeparator()
-        
-        # Headers
-        h1_act = QAction("H1", self.window)
-        h1_act.triggered.connect(lambda: self.window.editor.format_h1())
-        format_toolbar.addAction(h1_act)
-        
-        h2_act = QAction("H2", self.window)
-        h2_act.triggered.connect(lambda: self.window.editor.format_h2())
-        format_toolbar.addAction(h2_act)
-        
-        h3_act = QAction("H3", self.window)
-        h3_act.triggered.connect(lambda: self.window.editor.format_h3())
-        format_toolbar.addAction(h3_act)
-        
-        format_toolbar.addSeparator()
-        
-        # Link
-        link_act = QAction(QIcon.fromTheme("insert-link"), "Link", self.window)
-        link_act.triggered.connect(lambda: self.window.editor.insert_link())
-        format_toolbar.addAction(link_act)
-        
-        # Image
-        image_act = QAction(QIcon.fromTheme("insert-image"), "Image", self.window)
-        image_act.triggered.connect(lambda: self.window.editor.insert_image())
-        format_toolbar.addAction(image_act)
-        
+        self._add_actions(format_toolbar, _FORMAT_TOOLBAR)
         self.window.format_toolbar = format_toolbar
@@ -1,15 +1,23 @@
 """Controller for project lifecycle and RAG operations."""
 
 import os
-import hashlib
-from PySide6.QtWidgets import QFileDialog, QMessageBox, QProgressBar
-from PySide6.QtCore import QSettings
+from collections import deque
+from PySide6.QtWidgets import QFileDialog, QMessageBox, QProgressBar, QToolButton
+from PySide6.QtCore import QSettings, QSignalBlocker, QTimer
 
-from core.rag_engine import RAGEngine
+from core.project import project_settings_key, legacy_project_settings_key
 from core.tools import register_default_tools
 from core.tools.registry import register_by_names
-from gui.workers import IndexWorker
+from gui.workers import FileReadWorker, IndexWorker, start_pooled
 from gui.editor import DocumentWidget, ImageViewerWidget
+from gui.controllers.editor_controller import IMAGE_EXTENSIONS
+from gui.settings_utils import settings_list
+
+# Entries shown on the welcome screen
+MAX_RECENT_PROJECTS = 5
+
+# Bursts of tab changes are saved once they settle
+SAVE_STATE_DELAY_MS = 1000
 
 
 class ProjectController:
@@ -22,9 +30,24 @@ class ProjectController:
             main_window: The MainWindow instance
         """
         self.window = main_window
-        self.settings = QSettings("InkwellAI", "InkwellAI")
+        # Share the window's QSettings rather than opening another handle
+        self.settings = getattr(main_window, "settings", None) or QSettings("InkwellAI", "InkwellAI")
         self.index_worker = None
+        self._index_workers = set()  # keeps pool runnables alive until finished
         self.index_progress_state = None  # (current, total, file) for dashboard
+        self._pending_rag_path = None  # project waiting for its deferred _start_rag
+        # Tab restore: saved paths still to open, and contents read so far
+        self._restore_root = None
+        self._restore_queue = deque()
+        self._restore_loaded = {}
+        self._restore_workers = set()
+        # Recent projects are read from settings once and written back on close
+        self._recent = deque(settings_list(self.settings, "recent_projects"), maxlen=MAX_RECENT_PROJECTS)
+        self._recent_dirty = False
+        self._save_state_timer = QTimer()
+        self._save_state_timer.setSingleShot(True)
+        self._save_state_timer.setInterval(SAVE_STATE_DELAY_MS)
+        self._save_state_timer.timeout.connect(self.save_project_state)
         
     def open_project_dialog(self):
         """Open file dialog to select project folder."""
@@ -38,6 +61,12 @@ class ProjectController:
         Args:
             folder_path: Path to project folder
         """
+        # Reopening the current project would rebuild the sidebar and reindex it for nothing
+        root = self.window.project_manager.root_path
+        if root and os.path.normpath(root) == os.path.normpath(folder_path):
+            self.window.show_main_interface(True)
+            return
+
         if self.window.project_manager.open_project(folder_path):
             # Configure tool registry based on project settings
             try:
@@ -53,10 +82,11 @@ class ProjectController:
             self.window.sidebar.add_project("Project", folder_path)
             
             self.window.setWindowTitle(f"Inkwell AI - {folder_path}")
-            self.window.stack.setCurrentWidget(self.window.main_interface)
+            self.window.show_main_interface(True)
             
             # Update Image Gen
-            self.window.image_gen.set_project_path(folder_path)
+            if self.window.has_image_gen:
+                self.window.image_gen.set_project_path(folder_path)
             
             # Update Editor
             self.window.editor.set_project_path(folder_path)
@@ -71,43 +101,36 @@ class ProjectController:
             # Save to settings
             self.settings.setValue("last_project", folder_path)
             
-            # Update Recent Projects
-            recent = self.settings.value("recent_projects", [])
-            if not isinstance(recent, list):
-                recent = []
-            
-            if folder_path in recent:
-                recent.remove(folder_path)
-            recent.insert(0, folder_path)
-            recent = recent[:5]  # Keep top 5
-            self.settings.setValue("recent_projects", recent)
-            
-            # Initialize RAG
-            self.window.rag_engine = RAGEngine(folder_path)
-            
-            # Clean any previously-indexed files from excluded directories (e.g., .debug)
-            self.window.rag_engine.clean_excluded_files()
-            
-            # Connect RAG engine to sidebar for status indicators
-            if hasattr(self.window, 'sidebar'):
-                self.window.sidebar.set_rag_engine(self.window.rag_engine, "Project")
-            
-            # Start indexer worker with cancel support
-            self.index_worker = IndexWorker(self.window.rag_engine)
-            self.index_worker.progress.connect(self.on_index_progress)
-            self.index_worker.finished.connect(self.on_index_finished)
-            self.index_worker.start()
-            self.index_progress_state = (0, 0, "")
-            self.window._update_token_dashboard()
+            # Update Recent Projects (flushed to settings on close)
+            try:
+                self._recent.remove(folder_path)
+            except ValueError:
+                pass
+            self._recent.appendleft(folder_path)
+            self._recent_dirty = True
             
             # Reinitialize diff system with new project root
             self.window.chat_controller.reinit_diff_system()
             
-            # Show progress bar
-            self.window.indexing_progress = QProgressBar()
-            self.window.indexing_progress.setTextVisible(True)
-            self.window.indexing_progress.setFormat("Indexing: %p% (%v/%m)")
-            self.window.statusBar().addWidget(self.window.indexing_progress)
+            # Busy indicator until indexing reports its first progress
+            if not hasattr(self.window, 'indexing_progress'):
+                self.window.indexing_progress = QProgressBar()
+                self.window.indexing_progress.setTextVisible(True)
+                self.window.indexing_progress.setFormat("Indexing: %p% (%v/%m)")
+                self.window.statusBar().addWidget(self.window.indexing_progress)
+                # Indexing runs in the background; this lets the user stop it early
+                self.window.indexing_cancel = QToolButton()
+                self.window.indexing_cancel.setText("Stop")
+                self.window.indexing_cancel.setToolTip("Stop indexing this project")
+                self.window.indexing_cancel.setAutoRaise(True)
+                self.window.indexing_cancel.clicked.connect(self.cancel_indexing)
+                self.window.statusBar().addWidget(self.window.indexing_cancel)
+            self.window.indexing_progress.setRange(0, 0)
+            self.index_progress_state = (0, 0, "")
+            
+            # Build the RAG engine once the window has painted
+            self._pending_rag_path = folder_path
+            QTimer.singleShot(0, lambda: self._start_rag(folder_path))
             
             # Update personas in chat widget
             personas = self.window.project_manager.get_all_personas()
@@ -120,35 +143,43 @@ class ProjectController:
             # Restore Tabs
             self.restore_project_state(folder_path)
 
+    def schedule_save_project_state(self):
+        """Save project state once tab changes stop for SAVE_STATE_DELAY_MS."""
+        self._save_state_timer.start()
+
     def save_project_state(self):
         """Save current project state (open tabs, etc.)."""
+        # Saving now supersedes any scheduled save
+        self._save_state_timer.stop()
         if not self.window.project_manager.root_path:
             return
             
         project_path = self.window.project_manager.root_path
         
         # Use hash of path for key to avoid issues with special chars
-        key = hashlib.md5(project_path.encode()).hexdigest()
+        key = project_settings_key(project_path)
         
-        # Get open files
+        # One pass over the tabs collects open files and spots Image Studio
         open_files = []
-        for i in range(self.window.editor.tabs.count()):
-            widget = self.window.editor.tabs.widget(i)
-            if isinstance(widget, (DocumentWidget, ImageViewerWidget)):
-                path = widget.property("file_path")
-                if path and os.path.exists(path) and not os.path.isdir(path):
-                    open_files.append(path)
-        
-        # Check Image Studio
         image_studio_open = False
+        image_gen = self.window.image_gen if self.window.has_image_gen else None
+        widget_at = self.window.editor.tabs.widget
         for i in range(self.window.editor.tabs.count()):
-            if self.window.editor.tabs.widget(i) == self.window.image_gen:
+            widget = widget_at(i)
+            if widget is image_gen:
                 image_studio_open = True
-                break
+            elif isinstance(widget, (DocumentWidget, ImageViewerWidget)):
+                path = widget.property("file_path")
+                if path and os.path.isfile(path):
+                    open_files.append(path)
+        # Tabs still being restored count as open
+        open_files.extend(self._restore_queue)
         
-        self.settings.setValue(f"state/{key}/open_files", open_files)
-        self.settings.setValue(f"state/{key}/image_studio_open", image_studio_open)
-        self.settings.sync()  # Force write to disk
+        # QSettings writes to disk on its own schedule and on exit
+        self.settings.beginGroup(f"state/{key}")
+        self.settings.setValue("open_files", open_files)
+        self.settings.setValue("image_studio_open", image_studio_open)
+        self.settings.endGroup()
 
     def restore_project_state(self, project_path):
         """Restore project state from settings.
@@ -156,32 +187,58 @@ class ProjectController:
         Args:
             project_path: Path to project folder
         """
-        key = hashlib.md5(project_path.encode()).hexdigest()
+        self._migrate_legacy_settings(project_path)
+        key = project_settings_key(project_path)
         
         # Restore files
-        open_files = self.settings.value(f"state/{key}/open_files", [])
+        open_files = settings_list(self.settings, f"state/{key}/open_files")
         
-        # Ensure it's a list (QSettings might return a string if only one item)
-        if open_files and not isinstance(open_files, list):
-            open_files = [open_files]
-            
-        if open_files:
-            for path in open_files:
-                if os.path.exists(path) and not os.path.isdir(path):
-                    # Check extension to decide how to open
-                    ext = os.path.splitext(path)[1].lower()
-                    if ext in ['.png', '.jpg', '.jpeg', '.gif', '.bmp']:
-                        self.window.editor.open_file(path, None)
-                    else:
-                        content = self.window.project_manager.read_file(path)
-                        if content is not None:
-                            self.window.editor.open_file(path, content)
+        # Read text files on the pool; tabs open in saved order as reads arrive
+        self._restore_root = project_path
+        self._restore_queue = deque(dict.fromkeys(p for p in open_files if os.path.isfile(p)))
+        self._restore_loaded = {}
+        for path in self._restore_queue:
+            if os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS:
+                self._restore_loaded[path] = None  # the image viewer loads itself
+                continue
+            worker = FileReadWorker(self.window.project_manager.read_file, path)
+            worker.signals.loaded.connect(self._on_restored_file_loaded)
+            start_pooled(worker, self._restore_workers, worker.signals.loaded)
+        self._open_restored_tabs()
         
         # Restore Image Studio
         image_studio_open = self.settings.value(f"state/{key}/image_studio_open", False, type=bool)
         if image_studio_open:
             self.window.open_image_studio()
 
+    def _on_restored_file_loaded(self, path, content):
+        if self.window.project_manager.root_path != self._restore_root:
+            return  # project closed or switched while reading
+        if path in self._restore_queue:
+            self._restore_loaded[path] = content
+            self._open_restored_tabs()
+
+    def _open_restored_tabs(self):
+        """Open every restored tab whose turn has come, then finish up once all are in."""
+        queue, loaded = self._restore_queue, self._restore_loaded
+        if queue and queue[0] in loaded:
+            tabs = self.window.editor.tabs
+            self.window.setUpdatesEnabled(False)
+            blocker = QSignalBlocker(tabs)
+            try:
+                while queue and queue[0] in loaded:
+                    path = queue.popleft()
+                    content = loaded.pop(path)
+                    if content is not None or os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS:
+                        self.window.editor.open_file(path, content)
+            finally:
+                blocker.unblock()
+                self.window.setUpdatesEnabled(True)
+            self.window.editor.on_tab_changed(tabs.currentIndex())
+        if queue or self._restore_root is None:
+            return
+        self._restore_root = None
+        
         # After restoring tabs, populate Context Files list
         try:
             self.window.chat.show_context_spinner()
@@ -189,6 +246,19 @@ class ProjectController:
         except Exception:
             pass
     
+    def _migrate_legacy_settings(self, project_path):
+        """Move per-project settings saved under the old MD5 key to the current key."""
+        old_key = legacy_project_settings_key(project_path)
+        new_key = project_settings_key(project_path)
+        for template in ("state/{}/open_files", "state/{}/image_studio_open", "chat_history/{}"):
+            old_name = template.format(old_key)
+            if not self.settings.contains(old_name):
+                continue
+            new_name = template.format(new_key)
+            if not self.settings.contains(new_name):
+                self.settings.setValue(new_name, self.settings.value(old_name))
+            self.settings.remove(old_name)
+    
     def _open_assets_folder(self):
         """Open the configured assets folder in sidebar if it exists."""
         assets_path = self.settings.value("assets_folder", "assets")  # Default to "assets" folder
@@ -212,6 +282,47 @@ class ProjectController:
                 print(f"DEBUG: Opening assets folder from {assets_path}")
                 self.window.sidebar.add_project("Assets", assets_path)
     
+    def _start_rag(self, folder_path):
+        """Create the project's RAG engine and start indexing it."""
+        if folder_path != self._pending_rag_path:
+            return  # superseded by a later open_project
+        self._pending_rag_path = None
+        if self.window.project_manager.root_path != folder_path:
+            # Project was closed before we got here; drop the busy indicator
+            self.on_index_finished()
+            return
+        
+        # Imported here: chromadb is slow to load and isn't needed until a project is open
+        from core.rag_engine import RAGEngine
+        self.window.rag_engine = RAGEngine(folder_path)
+        self.window.rag_engine.embedding_store = self.window.chat_controller.response_cache.store
+        
+        # Clean any previously-indexed files from excluded directories (e.g., .debug)
+        self.window.rag_engine.clean_excluded_files()
+        
+        # Connect RAG engine to sidebar for status indicators
+        if hasattr(self.window, 'sidebar'):
+            self.window.sidebar.set_rag_engine(self.window.rag_engine, "Project")
+        
+        # Start indexer worker with cancel support
+        self._start_index_worker(IndexWorker(self.window.rag_engine))
+        self.window._update_token_dashboard()
+
+    def _start_index_worker(self, worker):
+        """Run an IndexWorker on the shared pool, ignoring signals once superseded."""
+        self.index_worker = worker
+        worker.signals.progress.connect(
+            lambda current, total, path: worker is self.index_worker and self.on_index_progress(current, total, path)
+        )
+        worker.signals.finished.connect(lambda: self._on_index_worker_done(worker))
+        start_pooled(worker, self._index_workers, worker.signals.finished)
+
+    def _on_index_worker_done(self, worker):
+        # A cancelled worker still tidies up, unless a newer one has taken over
+        if self.index_worker is None or worker is self.index_worker:
+            self.index_worker = None
+            self.on_index_finished()
+
     def on_index_progress(self, current, total, file_path):
         """Update progress bar during indexing.
         
@@ -229,12 +340,19 @@ class ProjectController:
         self.index_progress_state = (current, total, file_path)
         self.window._update_token_dashboard()
     
+    def cancel_indexing(self):
+        """Stop the running index pass; its finished signal tidies up."""
+        if self.index_worker is not None:
+            self.index_worker.cancel()
+
     def on_index_finished(self):
         """Clean up after indexing completes."""
-        if hasattr(self.window, 'indexing_progress'):
-            self.window.statusBar().removeWidget(self.window.indexing_progress)
-            self.window.indexing_progress.deleteLater()
-            del self.window.indexing_progress
+        for name in ('indexing_progress', 'indexing_cancel'):
+            widget = getattr(self.window, name, None)
+            if widget is not None:
+                self.window.statusBar().removeWidget(widget)
+                widget.deleteLater()
+                delattr(self.window, name)
         # Final update of file statuses
         if hasattr(self.window, 'sidebar'):
             self.window.sidebar.update_file_status("Project")
@@ -248,7 +366,7 @@ class ProjectController:
         self._shutdown_project_session(clear_last_project=True)
         
         # Switch to Welcome
-        self.window.stack.setCurrentWidget(self.window.welcome_widget)
+        self.window.show_main_interface(False)
 
     def _shutdown_project_session(self, clear_last_project=False):
         """Common logic for closing a project session.
@@ -259,6 +377,22 @@ class ProjectController:
         # Save state before closing
         self.save_project_state()
         
+        # Tear down without a repaint or tab-change cascade per closed tab
+        self.window.setUpdatesEnabled(False)
+        try:
+            self._teardown_project_session(clear_last_project)
+        finally:
+            self.window.setUpdatesEnabled(True)
+        
+        # The tab-change handlers were blocked above; refresh their state once
+        self.window.editor.on_tab_changed(-1)
+        self.window.chat_controller.on_tabs_changed()
+        
+        # Update Welcome Screen
+        self.window.update_welcome_screen()
+        self.window._update_token_dashboard(0)
+
+    def _teardown_project_session(self, clear_last_project):
         # Clear state
         self.window.project_manager.root_path = None
         
@@ -268,14 +402,28 @@ class ProjectController:
         
         self.window.setWindowTitle("Inkwell AI")
         
-        # Close all tabs
-        self.window.editor.tabs.clear()
+        # Close all tabs; QTabWidget.clear() only detaches the pages
+        tabs = self.window.editor.tabs
+        blocker = QSignalBlocker(tabs)
+        pages = [tabs.widget(i) for i in range(tabs.count())]
+        tabs.clear()
+        blocker.unblock()
+        image_gen = self.window.image_gen if self.window.has_image_gen else None
+        for page in pages:
+            if page is not image_gen:  # Image Studio is reused across projects
+                page.deleteLater()
         self.window.editor.open_files.clear()
         
         # Clear chat
         self.window.chat_controller.save_current_chat_session()  # Save before clearing
         self.window.chat.clear_chat()
         self.window.chat_controller.chat_history = []
+        self._restore_root = None
+        self._restore_queue.clear()
+        self._restore_loaded.clear()
+        # Review links from this project's chat can't be followed any more
+        self.window.chat_controller.pending_edits.clear()
+        self.window.chat_controller.pending_edit_batches.clear()
         self.window._raw_ai_responses = []  # Clear raw responses tracking
         
         # Cancel RAG indexing worker immediately
@@ -291,35 +439,40 @@ class ProjectController:
         if clear_last_project:
             self.settings.setValue("last_project", "")
         
-        # Update Welcome Screen
-        self.window.update_welcome_screen()
-        self.window._update_token_dashboard(0)
-        
     def update_welcome_screen(self):
         """Update welcome screen with recent projects."""
-        recent = self.settings.value("recent_projects", [])
-        if not isinstance(recent, list):
-            recent = []
-        # Filter out non-existent paths
-        recent = [p for p in recent if os.path.exists(p)]
-        self.settings.setValue("recent_projects", recent)
+        # Filter out projects whose folder is gone
+        recent = [p for p in self._recent if os.path.isdir(p)]
+        if len(recent) != len(self._recent):
+            self._recent = deque(recent, maxlen=MAX_RECENT_PROJECTS)
+            self._recent_dirty = True
         
         self.window.welcome_widget.set_recent_projects(recent)
+
+    def flush_recent_projects(self):
+        """Write the recent projects list back to settings if it changed."""
+        if self._recent_dirty:
+            self.settings.setValue("recent_projects", list(self._recent))
+            self._recent_dirty = False
         
     def shutdown_on_close(self):
-        """Handle cleanup when window closes."""
+        """Persist session state when the window closes.
+
+        Unlike close_project this skips the tab and sidebar teardown; the
+        process exits right afterwards.
+        """
+        # Finish any background file writes first so new files count as open tabs
+        self.window.editor_controller.flush_saves()
+        self.save_project_state()
+        self.flush_recent_projects()
+
         # Save current chat session before shutdown
         try:
             self.window.chat_controller.save_current_chat_session()
         except Exception as e:
             print(f"Error saving chat on shutdown: {e}")
         
-        # Immediately cancel and terminate indexing worker
-        if self.index_worker is not None:
-            try:
-                self.index_worker.cancel()
-                # Force terminate to avoid destructor issues
-                if self.index_worker.isRunning():
-                    self.index_worker.terminate()
-            except Exception:
-                pass
+        # Cancel indexing; the worker stops after the file it is embedding
+        for worker in list(self._index_workers):
+            worker.cancel()
+        self.index_worker = None
@@ -5,6 +5,9 @@ from PySide6.QtGui import QFont
 import json
 from datetime import datetime
 
+from core.project import project_settings_key
+from gui.settings_utils import settings_list
+
 
 class ChatHistoryDialog(QDialog):
     """Dialog to browse and manage chat history."""
@@ -109,9 +112,8 @@ class ChatHistoryDialog(QDialog):
         self.chat_display.clear()
         
         # Generate project-specific key
-        import hashlib
         if self.project_path:
-            key = hashlib.md5(self.project_path.encode()).hexdigest()
+            key = project_settings_key(self.project_path)
             sessions_key = f"chat_history/{key}"
         else:
             sessions_key = "chat_history"  # Fallback for old format
@@ -119,9 +121,7 @@ class ChatHistoryDialog(QDialog):
         print(f"DEBUG: Loading chat history from key: {sessions_key}")
         
         # Get stored chat sessions
-        chat_sessions = self.settings.value(sessions_key, [])
-        if not isinstance(chat_sessions, list):
-            chat_sessions = []
+        chat_sessions = settings_list(self.settings, sessions_key)
         
         print(f"DEBUG: Found {len(chat_sessions)} chat sessions")
         
@@ -208,9 +208,8 @@ class ChatHistoryDialog(QDialog):
     def save_chat_history(self):
         """Save chat sessions to settings."""
         # Generate project-specific key
-        import hashlib
         if self.project_path:
-            key = hashlib.md5(self.project_path.encode()).hexdigest()
+            key = project_settings_key(self.project_path)
             sessions_key = f"chat_history/{key}"
         else:
             sessions_key = "chat_history"
@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QTextEdit, QLabel, QDialogButtonBox, QSplitter, QWidget, QPushButton, QStackedWidget, QTextBrowser
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Slot
 from PySide6.QtGui import QPalette
 import markdown
 import difflib
@@ -126,7 +126,7 @@ class DiffDialog(QDialog):
         controls = QHBoxLayout()
         toggle_full_btn = QPushButton("Show Full Diff")
         toggle_full_btn.setCheckable(True)
-        toggle_full_btn.toggled.connect(lambda checked: self._toggle_diff_context(checked))
+        toggle_full_btn.toggled.connect(self._toggle_diff_context)
         controls.addWidget(toggle_full_btn)
         controls.addStretch()
         layout.addLayout(controls)
@@ -200,6 +200,7 @@ class DiffDialog(QDialog):
                 chg += 1
         return add, del_, chg
 
+    @Slot(bool)
     def _toggle_diff_context(self, show_full: bool):
         """Toggle between context and full diff views."""
         self._show_context = not show_full
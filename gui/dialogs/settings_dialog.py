@@ -661,6 +661,35 @@ class SettingsDialog(QDialog):
         structured_layout.addWidget(self.structured_enabled_cb)
         structured_group.setLayout(structured_layout)
         layout.addWidget(structured_group)
+
+        # Response cache
+        cache_group = QGroupBox("Response Cache")
+        cache_layout = QVBoxLayout()
+        cache_desc = QLabel(
+            "Identical requests reuse the earlier reply. The similar-question tier also "
+            "reuses replies to reworded questions, which can match a different question "
+            "that happens to be phrased alike. Cached replies are marked in the chat."
+        )
+        cache_desc.setWordWrap(True)
+        cache_layout.addWidget(cache_desc)
+
+        self.semantic_cache_cb = QCheckBox("Reuse replies to similar questions")
+        self.semantic_cache_cb.setChecked(bool(self.settings.value("semantic_cache_enabled", False, type=bool)))
+        cache_layout.addWidget(self.semantic_cache_cb)
+
+        self.persistent_cache_cb = QCheckBox("Keep cached replies between sessions (stored in ~/.inkwell/cache.db)")
+        self.persistent_cache_cb.setChecked(bool(self.settings.value("persistent_response_cache", False, type=bool)))
+        cache_layout.addWidget(self.persistent_cache_cb)
+
+        clear_cache_layout = QHBoxLayout()
+        clear_cache_layout.addStretch()
+        clear_cache_btn = QPushButton("Clear Response Cache")
+        clear_cache_btn.clicked.connect(self.clear_response_cache)
+        clear_cache_btn.setEnabled(getattr(self.parent(), 'chat_controller', None) is not None)
+        clear_cache_layout.addWidget(clear_cache_btn)
+        cache_layout.addLayout(clear_cache_layout)
+        cache_group.setLayout(cache_layout)
+        layout.addWidget(cache_group)
         
         # Custom edit instructions
         instructions_group = QGroupBox("Custom Edit Instructions")
@@ -735,6 +764,11 @@ class SettingsDialog(QDialog):
             "- When editing selections repeatedly, continue using :::PATCH::: format for each edit\n"
         )
     
+    def clear_response_cache(self):
+        """Delete cached replies and query embeddings, including the on-disk copies."""
+        self.parent().chat_controller.clear_response_caches()
+        QMessageBox.information(self, "Response Cache", "Cached replies and query embeddings have been cleared.")
+
     def reset_edit_instructions(self):
         """Reset custom edit instructions to default."""
         default = self._get_default_edit_instructions()
@@ -781,6 +815,10 @@ class SettingsDialog(QDialog):
 
         # Save structured responses toggle
         self.settings.setValue("structured_enabled", bool(self.structured_enabled_cb.isChecked()))
+
+        # Save response cache options
+        self.settings.setValue("semantic_cache_enabled", bool(self.semantic_cache_cb.isChecked()))
+        self.settings.setValue("persistent_response_cache", bool(self.persistent_cache_cb.isChecked()))
         
         # Save default image folder
         folder_value = self.default_image_folder.text().strip()
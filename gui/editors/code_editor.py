@@ -9,6 +9,8 @@ from PySide6.QtGui import QFont
 
 from .dialogs import LinkDialog
 
+_NON_ALPHA_RE = re.compile(r'[^a-z]')
+
 
 class CodeEditor(QPlainTextEdit):
     """Plain text editor with Markdown formatting and spell-checking."""
@@ -99,7 +101,7 @@ class CodeEditor(QPlainTextEdit):
             word = cursor.selectedText().lower()
             
             # Extract alphabetic part of word
-            alpha_word = re.sub(r'[^a-z]', '', word)
+            alpha_word = _NON_ALPHA_RE.sub('', word)
             
             if alpha_word in misspelled_words:
                 # Create a proper QTextEdit.ExtraSelection object
@@ -120,7 +122,7 @@ class CodeEditor(QPlainTextEdit):
         # Find the word at cursor
         cursor.select(QTextCursor.WordUnderCursor)
         word = cursor.selectedText().lower()
-        alpha_word = re.sub(r'[^a-z]', '', word)
+        alpha_word = _NON_ALPHA_RE.sub('', word)
         
         menu = QMenu(self)
         
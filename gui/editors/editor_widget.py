@@ -2,7 +2,7 @@
 
 import os
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QTabWidget, QMessageBox
-from PySide6.QtCore import Signal
+from PySide6.QtCore import Signal, Slot
 from PySide6.QtGui import QDesktopServices, QKeySequence, QShortcut
 
 from .document_viewer import DocumentWidget
@@ -152,37 +152,44 @@ class EditorWidget(QWidget):
             return doc.editor
         return None
 
+    @Slot()
     def undo(self):
         current = self.get_current_editor()
         if current:
             current.undo()
 
+    @Slot()
     def redo(self):
         current = self.get_current_editor()
         if current:
             current.redo()
 
+    @Slot()
     def cut(self):
         current = self.get_current_editor()
         if current:
             current.cut()
 
+    @Slot()
     def copy(self):
         current = self.get_current_editor()
         if current:
             current.copy()
 
+    @Slot()
     def paste(self):
         current = self.get_current_editor()
         if current:
             current.paste()
 
     # Formatting Delegates
+    @Slot()
     def format_bold(self):
         current = self.get_current_editor()
         if current:
             current.format_bold()
 
+    @Slot()
     def format_italic(self):
         current = self.get_current_editor()
         if current:
@@ -193,41 +200,52 @@ class EditorWidget(QWidget):
         if current:
             current.format_code()
 
+    @Slot()
     def format_code_block(self):
         current = self.get_current_editor()
         if current:
             current.format_code_block()
 
+    @Slot()
     def format_quote(self):
         current = self.get_current_editor()
         if current:
             current.format_quote()
 
+    @Slot()
     def format_h1(self):
         current = self.get_current_editor()
         if current:
             current.format_h1()
 
+    @Slot()
     def format_h2(self):
         current = self.get_current_editor()
         if current:
             current.format_h2()
 
+    @Slot()
     def format_h3(self):
         current = self.get_current_editor()
         if current:
             current.format_h3()
 
+    @Slot()
     def insert_link(self):
         current = self.get_current_editor()
         if current:
             current.insert_link()
 
+    @Slot()
     def insert_image(self):
         current = self.get_current_editor()
         if current:
             current.insert_image()
 
+    def open_image_paths(self):
+        """Paths of the images open in tabs, in the order they were opened."""
+        return [path for path, widget in self.open_files.items() if isinstance(widget, ImageViewerWidget)]
+
     def add_tab(self, widget, title):
         self.tabs.addTab(widget, title)
         self.tabs.setCurrentWidget(widget)
@@ -269,6 +287,7 @@ class EditorWidget(QWidget):
                 updated = True
         return updated
 
+    @Slot()
     def show_search(self):
         """Show and focus the search/replace widget."""
         editor = self.get_current_editor()
@@ -1,12 +1,129 @@
 """Search and replace widget for text editors."""
 
+import functools
 import re
 from PySide6.QtWidgets import (
     QWidget, QHBoxLayout, QVBoxLayout, QLineEdit, QPushButton,
     QCheckBox, QLabel, QSpinBox
 )
-from PySide6.QtCore import Signal, Qt
-from PySide6.QtGui import QIcon, QTextCursor, QTextDocument
+from PySide6.QtCore import Signal, Qt, QObject, QThreadPool
+from PySide6.QtGui import QTextCursor, QTextDocument
+
+from gui.workers import PoolWorker
+
+try:
+    import regex as re2  # listed in requirements.txt: supports a match timeout
+except ImportError:
+    re2 = None
+
+# Regex searches over texts longer than this run off the UI thread
+REGEX_OFFLOAD_CHARS = 1_000_000
+# Seconds before a risky regex search is abandoned (needs `regex`)
+REGEX_TIMEOUT = 2.0
+# A quantified group that itself contains a quantifier, e.g. (a+)+ or (\w*\s)*
+_NESTED_QUANTIFIER_RE = re.compile(r"\([^)]*[+*][^)]*\)[+*{]")
+# Errors raised for an invalid pattern by whichever engine compiled it
+_PATTERN_ERRORS = (re.error,) if re2 is None else (re.error, re2.error)
+
+_search_pool = None
+
+
+@functools.lru_cache(maxsize=64)
+def _compile(pattern, flags):
+    """Compile a search pattern, keeping recent ones shared across editors."""
+    return re.compile(pattern, flags)
+
+
+def _is_risky_regex(pattern, text):
+    """Heuristic for searches that could stall the UI thread on backtracking."""
+    return len(text) > REGEX_OFFLOAD_CHARS or _NESTED_QUANTIFIER_RE.search(pattern) is not None
+
+
+def _guarded_pattern(pattern, case_sensitive, text):
+    """Compile pattern for searching text.
+
+    Returns (compiled, match_kwargs). Risky patterns are compiled with
+    `regex` when it is installed and must be matched with a timeout.
+    """
+    if re2 is not None and _is_risky_regex(pattern, text):
+        flags = 0 if case_sensitive else re2.IGNORECASE
+        return re2.compile(pattern, flags), {"timeout": REGEX_TIMEOUT}
+    return _compile(pattern, 0 if case_sensitive else re.IGNORECASE), {}
+
+
+def _get_search_pool():
+    """One-thread pool for background regex searches.
+
+    Kept apart from the global pool so a slow search never delays chat,
+    save or indexing workers; queued searches are dropped when superseded.
+    """
+    global _search_pool
+    if _search_pool is None:
+        _search_pool = QThreadPool()
+        _search_pool.setMaxThreadCount(1)
+    return _search_pool
+
+
+class _RegexSearchSignals(QObject):
+    finished = Signal(int, object)  # token, list of (start, end, text) or None on timeout
+    failed = Signal(int, str)  # token, error message
+
+
+class _RegexSearchTask(PoolWorker):
+    """Find all regex matches on the search pool, giving up after REGEX_TIMEOUT.
+
+    Held in the widget's _search_tasks dict (by token) until it reports back.
+    """
+
+    signals_class = _RegexSearchSignals
+
+    def __init__(self, token, pattern, text, case_sensitive):
+        super().__init__()
+        self.token = token
+        self.pattern = pattern
+        self.text = text
+        self.case_sensitive = case_sensitive
+
+    def run(self):
+        try:
+            flags = 0 if self.case_sensitive else re2.IGNORECASE
+            found = re2.finditer(self.pattern, self.text, flags, timeout=REGEX_TIMEOUT)
+            matches = [(m.start(), m.end(), m.group()) for m in found]
+        except TimeoutError:
+            self.signals.finished.emit(self.token, None)
+            return
+        except Exception as e:
+            self.signals.failed.emit(self.token, str(e))
+            return
+        self.signals.finished.emit(self.token, matches)
+
+
+def _ci_literal_replace(text, needle, repl):
+    """Case-insensitively replace every literal occurrence of needle.
+
+    Returns (new_text, count). Scans the lowercased text with str.find so no
+    regex is compiled or run.
+    """
+    hay = text.lower()
+    if len(hay) != len(text):
+        # Lowercasing changed the length (e.g. 'İ'), so offsets would not line up
+        pattern = re.compile(re.escape(needle), re.IGNORECASE)
+        return pattern.subn(lambda _m: repl, text)
+    nlow = needle.lower()
+    nlen = len(nlow)
+    parts = []
+    count = 0
+    i = 0
+    while True:
+        j = hay.find(nlow, i)
+        if j < 0:
+            parts.append(text[i:])
+            break
+        parts.append(text[i:j])
+        parts.append(repl)
+        count += 1
+        i = j + nlen
+    return "".join(parts), count
 
 
 class SearchReplaceWidget(QWidget):
@@ -20,6 +137,9 @@ class SearchReplaceWidget(QWidget):
     def __init__(self, parent=None, editor=None):
         super().__init__(parent)
         self.editor = editor
+        self._last_highlight_state = None  # (match count, first match) of last highlight
+        self._search_token = 0  # identifies the newest background regex search
+        self._search_tasks = {}  # token -> running background regex search
         self.setup_ui()
         
     def setup_ui(self):
@@ -115,7 +235,10 @@ class SearchReplaceWidget(QWidget):
         case_sensitive = self.case_sensitive_checkbox.isChecked()
         
         matches = self._find_all_in_editor(search_text, use_regex, case_sensitive)
-        self.match_count_label.setText(f"Matches: {len(matches)}")
+        if matches is None:
+            self.match_count_label.setText("Matches: searching...")
+        else:
+            self.match_count_label.setText(f"Matches: {len(matches)}")
         
     def replace_next(self):
         """Replace next occurrence."""
@@ -156,14 +279,12 @@ class SearchReplaceWidget(QWidget):
         cursor = self.editor.textCursor()
         
         if find_next:
-            # Start search from current position
-            cursor.movePosition(QTextCursor.NextCharacter)
+            # Start search after the current match/selection
+            cursor.setPosition(cursor.selectionEnd())
         else:
             # Start from beginning
             cursor.movePosition(QTextCursor.Start)
         
-        self.editor.setTextCursor(cursor)
-        
         # Create search flags
         flags = QTextDocument.FindFlags()
         if case_sensitive:
@@ -171,8 +292,9 @@ class SearchReplaceWidget(QWidget):
         
         # If regex, we need to handle it differently
         if use_regex:
-            self._find_with_regex(search_text, case_sensitive)
+            return self._find_with_regex(search_text, case_sensitive, cursor.position())
         else:
+            # document.find takes the cursor by value; no need to apply it first
             cursor = document.find(search_text, cursor, flags)
             if not cursor.isNull():
                 self.editor.setTextCursor(cursor)
@@ -180,68 +302,106 @@ class SearchReplaceWidget(QWidget):
         return False
     
     def _find_all_in_editor(self, search_text, use_regex, case_sensitive):
-        """Find all occurrences and return positions."""
+        """Find all occurrences and return positions.
+
+        Returns None when a risky regex search was handed to a background
+        task; its results are highlighted when it finishes.
+        """
         text = self.editor.toPlainText()
-        matches = []
-        
+        # Any newer search supersedes a background one still running
+        self._search_token += 1
+
         if use_regex:
+            # Without `regex` there is no timeout, so a background search could
+            # never be stopped; search here as the editor always did
+            if re2 is not None and _is_risky_regex(search_text, text):
+                self._start_background_search(search_text, text, case_sensitive)
+                return None
             flags = 0 if case_sensitive else re.IGNORECASE
             try:
-                for match in re.finditer(search_text, text, flags):
-                    matches.append((match.start(), match.end(), match.group()))
+                matches = [(m.start(), m.end(), m.group()) for m in _compile(search_text, flags).finditer(text)]
             except re.error:
                 return []
         else:
-            if not case_sensitive:
-                search_text_lower = search_text.lower()
-                text_lower = text.lower()
-                start = 0
-                while True:
-                    pos = text_lower.find(search_text_lower, start)
-                    if pos == -1:
-                        break
-                    matches.append((pos, pos + len(search_text), search_text))
-                    start = pos + 1
+            if case_sensitive:
+                hay, needle = text, search_text
             else:
-                start = 0
-                while True:
-                    pos = text.find(search_text, start)
-                    if pos == -1:
-                        break
-                    matches.append((pos, pos + len(search_text), search_text))
-                    start = pos + 1
+                hay, needle = text.lower(), search_text.lower()
+            # Count once up front so the result list is sized a single time
+            n = hay.count(needle)
+            step = len(needle)
+            matches = [None] * n
+            start = 0
+            for idx in range(n):
+                pos = hay.find(needle, start)
+                matches[idx] = (pos, pos + step, search_text)
+                start = pos + step
         
         # Highlight all matches
         self._highlight_matches(matches)
         return matches
     
+    def _start_background_search(self, pattern, text, case_sensitive):
+        pool = _get_search_pool()
+        # Searches still waiting for the thread are superseded by this one
+        for token, queued in list(self._search_tasks.items()):
+            if pool.tryTake(queued):
+                del self._search_tasks[token]
+        task = _RegexSearchTask(self._search_token, pattern, text, case_sensitive)
+        task.signals.finished.connect(self._on_background_search_finished)
+        task.signals.failed.connect(self._on_background_search_failed)
+        self._search_tasks[task.token] = task
+        pool.start(task)
+
+    def _on_background_search_finished(self, token, matches):
+        self._search_tasks.pop(token, None)
+        if token != self._search_token:
+            return
+        if matches is None:
+            self.match_count_label.setText("Matches: timeout")
+            return
+        self._highlight_matches(matches)
+        self.match_count_label.setText(f"Matches: {len(matches)}")
+
+    def _on_background_search_failed(self, token, message):
+        self._search_tasks.pop(token, None)
+        if token != self._search_token:
+            return
+        self.match_count_label.setText("Matches: 0")
+
     def _highlight_matches(self, matches):
         """Highlight all matches in the editor."""
         cursor = self.editor.textCursor()
-        cursor.movePosition(QTextCursor.Start)
-        self.editor.setTextCursor(cursor)
+        state = (len(matches), matches[0] if matches else None)
+        span = (matches[0][0], matches[0][1]) if matches else (0, 0)
+        # Nothing to do if the same result set is already highlighted
+        if state == self._last_highlight_state and (cursor.selectionStart(), cursor.selectionEnd()) == span:
+            return
+        self._last_highlight_state = state
         
-        # Highlight first match if any
-        if matches:
-            cursor.setPosition(matches[0][0])
-            cursor.setPosition(matches[0][1], QTextCursor.KeepAnchor)
-            self.editor.setTextCursor(cursor)
+        # Select the first match (or reset to start) with a single cursor update
+        cursor.setPosition(span[0])
+        cursor.setPosition(span[1], QTextCursor.KeepAnchor)
+        self.editor.setTextCursor(cursor)
     
-    def _find_with_regex(self, pattern, case_sensitive):
-        """Find text using regex."""
+    def _find_with_regex(self, pattern, case_sensitive, start_pos=None):
+        """Find text using regex, starting at start_pos (default: cursor position)."""
         text = self.editor.toPlainText()
         cursor = self.editor.textCursor()
-        start_pos = cursor.position()
+        if start_pos is None:
+            start_pos = cursor.position()
         
-        flags = 0 if case_sensitive else re.IGNORECASE
         try:
-            for match in re.finditer(pattern, text, flags):
+            compiled, kwargs = _guarded_pattern(pattern, case_sensitive, text)
+            for match in compiled.finditer(text, **kwargs):
                 if match.start() >= start_pos:
                     cursor.setPosition(match.start())
                     cursor.setPosition(match.end(), QTextCursor.KeepAnchor)
                     self.editor.setTextCursor(cursor)
                     return True
-        except re.error:
+        except TimeoutError:
+            self.match_count_label.setText("Matches: timeout")
+        except _PATTERN_ERRORS:
             pass
         
         return False
@@ -256,18 +416,18 @@ class SearchReplaceWidget(QWidget):
         if replace_all:
             # Replace all occurrences
             if use_regex:
-                flags = 0 if case_sensitive else re.IGNORECASE
                 try:
-                    new_text = re.sub(search_text, replace_text, text, flags=flags)
-                    count = len(re.findall(search_text, text, flags=flags))
+                    compiled, kwargs = _guarded_pattern(search_text, case_sensitive, text)
+                    new_text, count = compiled.subn(replace_text, text, **kwargs)
                     self.editor.setPlainText(new_text)
-                except re.error:
+                except TimeoutError:
+                    self.match_count_label.setText("Matches: timeout")
+                except _PATTERN_ERRORS:
                     pass
             else:
                 if not case_sensitive:
                     # Case-insensitive replacement
-                    new_text = re.sub(re.escape(search_text), replace_text, text, flags=re.IGNORECASE)
-                    count = len(re.findall(re.escape(search_text), text, flags=re.IGNORECASE))
+                    new_text, count = _ci_literal_replace(text, search_text, replace_text)
                 else:
                     new_text = text.replace(search_text, replace_text)
                     count = text.count(search_text)
@@ -287,23 +447,24 @@ class SearchReplaceWidget(QWidget):
                 text_from_cursor = text[cursor.position():]
                 
                 try:
-                    match = re.search(search_text, text_from_cursor, 
-                                    0 if case_sensitive else re.IGNORECASE)
+                    pattern, kwargs = _guarded_pattern(search_text, case_sensitive, text_from_cursor)
+                    match = pattern.search(text_from_cursor, **kwargs)
                     if match:
                         # Calculate absolute position
                         abs_start = cursor.position() + match.start()
                         abs_end = cursor.position() + match.end()
                         
                         # Replace the match
-                        replacement = re.sub(search_text, replace_text, match.group(),
-                                           flags=0 if case_sensitive else re.IGNORECASE)
+                        replacement = pattern.sub(replace_text, match.group(), **kwargs)
                         
                         cursor.setPosition(abs_start)
                         cursor.setPosition(abs_end, QTextCursor.KeepAnchor)
                         cursor.insertText(replacement)
                         self.editor.setTextCursor(cursor)
                         count = 1
-                except re.error:
+                except TimeoutError:
+                    self.match_count_label.setText("Matches: timeout")
+                except _PATTERN_ERRORS:
                     pass
             else:
                 cursor = document.find(search_text, cursor, flags)
@@ -322,6 +483,7 @@ class SearchReplaceWidget(QWidget):
     def set_editor(self, editor):
         """Set the editor to search in."""
         self.editor = editor
+        self._last_highlight_state = None
     
     def focus_search(self):
         """Focus the search input field."""
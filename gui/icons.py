@@ -0,0 +1,22 @@
+"""Cached icon lookup shared by menus and toolbars."""
+
+from functools import lru_cache
+
+from PySide6.QtGui import QIcon
+from PySide6.QtWidgets import QApplication, QStyle
+
+
+@lru_cache(maxsize=64)
+def get_icon(spec):
+    """Build an icon from a QStyle pixmap, a theme name, or (theme, fallback pixmap).
+
+    Theme lookups probe the icon search path on disk, so each spec is
+    resolved once per process and the QIcon reused afterwards.
+    """
+    if isinstance(spec, QStyle.StandardPixmap):
+        return QApplication.style().standardIcon(spec)
+    if isinstance(spec, tuple):
+        theme, fallback = spec
+        icon = QIcon.fromTheme(theme)
+        return get_icon(fallback) if icon.isNull() else icon
+    return QIcon.fromTheme(spec)
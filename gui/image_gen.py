@@ -1,30 +1,72 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                                QComboBox, QPushButton, QFormLayout, QLineEdit, 
                                QScrollArea, QSplitter, QProgressBar, QMessageBox, QFileDialog, QPlainTextEdit, QInputDialog)
-from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtCore import Qt, QByteArray, QEvent, QObject, QTimer, Signal
 from PySide6.QtGui import QPixmap, QImage
 from core.workflow_manager import WorkflowManager
 from core.comfy_client import ComfyClient
+from gui.workers import PoolWorker, start_pooled
 import os
+import threading
 
-class ImageGenWorker(QThread):
-    finished = Signal(list) # list of bytes
+# Above this many pixels the live preview is scaled fast first, then smoothed
+LARGE_PREVIEW_PIXELS = 2048 * 2048
+
+def sniff_image_format(data):
+    """Return the Qt format name for encoded image bytes, from their magic number."""
+    if data[:4] == b"\x89PNG":
+        return "PNG"
+    if data[:3] == b"\xff\xd8\xff":
+        return "JPEG"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "WEBP"
+    return "PNG" # ComfyUI's SaveImage default
+
+class ImageGenSignals(QObject):
+    finished = Signal(list, str) # list of QByteArray, format of the first image
     error = Signal(str)
+    done = Signal() # always emitted last, even when cancelled
+
+class ImageGenWorker(PoolWorker):
+    """Runs a ComfyUI generation on the shared thread pool.
+
+    Setting the cancel flag aborts the wait for results and suppresses
+    the worker's signals, so a superseded request never updates the UI.
+    """
+
+    signals_class = ImageGenSignals
 
     def __init__(self, client, workflow):
         super().__init__()
         self.client = client
         self.workflow = workflow
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
 
     def run(self):
         try:
-            images = self.client.generate_image(self.workflow)
+            images = self.client.generate_image(self.workflow, cancel_event=self._cancel)
+            if self._cancel.is_set():
+                return
             if images:
-                self.finished.emit(images)
+                # Hand Qt-owned buffers to the GUI thread so decoding and saving
+                # work on them directly; the Python bytes die with this frame
+                self.signals.finished.emit(
+                    [QByteArray(data) for data in images],
+                    sniff_image_format(images[0]),
+                )
             else:
-                self.error.emit("No images returned or generation failed.")
+                self.signals.error.emit("No images returned or generation failed.")
         except Exception as e:
-            self.error.emit(str(e))
+            if not self._cancel.is_set():
+                self.signals.error.emit(str(e))
+        finally:
+            self.signals.done.emit()
 
 class ImageGenWidget(QWidget):
     def __init__(self, settings, parent=None):
@@ -74,6 +116,7 @@ class ImageGenWidget(QWidget):
         self.image_label.setAlignment(Qt.AlignCenter)
         self.image_label.setStyleSheet("border: 1px dashed #666;")
         self.image_label.setMinimumSize(400, 400)
+        self.image_label.installEventFilter(self)
         preview_layout.addWidget(self.image_label)
         
         self.save_btn = QPushButton("Save to Project")
@@ -95,71 +138,102 @@ class ImageGenWidget(QWidget):
         self.layout.addWidget(self.generate_btn)
         
         self.inputs = {} # placeholder -> widget
+        self._prompt_key = None # first placeholder containing PROMPT
+        self._widget_pool = {"label": [], "line": [], "plain": []} # detached form widgets
         self.current_image_data = None
+        self.current_image_format = "PNG"
+        self.worker = None
+        self._running_workers = set() # kept alive until run() returns, also once cancelled
+        self._full_pixmap = None
+        self._last_label_size = None
+        self._smooth_timer = QTimer(self)
+        self._smooth_timer.setSingleShot(True)
+        self._smooth_timer.setInterval(0)
+        self._smooth_timer.timeout.connect(self._smooth_rescale)
         
         # Initial load
         if self.workflow_combo.count() > 0:
             self.on_workflow_changed(self.workflow_combo.currentText())
             
         self.project_path = ""
+        self._project_dir_ok = False
+        self._default_save_dir = None # (default_image_folder setting, resolved start dir)
 
     def set_project_path(self, path):
         self.project_path = path
+        # Resolve once per project so saving doesn't stat the tree each time
+        self._project_dir_ok = bool(path) and os.path.isdir(path)
+        self._default_save_dir = None
+
+    def _save_start_dir(self):
+        """Folder the save dialog opens in: the default image folder if it exists."""
+        default_rel = self.settings.value("default_image_folder", "assets/images")
+        cached = self._default_save_dir
+        if cached is None or cached[0] != default_rel:
+            default_dir = os.path.join(self.project_path, default_rel)
+            cached = (default_rel, default_dir if os.path.isdir(default_dir) else self.project_path)
+            self._default_save_dir = cached
+        return cached[1]
 
     def refresh_workflows(self):
         self.workflow_manager.reload_workflows()
         self.workflow_combo.clear()
         self.workflow_combo.addItems(self.workflow_manager.get_workflow_names())
 
-    # ... (existing methods) ...
+    def _release_form_widgets(self):
+        """Detach all form rows and park their widgets in the pool for reuse."""
+        while self.form_layout.rowCount():
+            row = self.form_layout.takeRow(0)
+            for item in (row.labelItem, row.fieldItem):
+                widget = item.widget() if item else None
+                if widget is None:
+                    continue
+                widget.hide()
+                if isinstance(widget, QPlainTextEdit):
+                    widget.clear()
+                    self._widget_pool["plain"].append(widget)
+                elif isinstance(widget, QLineEdit):
+                    widget.clear()
+                    self._widget_pool["line"].append(widget)
+                elif isinstance(widget, QLabel):
+                    self._widget_pool["label"].append(widget)
+                else:
+                    widget.deleteLater()
 
-    def save_image(self):
-        if not self.current_image_data:
-            return
-            
-        # Ask where to save
-        # Default to project assets if possible
-        start_dir = self.project_path if self.project_path else os.getcwd()
-        
-        # Create assets/images folder if it exists in project
-        if self.project_path:
-            assets_dir = os.path.join(self.project_path, "assets")
-            if os.path.exists(assets_dir):
-                start_dir = assets_dir
-            
-        path, _ = QFileDialog.getSaveFileName(self, "Save Image", os.path.join(start_dir, "generated.png"), "Images (*.png *.jpg)")
-        if path:
-            try:
-                with open(path, "wb") as f:
-                    f.write(self.current_image_data)
-                QMessageBox.information(self, "Success", f"Saved to {path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to save: {e}")
+    def _take_pooled(self, kind):
+        pool = self._widget_pool[kind]
+        if pool:
+            widget = pool.pop()
+            widget.show()
+            return widget
+        if kind == "plain":
+            widget = QPlainTextEdit()
+            widget.setMinimumHeight(100)
+        elif kind == "line":
+            widget = QLineEdit()
+        else:
+            widget = QLabel()
+        return widget
 
     def on_workflow_changed(self, name):
-        # Clear form
-        while self.form_layout.count():
-            child = self.form_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        # Clear form, keeping the widgets around for the next workflow
+        self._release_form_widgets()
         self.inputs = {}
+        self._prompt_key = None
         
         if not name:
             return
 
         placeholders = self.workflow_manager.get_placeholders(name)
         for p in placeholders:
-            label = QLabel(p)
-            
-            if "PROMPT" in p:
-                inp = QPlainTextEdit()
-                inp.setMinimumHeight(100)
-            else:
-                inp = QLineEdit()
-                
+            label = self._take_pooled("label")
+            label.setText(p)
+            inp = self._take_pooled("plain" if "PROMPT" in p else "line")
             self.form_layout.addRow(label, inp)
             self.inputs[p] = inp
 
+        self._prompt_key = next((k for k in self.inputs if "PROMPT" in k), None)
+
     def generate(self):
         name = self.workflow_combo.currentText()
         if not name:
@@ -183,35 +257,77 @@ class ImageGenWidget(QWidget):
         url = self.settings.value("comfy_url", "http://127.0.0.1:8188")
         self.client = ComfyClient(base_url=url)
         
+        # Abort any generation still in flight; only the newest request reports back
+        if self.worker is not None:
+            self.worker.cancel()
+
         # Start Worker
         self.progress.setRange(0, 0) # Indeterminate
         self.progress.show()
         self.generate_btn.setEnabled(False)
+        self.workflow_combo.setEnabled(False)
         self.image_label.setText("Generating...")
         
         self.worker = ImageGenWorker(self.client, workflow)
-        self.worker.finished.connect(self.on_generation_finished)
-        self.worker.error.connect(self.on_generation_error)
-        self.worker.start()
+        self.worker.signals.finished.connect(self.on_generation_finished)
+        self.worker.signals.error.connect(self.on_generation_error)
+        worker = self.worker
+        self.worker.signals.done.connect(lambda: self._on_worker_done(worker))
+        start_pooled(self.worker, self._running_workers, self.worker.signals.done)
+
+    def _on_worker_done(self, worker):
+        if self.worker is worker:
+            self.worker = None
 
-    def on_generation_finished(self, images):
+    def on_generation_finished(self, images, fmt="PNG"):
         self.progress.hide()
         self.generate_btn.setEnabled(True)
+        self.workflow_combo.setEnabled(True)
         
         if images:
-            self.current_image_data = images[0] # Just show first for now
+            self.current_image_data = images[0] # Just show first for now (QByteArray)
+            self.current_image_format = fmt
             
-            # Display
-            pixmap = QPixmap()
-            pixmap.loadFromData(self.current_image_data)
-            self.image_label.setPixmap(pixmap.scaled(self.image_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            # Display; an explicit format skips Qt's plugin-by-plugin autodetect
+            image = QImage.fromData(self.current_image_data, fmt)
+            self._full_pixmap = QPixmap.fromImage(image)
+            self._rescale(force=True)
             self.save_btn.setEnabled(True)
         else:
             self.image_label.setText("No images returned.")
 
+    def eventFilter(self, obj, event):
+        if obj is self.image_label and event.type() == QEvent.Resize:
+            self._rescale()
+        return super().eventFilter(obj, event)
+
+    def _rescale(self, force=False):
+        """Scale the cached full-size pixmap to the preview label.
+
+        Skips the work when the label size is unchanged. Large images get a
+        fast preview immediately and a smooth pass once the event loop is idle.
+        """
+        if self._full_pixmap is None or self._full_pixmap.isNull():
+            return
+        size = self.image_label.size()
+        if not force and size == self._last_label_size:
+            return
+        self._last_label_size = size
+        if self._full_pixmap.width() * self._full_pixmap.height() > LARGE_PREVIEW_PIXELS:
+            self.image_label.setPixmap(self._full_pixmap.scaled(size, Qt.KeepAspectRatio, Qt.FastTransformation))
+            self._smooth_timer.start()
+        else:
+            self.image_label.setPixmap(self._full_pixmap.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+
+    def _smooth_rescale(self):
+        if self._full_pixmap is None or self._last_label_size is None:
+            return
+        self.image_label.setPixmap(self._full_pixmap.scaled(self._last_label_size, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+
     def on_generation_error(self, error):
         self.progress.hide()
         self.generate_btn.setEnabled(True)
+        self.workflow_combo.setEnabled(True)
         self.image_label.setText(f"Error: {error}")
         QMessageBox.critical(self, "Generation Error", error)
 
@@ -226,12 +342,8 @@ class ImageGenWidget(QWidget):
                 print(f"Warning: Workflow '{workflow_name}' not found. Using current.")
         
         # 2. Fill Prompt
-        # Find the input widget corresponding to %PROMPT%
-        prompt_key = None
-        for key in self.inputs:
-            if "PROMPT" in key:
-                prompt_key = key
-                break
+        # Input widget corresponding to %PROMPT% (resolved on workflow change)
+        prompt_key = self._prompt_key
         
         if prompt_key:
             widget = self.inputs[prompt_key]
@@ -245,24 +357,28 @@ class ImageGenWidget(QWidget):
         # 3. Generate
         self.generate()
 
+    def _default_image_name(self):
+        ext = {"JPEG": "jpg", "WEBP": "webp"}.get(self.current_image_format, "png")
+        return f"generated.{ext}"
+
     def save_image(self):
         """Save generated image to a chosen folder in the project, with option to create a subfolder."""
         if not self.current_image_data:
             return
 
         # If no project set, fall back to old behavior
-        if not self.project_path or not os.path.isdir(self.project_path):
+        if not self._project_dir_ok:
             start_dir = os.getcwd()
             path, _ = QFileDialog.getSaveFileName(
                 self,
                 "Save Image",
-                os.path.join(start_dir, "generated.png"),
+                os.path.join(start_dir, self._default_image_name()),
                 "Images (*.png *.jpg *.webp)"
             )
             if path:
                 try:
                     with open(path, "wb") as f:
-                        f.write(self.current_image_data)
+                        f.write(self.current_image_data.data())
                     QMessageBox.information(self, "Success", f"Saved to {path}")
                 except Exception as e:
                     QMessageBox.critical(self, "Error", f"Failed to save: {e}")
@@ -271,9 +387,7 @@ class ImageGenWidget(QWidget):
         root_path = self.project_path
 
         # Determine default start directory from settings (relative to project)
-        default_rel = self.settings.value("default_image_folder", "assets/images")
-        default_dir = os.path.join(root_path, default_rel)
-        start_dir = default_dir if os.path.isdir(default_dir) else root_path
+        start_dir = self._save_start_dir()
 
         # 1) Choose target folder within project
         folder = QFileDialog.getExistingDirectory(
@@ -322,12 +436,14 @@ class ImageGenWidget(QWidget):
             folder = os.path.join(folder, subfolder_name)
             try:
                 os.makedirs(folder, exist_ok=True)
+                # The default image folder may exist now
+                self._default_save_dir = None
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to create folder: {e}")
                 return
 
-        # 3) Ask for filename (default .png)
-        default_name = "generated.png"
+        # 3) Ask for filename (extension matches the generated format)
+        default_name = self._default_image_name()
         filename, ok = QInputDialog.getText(
             self,
             "Save Image",
@@ -357,7 +473,7 @@ class ImageGenWidget(QWidget):
         # 5) Write binary
         try:
             with open(full_path, "wb") as f:
-                f.write(self.current_image_data)
+                f.write(self.current_image_data.data())
             QMessageBox.information(self, "Success", f"Saved to {full_path}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save: {e}")
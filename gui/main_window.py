@@ -1,30 +1,19 @@
-from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSplitter, QFileDialog, QMenuBar, QMenu, QStackedWidget, QMessageBox, QStyle, QInputDialog, QProgressDialog, QProgressBar
-from PySide6.QtGui import QAction, QIcon, QKeySequence
-from PySide6.QtCore import Qt, QThread, Signal, QCoreApplication, QSettings
+from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSplitter, QFileDialog, QMessageBox, QInputDialog
+from PySide6.QtCore import Qt, Slot, QSettings, QTimer
 
 from gui.sidebar import Sidebar
 from core.project import ProjectManager
 from core.llm_provider import OllamaProvider, LMStudioNativeProvider
-from core.rag_engine import RAGEngine
 from gui.spell_checker import InkwellSpellChecker
 
-from gui.dialogs.settings_dialog import SettingsDialog
-from gui.dialogs.model_manager_dialog import ModelManagerDialog
-from gui.dialogs.diff_dialog import DiffDialog
-from gui.dialogs.image_dialog import ImageSelectionDialog
-from gui.editor import EditorWidget, DocumentWidget, ImageViewerWidget
+from gui.editor import EditorWidget
 from gui.chat import ChatWidget
 from gui.welcome import WelcomeWidget
-from gui.image_gen import ImageGenWidget
 
 from gui.controllers import MenuBarManager, ProjectController, EditorController, ChatController
 
-from gui.workers import ChatWorker, ToolWorker, IndexWorker
-import re
+from gui.workers import ModelInfoWorker, start_pooled
 import os
-import hashlib
-import difflib
-import shutil
 from core.tools import register_default_tools
 from core.tools.registry import register_by_names
 
@@ -54,21 +43,29 @@ class MainWindow(QMainWindow):
         self.settings = QSettings("InkwellAI", "InkwellAI")
         self.rag_engine = None
         self._last_token_usage = None
+        self._provider_cache = {}  # (provider_name, url) -> provider instance
+        self._model_manager = None  # built on first use, see get_model_manager
+        self._vision_models = {}  # (provider_name, model) -> accepts images
+        self._model_info_worker = None  # latest model list request; older results are ignored
+        self._model_info_workers = set()  # keeps pool runnables alive until done
         
         # Initialize spell-checker (global, will update project_root when project opens)
         self.spell_checker = InkwellSpellChecker()
         spell_check_enabled = self.settings.value("spell_check_enabled", True, type=bool)
         self.spell_checker.set_enabled(spell_check_enabled)
         
-        # Central Stack (Welcome vs Main Interface)
-        self.stack = QStackedWidget()
-        self.setCentralWidget(self.stack)
+        # Central area: welcome screen or main interface, one visible at a time.
+        # A plain layout only lays out the visible page, unlike a stacked widget.
+        central = QWidget()
+        central_layout = QVBoxLayout(central)
+        central_layout.setContentsMargins(0, 0, 0, 0)
+        self.setCentralWidget(central)
         
         # 1. Welcome Screen
         self.welcome_widget = WelcomeWidget()
         self.welcome_widget.open_clicked.connect(self.open_project_dialog)
         self.welcome_widget.recent_clicked.connect(self.open_project)
-        self.stack.addWidget(self.welcome_widget)
+        central_layout.addWidget(self.welcome_widget)
         
         # 2. Main Interface
         self.main_interface = QWidget()
@@ -100,8 +97,8 @@ class MainWindow(QMainWindow):
             pass
         self.content_splitter.addWidget(self.editor)
         
-        # Image Studio
-        self.image_gen = ImageGenWidget(self.settings)
+        # Image Studio is built the first time it is shown (see image_gen)
+        self._image_gen = None
         
         # Chat Interface
         self.chat = ChatWidget()
@@ -148,17 +145,18 @@ class MainWindow(QMainWindow):
         except Exception:
             pass
 
-        # Initialize model controls
-        self.update_model_controls()
+        # Fill model controls once the event loop runs; listing models probes the
+        # provider over the network and would otherwise delay the first paint
+        QTimer.singleShot(0, self.update_model_controls)
         
         # Set initial sizes
         self.main_splitter.setSizes([240, 960])
         self.content_splitter.setSizes([700, 260])
         
-        self.stack.addWidget(self.main_interface)
+        central_layout.addWidget(self.main_interface)
         
         # Start at Welcome
-        self.stack.setCurrentWidget(self.welcome_widget)
+        self.show_main_interface(False)
         
         # Token dashboard in status bar
         self.token_status = QLabel("Tokens: --/-- | Cache: -- | Index: idle")
@@ -167,49 +165,68 @@ class MainWindow(QMainWindow):
         # Load Recent Projects for Welcome Screen
         self.project_controller.update_welcome_screen()
 
-        # Auto-open last project
+        # Auto-open last project once the event loop runs, so the window paints first
+        QTimer.singleShot(0, self._open_last_project)
+
+    def _open_last_project(self):
+        """Reopen the project that was open when the app last closed."""
+        if self.project_manager.root_path:
+            return  # A project was opened before the event loop started
         last_project = self.settings.value("last_project")
-        if last_project and os.path.exists(last_project):
+        if last_project and os.path.isdir(last_project):
             self.project_controller.open_project(last_project)
 
+    def show_main_interface(self, show=True):
+        """Switch between the main interface and the welcome screen."""
+        self.welcome_widget.setVisible(not show)
+        self.main_interface.setVisible(show)
+
     # ========== Delegation Methods (Controller Wrappers) ==========
     # These methods delegate to controllers for backward compatibility
     
     # Project operations -> ProjectController
+    @Slot()
     def open_project_dialog(self):
         """Delegate to ProjectController."""
         self.project_controller.open_project_dialog()
     
+    @Slot(str)
     def open_project(self, path):
         """Delegate to ProjectController."""
         self.project_controller.open_project(path)
     
+    @Slot()
     def close_project(self):
         """Delegate to ProjectController."""
         self.project_controller.close_project()
     
+    @Slot()
     def save_project_state(self):
-        """Delegate to ProjectController."""
-        self.project_controller.save_project_state()
+        """Delegate to ProjectController, which coalesces bursts into one save."""
+        self.project_controller.schedule_save_project_state()
     
     def restore_project_state(self):
         """Delegate to ProjectController."""
         self.project_controller.restore_project_state()
     
     # File operations handled directly or via EditorController
+    @Slot()
     def save_current_file(self):
         """Delegate to EditorController."""
         self.editor_controller.save_current_file()
     
+    @Slot()
     def undo_file_change(self):
         """Delegate to EditorController."""
         self.editor_controller.undo_file_change()
     
+    @Slot()
     def redo_file_change(self):
         """Delegate to EditorController."""
         self.editor_controller.redo_file_change()
     
     # Chat operations -> ChatController (commented out as most are already connected to controller)
+    @Slot()
     def open_chat_history(self):
         """Delegate to ChatController."""
         self.chat_controller.open_chat_history()
@@ -219,49 +236,87 @@ class MainWindow(QMainWindow):
         self.project_controller.update_welcome_screen()
 
     def update_model_controls(self, refresh: bool = False):
-        """Update model controls with current settings and available models."""
+        """Update model controls with current settings and available models.
+
+        Listing models and checking each for vision can take a request per
+        model, so it runs on the thread pool and the controls fill in when
+        it finishes.
+        """
         try:
             provider_name = self.settings.value("llm_provider", "Ollama")
             if provider_name in ("LM Studio", "LM Studio (API)"):
                 provider_name = "LM Studio (Native SDK)"
                 self.settings.setValue("llm_provider", provider_name)
             provider = self.get_llm_provider()
-            
-            # Get available models
-            try:
-                models = provider.list_models(refresh=refresh)
-            except TypeError:
-                models = provider.list_models()
-            
-            # Determine which models support vision
-            vision_models = [m for m in models if provider.is_vision_model(m)]
-            loaded_models = []
-            if hasattr(provider, "get_loaded_models"):
-                try:
-                    loaded = provider.get_loaded_models(refresh=refresh)
-                    if loaded:
-                        loaded_models = loaded
-                except Exception:
-                    loaded_models = []
-            
-            # Get current model based on provider
-            if provider_name == "Ollama":
-                current_model = self.settings.value("ollama_model", "llama3")
-            else:
-                current_model = self.settings.value("lm_studio_model", "default")
-            
-            # Update UI with vision model indicators
-            self.chat.update_model_info(provider_name, current_model, models, vision_models, loaded_models)
         except Exception as e:
             print(f"DEBUG: Failed to update model controls: {e}")
             # Set defaults
             self.chat.update_model_info("Ollama", "llama3", ["llama3"], [])
-    
+            return
+
+        _, current_model = self._model_info_key()
+        worker = ModelInfoWorker(provider, refresh=refresh, current_model=current_model)
+        self._model_info_worker = worker
+        worker.signals.finished.connect(
+            lambda models, vision_models, loaded_models, w=worker, name=provider_name:
+                self._on_model_info(w, name, models, vision_models, loaded_models)
+        )
+        start_pooled(worker, self._model_info_workers, worker.signals.finished)
+
+    def _on_model_info(self, worker, provider_name, models, vision_models, loaded_models):
+        vision = set(vision_models)
+        for name in (*models, worker.current_model):
+            if name:
+                self._vision_models[(provider_name, name)] = name in vision
+        if worker is not self._model_info_worker:
+            return  # The provider or model list was requested again meanwhile
+
+        # Get current model based on provider
+        if provider_name == "Ollama":
+            current_model = self.settings.value("ollama_model", "llama3")
+        else:
+            current_model = self.settings.value("lm_studio_model", "default")
+
+        # Update UI with vision model indicators
+        self.chat.update_model_info(provider_name, current_model, models, vision_models, loaded_models or [])
+
+    def _model_info_key(self):
+        """(provider name, model) as ModelInfoWorker results are filed under."""
+        provider_name = self.settings.value("llm_provider", "Ollama")
+        if provider_name in ("LM Studio", "LM Studio (API)"):
+            provider_name = "LM Studio (Native SDK)"
+        if provider_name == "Ollama":
+            return provider_name, self.settings.value("ollama_model", "llama3")
+        return provider_name, self.settings.value("lm_studio_model", "default")
+
+    def ensure_model_info(self):
+        """Fetch the model list unless the current model is known or already being fetched."""
+        if self._model_info_key() in self._vision_models:
+            return
+        if self._model_info_worker in self._model_info_workers:
+            return
+        self.update_model_controls()
+
+    def is_vision_model(self, model):
+        """Whether model accepts images, from the last ModelInfoWorker result.
+
+        Never asks the provider here: until the model info arrives the model
+        is treated as text-only, and a fetch is started if none is pending.
+        """
+        provider_name, _ = self._model_info_key()
+        is_vision = self._vision_models.get((provider_name, model))
+        if is_vision is None:
+            self.ensure_model_info()
+            return False
+        return is_vision
+
+    @Slot(str)
     def on_provider_changed(self, provider_name):
         """Handle provider selection change."""
         self.settings.setValue("llm_provider", provider_name)
         self.update_model_controls()
     
+    @Slot(str)
     def on_model_changed(self, model_name):
         """Handle model selection change."""
         # Get the raw model name (strip vision indicator if present)
@@ -283,10 +338,12 @@ class MainWindow(QMainWindow):
         else:
             self.settings.setValue("lm_studio_model", raw_model)
     
+    @Slot()
     def on_refresh_models(self):
         """Refresh available models from provider."""
         self.update_model_controls(refresh=True)
     
+    @Slot(str)
     def on_persona_changed(self, persona_name):
         """Handle persona selection change."""
         if self.project_manager.get_root_path():
@@ -297,6 +354,7 @@ class MainWindow(QMainWindow):
                 self.project_manager.select_active_persona(persona_name)
             self.project_manager.save_tool_config()
 
+    @Slot()
     def on_context_file_add(self):
         root = self.project_manager.get_root_path()
         if not root:
@@ -314,6 +372,7 @@ class MainWindow(QMainWindow):
             return
         self.chat_controller.add_context_file(path)
 
+    @Slot(str)
     def on_context_file_remove(self, path: str):
         self.chat_controller.remove_context_file(path)
     
@@ -327,479 +386,33 @@ class MainWindow(QMainWindow):
             # Legacy selections map to Native SDK
             provider_name = "LM Studio (Native SDK)"
             self.settings.setValue("llm_provider", provider_name)
-        if provider_name == "Ollama":
-            url = self.settings.value("ollama_url", "http://localhost:11434")
-            return OllamaProvider(base_url=url)
-        elif provider_name == "LM Studio (Native SDK)":
+        if provider_name == "LM Studio (Native SDK)":
             url = self.settings.value("lm_studio_native_url", "localhost:1234")
-            return LMStudioNativeProvider(base_url=url)
+            provider_cls = LMStudioNativeProvider
         else:
-            # Default fallback
+            # Ollama, and the default fallback
+            provider_name = "Ollama"
             url = self.settings.value("ollama_url", "http://localhost:11434")
-            return OllamaProvider(base_url=url)
+            provider_cls = OllamaProvider
 
-    def is_response_complete(self, response: str) -> bool:
-        """Check if the response appears complete.
-        Returns False if response is likely incomplete (missing closing blocks, etc.)"""
-        # Check for incomplete UPDATE blocks
-        update_opens = response.count(":::UPDATE")
-        update_closes = response.count(":::END:::") + response.count(":::END") + response.count(":::")
-        # Note: this is a heuristic; could have false positives but better safe than sorry
-        
-        # If there are unclosed UPDATE blocks, response is incomplete
-        if update_opens > 0 and update_closes < update_opens:
-            return False
-        
-        # Check for incomplete GENERATE_IMAGE blocks
-        gen_opens = response.count(":::GENERATE_IMAGE")
-        if gen_opens > 0 and update_closes < gen_opens:
-            return False
-        
-        # If response ends abruptly with specific tokens, it's likely incomplete
-        incomplete_endings = [
-            "- ",
-            "* ",
-            "1. ",
-            ": ",
-            "and ",
-            "or ",
-            "in ",
-            "the ",
-        ]
-        
-        # Only flag if it's a very short ending
-        if len(response) > 50:
-            for ending in incomplete_endings:
-                if response.rstrip().endswith(ending):
-                    return False
-        
-        return True
-
-    def _continue_response(self):
-        """Automatically continue the previous response."""
-        provider = self.get_llm_provider()
-        model = self.settings.value("ollama_model", "llama3")
-        # Get system prompt from active persona/system prompt file, or use default
-        system_prompt = self.project_manager.get_system_prompt(
-            self.settings.value("system_prompt", "You are Inkwell AI, a creative writing assistant. Help users with their fiction, characters, worldbuilding, and storytelling.")
-        )
-
-        self.worker = ChatWorker(
-            provider,
-            self.chat_history,
-            model,
-            [],
-            system_prompt,
-            images=None,
-            enabled_tools=self.project_manager.get_enabled_tools(),
-            structured_enabled=bool(self.settings.value("structured_enabled", False, type=bool)),
-            schema_id=self.settings.value("structured_schema_id", "None") if self.settings.value("structured_enabled", False, type=bool) else None,
-        )
-        self.worker.response_received.connect(self.chat_controller.on_chat_response)
-        self.worker.start()
-        self._update_token_dashboard()
-
-    def _normalize_edit_path(self, raw_path: str, active_path: str | None) -> str:
-        """Make path extraction more forgiving.
-        - Strip quotes/backticks/angle brackets
-        - Collapse redundant slashes
-        - If path seems to be just a basename, try to resolve in project
-        - Fallback to active file when path is empty
-        """
-        path = raw_path.strip()
-        # Remove enclosing quotes/backticks/angle brackets
-        if (path.startswith('"') and path.endswith('"')) or (path.startswith("'") and path.endswith("'")):
-            path = path[1:-1]
-        if (path.startswith('<') and path.endswith('>')) or (path.startswith('`') and path.endswith('`')):
-            path = path[1:-1]
-        # Normalize slashes but DO NOT strip leading '/'
-        path = path.replace('\\', '/')
-        # Remove a single leading './' if present
-        if path.startswith('./'):
-            path = path[2:]
-        # Drop any accidental line markers or closers appended to the path
-        if '\n' in path:
-            path = path.splitlines()[0].strip()
-        # If a line marker like " L12:" got attached, cut it off
-        import re as _re
-        path = _re.split(r"\s+L\d+:", path)[0].strip()
-        # Remove stray block terminators if present
-        for marker in (":::END:::", ":::END", ":::"):
-            if marker in path:
-                path = path.split(marker)[0].strip()
-        # Collapse duplicate slashes (preserving a single leading '/')
-        while '//' in path:
-            path = path.replace('//', '/')
-        path = path.strip()
-        # If empty, fallback to active file if available
-        if not path and active_path:
-            return active_path
-        # If it's an absolute path within project, convert to relative
-        if self.project_manager.root_path and os.path.isabs(path):
-            try:
-                rel = os.path.relpath(path, self.project_manager.root_path)
-                if not rel.startswith('..'):
-                    path = rel
-            except Exception:
-                pass
-        # If no directories (basename only), try to resolve in project
-        if '/' not in path and self.project_manager.root_path:
-            candidates = []
-            for root, dirs, files in os.walk(self.project_manager.root_path):
-                for f in files:
-                    if f == path:
-                        candidates.append(os.path.relpath(os.path.join(root, f), self.project_manager.root_path))
-            if len(candidates) == 1:
-                return candidates[0]
-            elif len(candidates) > 1 and active_path:
-                # Prefer same directory as active file when possible
-                active_dir = os.path.dirname(active_path)
-                for c in candidates:
-                    if os.path.dirname(c) == active_dir:
-                        return c
-                # Fallback to closest match by dir length
-                candidates.sort(key=lambda p: len(os.path.dirname(p)))
-                return candidates[0]
-        # Fuzzy correction: if path not found, try close matches against project files
-        if self.project_manager.root_path:
-            target = path.split('/')[-1]
-            index = []
-            for root, dirs, files in os.walk(self.project_manager.root_path):
-                for f in files:
-                    index.append(os.path.relpath(os.path.join(root, f), self.project_manager.root_path))
-            basenames = [os.path.basename(p) for p in index]
-            matches = difflib.get_close_matches(target, basenames, n=1, cutoff=0.8)
-            if matches:
-                m = matches[0]
-                # Pick the path whose basename equals the match
-                for p in index:
-                    if os.path.basename(p) == m:
-                        return p
-        return path
-
-    def _apply_patch_block(self, file_path: str, patch_body: str) -> tuple[bool, str | None]:
-        """Apply a PATCH block to a file's current content and return new content.
-
-        PATCH lines format: L42: old => new
-        Only single-line replacements are supported. If the old text is not found on the line,
-        the entire line is replaced with the new text.
-        Also supports range replacements: L10-L15: followed by either inline text or a fenced
-        block (```...```) containing the replacement lines.
-        """
-        print(f"DEBUG: _apply_patch_block called for {file_path}, body length: {len(patch_body)}, first 100 chars: {patch_body[:100]!r}")
-        
-        try:
-            current = self.project_manager.read_file(file_path)
-        except Exception as e:
-            print(f"DEBUG: Failed to read file for patch {file_path}: {e}")
-            return False, None
-
-        if current is None:
-            print(f"DEBUG: No content to patch for {file_path}")
-            return False, None
-
-        lines = current.split("\n")
-        original_had_trailing_newline = current.endswith("\n")
-        applied_any = False
-
-        # Prefer range replacements over inline segments if any range marker exists
-        has_range_marker = re.search(r"L\d+\s*-\s*L\d+:", patch_body) is not None
-        # Support inline bodies without newlines: split using L\d+: markers
-        inline_segments = [] if has_range_marker else list(
-            re.finditer(r"L(\d+):\s*(.*?)(?=\s+L\d+:|\s+L\d+\s*-\s*L\d+:|$)", patch_body, flags=re.DOTALL)
-        )
-        if inline_segments:
-            for seg in inline_segments:
-                line_no = int(seg.group(1))
-                new_text = seg.group(2).strip()
-                if line_no < 1 or line_no > len(lines):
-                    print(f"DEBUG: Patch line out of range L{line_no} for {file_path}")
-                    continue
-                lines[line_no - 1] = new_text
-                applied_any = True
-        else:
-            raw_lines = patch_body.splitlines()
-            i = 0
-            while i < len(raw_lines):
-                raw = raw_lines[i]
-                line = raw.strip()
-                i += 1
-                if not line:
-                    continue
-                # Range replacement: Lx-Ly:
-                m_range = re.match(r"L(\d+)\s*-\s*L(\d+):\s*(.*)", line)
-                if m_range:
-                    start_no = int(m_range.group(1))
-                    end_no = int(m_range.group(2))
-                    trailing = m_range.group(3).strip()
-                    repl_lines: list[str] = []
-                    # If inline text present after ':', use it as the first replacement line,
-                    # then continue capturing subsequent lines until a directive or end.
-                    if trailing:
-                        repl_lines.append(trailing)
-                    # If next line starts a fenced block, capture until closing fence
-                    if i < len(raw_lines) and raw_lines[i].strip().startswith("```"):
-                        i += 1
-                        while i < len(raw_lines) and not raw_lines[i].strip().startswith("```"):
-                            repl_lines.append(raw_lines[i])
-                            i += 1
-                        # Skip closing fence if present
-                        if i < len(raw_lines) and raw_lines[i].strip().startswith("```"):
-                            i += 1
-                    else:
-                        # Otherwise, capture until next directive or end
-                        while i < len(raw_lines):
-                            peek = raw_lines[i]
-                            if re.match(r"\s*L\d+:", peek) or re.match(r"\s*L\d+\s*-\s*L\d+:", peek):
-                                break
-                            repl_lines.append(peek)
-                            i += 1
-                    # Safety: strip any stray leading/trailing fences inside captured lines
-                    if repl_lines:
-                        if repl_lines[0].strip().startswith("```"):
-                            repl_lines = repl_lines[1:]
-                        if repl_lines and repl_lines[-1].strip().startswith("```"):
-                            repl_lines = repl_lines[:-1]
-                    # Apply replacement to target range
-                    s_idx = max(1, start_no)
-                    e_idx = min(len(lines), end_no)
-                    if s_idx > e_idx:
-                        print(f"DEBUG: Invalid range L{start_no}-L{end_no} for {file_path}")
-                        continue
-                    print(f"DEBUG: Applying PATCH range L{start_no}-L{end_no}: replacing {e_idx - s_idx + 1} lines with {len(repl_lines)} lines")
-                    # Replace slice with repl_lines
-                    before = lines[:s_idx - 1]
-                    after = lines[e_idx:]
-                    lines = before + repl_lines + after
-                    applied_any = True
-                    continue
-                # With old=>new or old->new
-                m = re.match(r"L(\d+):\s*(.+?)\s*(?:=>|->)\s*(.+)", line)
-                if m:
-                    line_no = int(m.group(1))
-                    old_text = m.group(2)
-                    new_text = m.group(3)
-                    if line_no < 1 or line_no > len(lines):
-                        print(f"DEBUG: Patch line out of range L{line_no} for {file_path}")
-                        continue
-                    current_line = lines[line_no - 1]
-                    if old_text in current_line:
-                        lines[line_no - 1] = current_line.replace(old_text, new_text, 1)
-                    else:
-                        lines[line_no - 1] = new_text
-                    applied_any = True
-                    continue
-                # Without old text: set entire line
-                m2 = re.match(r"L(\d+):\s*(.+)", line)
-                if m2:
-                    line_no = int(m2.group(1))
-                    new_text = m2.group(2).strip()
-                    if line_no < 1 or line_no > len(lines):
-                        print(f"DEBUG: Patch line out of range L{line_no} for {file_path}")
-                        continue
-                    lines[line_no - 1] = new_text
-                    applied_any = True
-                else:
-                    print(f"DEBUG: Skipping unrecognized patch line: {line}")
-
-        if not applied_any:
-            return False, None
-
-        new_content = "\n".join(lines)
-        if original_had_trailing_newline and not new_content.endswith("\n"):
-            new_content += "\n"
-        # Debug snippet around the patched range to verify correctness
-        try:
-            sample_start = max(0, s_idx - 5)
-            sample_end = min(len(new_content.split("\n")), e_idx + 5)
-            snippet = "\n".join(new_content.split("\n")[sample_start:sample_end])
-            print(f"DEBUG: Patched snippet around L{s_idx}-L{e_idx}:\n{snippet}")
-        except Exception:
-            pass
-        return True, new_content
-
-    def _apply_unified_diff(self, file_path: str, diff_text: str) -> tuple[bool, str | None]:
-        """Apply a unified diff (fenced ```diff block) to a file's content.
-
-        Supports multiple hunks with lines starting by ' ', '+', '-'.
-        Reconstructs new content based on original file and diff hunks.
-        """
-        try:
-            original = self.project_manager.read_file(file_path)
-        except Exception as e:
-            print(f"DEBUG: Failed to read file for unified diff {file_path}: {e}")
-            return False, None
-
-        if original is None:
-            print(f"DEBUG: No content to patch for unified diff {file_path}")
-            return False, None
-
-        orig_lines = original.split("\n")
-        new_lines: list[str] = []
-        orig_idx = 0  # pointer into original lines
-
-        lines = diff_text.splitlines()
-
-        # Skip headers (---, +++)
-        i = 0
-        while i < len(lines) and (lines[i].startswith('--- ') or lines[i].startswith('+++ ')):
-            i += 1
-
-        hunk_header_re = re.compile(r"@@\s*-([0-9]+)(?:,([0-9]+))?\s*\+([0-9]+)(?:,([0-9]+))?\s*@@")
-        any_applied = False
-
-        while i < len(lines):
-            if not lines[i].startswith('@@'):
-                # Not a hunk header, skip
-                i += 1
-                continue
-
-            m = hunk_header_re.match(lines[i])
-            i += 1
-            if not m:
-                continue
-            # Parse original and new ranges (we mainly use original start for copying unaffected parts)
-            orig_start = int(m.group(1))
-            # Copy unchanged chunk before this hunk
-            target_orig_pos = max(0, orig_start - 1)
-            if target_orig_pos > orig_idx:
-                new_lines.extend(orig_lines[orig_idx:target_orig_pos])
-                orig_idx = target_orig_pos
-
-            # Process hunk body until next hunk header or end
-            while i < len(lines) and not lines[i].startswith('@@') and not lines[i].startswith('--- ') and not lines[i].startswith('+++ '):
-                line = lines[i]
-                i += 1
-                if not line:
-                    # Preserve blank lines when context or addition
-                    # Treat as context if no prefix
-                    new_lines.append('')
-                    continue
-                prefix = line[0]
-                content = line[1:] if len(line) > 1 else ''
-                if prefix == ' ':
-                    # Context line: copy from original when available, fallback to provided content
-                    if orig_idx < len(orig_lines):
-                        new_lines.append(orig_lines[orig_idx])
-                        orig_idx += 1
-                    else:
-                        new_lines.append(content)
-                elif prefix == '-':
-                    # Removal: advance original pointer (skip)
-                    if orig_idx < len(orig_lines):
-                        orig_idx += 1
-                elif prefix == '+':
-                    # Addition: add content
-                    new_lines.append(content)
-                else:
-                    # Unknown marker; default to context behavior
-                    if orig_idx < len(orig_lines):
-                        new_lines.append(orig_lines[orig_idx])
-                        orig_idx += 1
-                    else:
-                        new_lines.append(line)
-            any_applied = True
-
-        # Append remaining original content after last hunk
-        if orig_idx < len(orig_lines):
-            new_lines.extend(orig_lines[orig_idx:])
-
-        if not any_applied:
-            return False, None
-
-        new_content = "\n".join(new_lines)
-        # Preserve trailing newline behavior
-        if original.endswith("\n") and not new_content.endswith("\n"):
-            new_content += "\n"
-        return True, new_content
-
-    def _merge_apply_within_range(self, old_text: str, new_text: str, start_line: int, end_line: int) -> str:
-        """Merge changes by applying only the selected line range from new_text.
-
-        Lines are 1-based. If range exceeds bounds, it is clamped.
-        """
-        old_lines = old_text.split("\n")
-        new_lines = new_text.split("\n")
-        n = max(len(old_lines), len(new_lines))
-        # Clamp
-        s = max(1, start_line)
-        e = min(n, end_line)
-        if s > e:
-            return new_text  # nothing sensible, fallback to new_text
-        # Build merged
-        pre = old_lines[:s-1]
-        mid = new_lines[s-1:e]
-        post = old_lines[e:]
-        merged = "\n".join(pre + mid + post)
-        # Preserve trailing newline if old had one
-        if old_text.endswith("\n") and not merged.endswith("\n"):
-            merged += "\n"
-        return merged
+        # Reuse the provider (and its HTTP connections) across chat turns
+        key = (provider_name, url)
+        provider = self._provider_cache.get(key)
+        if provider is None:
+            provider = provider_cls(base_url=url)
+            self._provider_cache[key] = provider
+        return provider
 
-    def _find_unfenced_unified_diff_blocks(self, text: str) -> list[tuple[str, str]]:
-        """Extract unfenced unified diff blocks and their target paths.
+    def get_model_manager(self):
+        """Shared ModelManager for loading models and reading their capabilities.
 
-        Returns a list of tuples (diff_text, target_path).
-        A block starts with '--- ' followed by '+++ ' and continues while lines
-        start with '@@', '+', '-', ' ', or are blank, until the next '--- ' header
-        or a non-diff line.
+        Rebuilt after the settings change, like the cached providers.
         """
-        blocks: list[tuple[str, str]] = []
-        lines = text.splitlines(keepends=True)
-        i = 0
+        if self._model_manager is None:
+            from core.model_manager import ModelManager, build_default_sources
+            self._model_manager = ModelManager(build_default_sources(self.settings))
+        return self._model_manager
 
-        def header_path(line: str) -> str:
-            p = line[4:].strip() if len(line) > 4 else ''
-            if p.startswith('a/') or p.startswith('b/'):
-                p = p[2:]
-            return p
-
-        while i < len(lines):
-            if not lines[i].startswith('--- '):
-                i += 1
-                continue
-            start = i
-            i += 1
-            if i >= len(lines) or not lines[i].startswith('+++ '):
-                # Not a valid diff header pair
-                continue
-            plus_header = lines[i]
-            i += 1
-
-            # Consume hunk bodies
-            while i < len(lines):
-                l = lines[i]
-                if l.startswith('--- '):
-                    # Next diff block header encountered
-                    break
-                if l.startswith('@@') or (l and l[0] in ('+', '-', ' ')) or l.strip() == '':
-                    i += 1
-                    continue
-                # Non-diff line marks end of block
-                break
-
-            end = i
-            diff_text = ''.join(lines[start:end])
-            target_path = header_path(plus_header)
-            blocks.append((diff_text, target_path))
-        return blocks
-
-    def _strip_unknown_edit_links(self, html: str) -> str:
-        """Remove or unwrap any edit: links that are not backed by pending edits."""
-        def _replace(match):
-            edit_id = match.group(1)
-            link_text = match.group(2) or ""
-            if edit_id in self.chat_controller.pending_edits:
-                return match.group(0)
-            print(f"DEBUG: Dropping stale edit link: {edit_id}")
-            return link_text
-
-        pattern = r"<a\s+[^>]*href=[\"']edit:([^\"']+)[\"'][^>]*>(.*?)</a>"
-        return re.sub(pattern, _replace, html, flags=re.IGNORECASE | re.DOTALL)
-
-
-
-    
     def on_index_progress(self, current, total, file_path):
         """Update progress bar during indexing."""
         if hasattr(self, 'indexing_progress'):
@@ -827,15 +440,25 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """Handle application close event."""
         self.project_controller.shutdown_on_close()
+        # os._exit skips QSettings' destructor, so write pending changes once here
+        self.settings.sync()
         # Force hard exit to avoid destructor issues
         import os
         os._exit(0)
 
     # Project closing is now handled by ProjectController._shutdown_project_session()
 
+    @Slot()
     def open_settings_dialog(self):
+        # Dialogs are imported on first use; they aren't needed to start up
+        from gui.dialogs.settings_dialog import SettingsDialog
         dialog = SettingsDialog(self)
         if dialog.exec():
+            # Providers are rebuilt lazily from the saved settings
+            self._provider_cache.clear()
+            self._model_manager = None
+            self._vision_models.clear()
+            self.chat_controller.apply_cache_settings()
             # Re-register tools based on updated project settings
             try:
                 enabled = self.project_manager.get_enabled_tools()
@@ -858,10 +481,33 @@ class MainWindow(QMainWindow):
                 active_name, _ = self.project_manager.get_active_persona()
                 self.chat.update_personas(personas, active_name)
 
+    @Slot()
     def open_model_manager(self):
+        from gui.dialogs.model_manager_dialog import ModelManagerDialog
         dialog = ModelManagerDialog(self.settings, self)
         dialog.exec()
+        # Pick up preference changes made in the dialog
+        self._model_manager = None
 
+    @property
+    def image_gen(self):
+        """The Image Studio widget, created on first use.
+        
+        Building it loads the ComfyUI workflow files, which most sessions never need.
+        """
+        if self._image_gen is None:
+            from gui.image_gen import ImageGenWidget
+            self._image_gen = ImageGenWidget(self.settings)
+            if self.project_manager.root_path:
+                self._image_gen.set_project_path(self.project_manager.root_path)
+        return self._image_gen
+
+    @property
+    def has_image_gen(self):
+        """Whether the Image Studio widget has been created yet."""
+        return self._image_gen is not None
+
+    @Slot()
     def open_image_studio(self):
         # Check if already open
         index = self.editor.tabs.indexOf(self.image_gen)
@@ -891,118 +537,12 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Tool Error", f"Error executing {tool.name}: {str(e)}")
             print(f"Error in on_tool_dialog_triggered: {e}")
 
+    @Slot(str)
     def on_file_double_clicked(self, file_path):
-        """Handle file double-click in sidebar.
-        
-        Args:
-            file_path: Full path to the file that was clicked
-        """
-        if os.path.isfile(file_path):
-            # Check if already open to avoid overwriting unsaved changes
-            if file_path in self.editor.open_files:
-                self.editor.open_file(file_path, None) # Content ignored if open
-            else:
-                # Check extension
-                ext = os.path.splitext(file_path)[1].lower()
-                if ext in ['.png', '.jpg', '.jpeg', '.gif', '.bmp']:
-                    self.editor.open_file(file_path, None)
-                else:
-                    content = self.project_manager.read_file(file_path)
-                    if content is not None:
-                        self.editor.open_file(file_path, content)
-
-    def on_tool_finished(self, result_text, extra_data):
-        self.chat.remove_thinking()
-        
-        if extra_data: # Image Results
-            # Fix AttributeError: use self.project_manager.root_path instead of self.project_path
-            dialog = ImageSelectionDialog(extra_data, self.project_manager.root_path, self)
-            if dialog.exec():
-                saved_paths = dialog.get_saved_paths()
-                if saved_paths:
-                    msg_lines = []
-                    for p in saved_paths:
-                        name = os.path.basename(p)
-                        self.chat.append_message("System", f"Image saved to: {name}")
-                        msg_lines.append(f"User selected and saved image to {name}")
-                    
-                    # Notify agent but DO NOT continue chat loop automatically
-                    # This prevents the AI from asking "Do you want another?" -> Tool -> Dialog loop
-                    result_msg = "\n".join(msg_lines)
-                    self.chat_history.append({"role": "user", "content": f"Tool Output: {result_msg}"})
-                    self.chat.append_message("System", "Task completed.")
-            else:
-                 self.chat.append_message("System", "Image selection cancelled.")
-                 self.chat_history.append({"role": "user", "content": "Tool Output: User cancelled image selection."})
-        else:
-            # Text result
-            # We append it to chat as a system/tool message but don't show it to user necessarily? 
-            # Or show it? Usually showing "Tool Output" is good.
-            # self.chat.append_message("Tool", result_text[:500] + "..." if len(result_text) > 500 else result_text)
-            
-            # Feed back to LLM
-            self.continue_chat_with_tool_result(result_text)
-
-    def continue_chat_with_tool_result(self, result):
-        # We need to send this result back to the LLM as if it were a system observation
-        # or just context, to continue the generation.
-        # Simple approach: append to history and trigger chat again.
-        
-        # We don't necessarily want this in the visible user chat history if it's long data.
-        # But for simplicity, we treat it as a "System" message in the context.
-        # self.chat_history is a list of dicts.
-        
-        # Context to LLM:
-        prompt = f"Tool Output: {result}\n\nContinue responding to the user."
-        
-        # Trigger chat
-        provider = self.get_llm_provider()
-        model = self.settings.value("ollama_model", "llama3")
-        
-        # We need to construct context including this new info
-        # We can append it to the last message contextually
-        context = [] # We rely on history mostly
-        
-        # Add to history structure but maybe NOT UI if we want to keep it clean?
-        # Let's add to UI for transparency
-        if len(result) < 200:
-            self.chat.append_message("Tool", result)
-        else:
-            self.chat.append_message("Tool", f"Result data ({len(result)} chars)...")
-
-        # Manually append to self.chat_history so worker picks it up?
-        # ChatWorker uses self.chat_history.
-        # But ChatWorker expects {"role":, "content":}
-        # Using "user" role often works better for forcing the model to pay attention to the new "data provided"
-        self.chat_history.append({"role": "user", "content": f"Tool Output: {result}"})
-        
-        self.chat.show_thinking()
-        # Get system prompt from active persona/system prompt file, or use default
-        system_prompt = self.project_manager.get_system_prompt(
-            self.settings.value("system_prompt", "You are Inkwell AI, a creative writing assistant. Help users with their fiction, characters, worldbuilding, and storytelling.")
-        )
-        
-        # Inject Project Structure
-        if self.project_manager.root_path:
-            structure = self.project_manager.get_project_structure()
-            # We truncate if it's too huge, but assuming it fits for now
-            if len(structure) > 20000:
-                structure = structure[:20000] + "\n... (truncated)"
-            system_prompt += f"\n\nProject Structure:\n{structure}"
-            
-        # Add active file context again? ChatWorker does it.
-        
-        self.worker = ChatWorker(
-            provider,
-            self.chat_history,
-            model,
-            context,
-            system_prompt,
-            enabled_tools=self.project_manager.get_enabled_tools(),
-        )
-        self.worker.response_received.connect(self.chat_controller.on_chat_response)
-        self.worker.start()
+        """Delegate to EditorController."""
+        self.editor_controller.on_file_double_clicked(file_path)
 
+    @Slot(str)
     def handle_save_chat(self, chat_content):
         """Save chat contents as a new file in the project."""
         if not self.project_manager.get_root_path():
@@ -1063,6 +603,7 @@ class MainWindow(QMainWindow):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to save chat: {e}")
 
+    @Slot(str)
     def handle_copy_chat_to_file(self, chat_content):
         """Copy chat contents to the currently open file."""
         if not self.editor.open_files:
@@ -1097,136 +638,11 @@ class MainWindow(QMainWindow):
         doc_widget.replace_content_undoable(new_content)
         self.statusBar().showMessage(f"Chat copied to {current_path} (not saved yet)", 3000)
     
-    def handle_message_deleted(self, msg_index):
-        """Handle deletion of a chat message."""
-        if msg_index < len(self.chat_history):
-            # Remove from history
-            del self.chat_history[msg_index]
-            
-            # Remove from chat display
-            del self.chat.messages[msg_index]
-            self.chat.rebuild_chat_display()
-            
-            self.statusBar().showMessage("Message deleted", 2000)
-    
-    def handle_message_edited(self, msg_index, new_content):
-        """Handle editing of a chat message."""
-        if msg_index < len(self.chat_history):
-            # Update history with new content
-            self.chat_history[msg_index]['content'] = new_content
-            
-            self.statusBar().showMessage("Message edited", 2000)
-    
-    def handle_regenerate(self):
-        """Regenerate the last AI response."""
-        if not self.chat_history:
-            return
-        
-        # Find the last assistant message and last user message before it
-        last_assistant_idx = None
-        last_user_idx = None
-        
-        for i in range(len(self.chat_history) - 1, -1, -1):
-            if self.chat_history[i]['role'] == 'assistant' and last_assistant_idx is None:
-                last_assistant_idx = i
-            elif self.chat_history[i]['role'] == 'user' and last_assistant_idx is not None and last_user_idx is None:
-                last_user_idx = i
-                break
-        
-        if last_assistant_idx is None:
-            QMessageBox.information(self, "Nothing to Regenerate", "No AI response found to regenerate.")
-            return
-        
-        # Remove the last assistant message
-        del self.chat_history[last_assistant_idx]
-        del self.chat.messages[last_assistant_idx]
-        self.chat.rebuild_chat_display()
-        
-        # Show thinking indicator
-        self.chat.show_thinking()
-        
-        # Resend the request
-        provider = self.get_llm_provider()
-        model = self.settings.value("ollama_model", "llama3")
-        
-        # Get RAG context if available
-        context = None
-        if self.rag_engine and last_user_idx is not None:
-            query = self.chat_history[last_user_idx]['content']
-            print(f"DEBUG: Querying RAG for: {query}")
-            context = self.rag_engine.query(query)
-            print(f"DEBUG: Retrieved {len(context) if context else 0} chunks")
-        
-        # Build system prompt from active persona/system prompt file, or use default
-        system_prompt = self.project_manager.get_system_prompt(
-            self.settings.value("system_prompt", "You are a helpful AI assistant.")
-        )
-        
-        # Include project structure if enabled
-        if self.project_manager.root_path and self.settings.value("include_project_structure", True, type=bool):
-            structure = self.project_manager.get_project_structure()
-            if len(structure) > 20000:
-                structure = structure[:20000] + "\n... (truncated)"
-            system_prompt += f"\n\nProject Structure:\n{structure}"
-        
-        enabled_tools = self.project_manager.get_enabled_tools()
-        self.worker = ChatWorker(
-            provider,
-            self.chat_history,
-            model,
-            context,
-            system_prompt,
-            images=None,
-            enabled_tools=enabled_tools,
-        )
-        self.worker.response_received.connect(self.chat_controller.chat_controller.on_chat_response)
-        self.worker.start()
-    
-    def save_current_chat_session(self):
-        """Save the current chat session to history."""
-        if not self.chat_history:
-            self.statusBar().showMessage("No chat to save", 2000)
-            return
-        
-        # Get title from first user message
-        title = "Untitled Chat"
-        for msg in self.chat_history:
-            if msg['role'] == 'user':
-                title = msg['content'][:50]  # First 50 chars
-                if len(msg['content']) > 50:
-                    title += "..."
-                break
-        
-        # Create session object
-        from datetime import datetime
-        session = {
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'title': title,
-            'messages': list(self.chat_history)  # Copy the list
-        }
-        
-        # Add to history
-        chat_sessions = self.settings.value("chat_history", [])
-        if not isinstance(chat_sessions, list):
-            chat_sessions = []
-        
-        chat_sessions.append(session)
-        
-        # Keep only last 50 sessions to avoid bloat
-        if len(chat_sessions) > 50:
-            chat_sessions = chat_sessions[-50:]
-        
-        self.settings.setValue("chat_history", chat_sessions)
-        self.statusBar().showMessage("Chat saved to history", 2000)
-    
-    def open_chat_history(self):
-        """Delegate to chat_controller for chat history management."""
-        self.chat_controller.open_chat_history()
-    
     def copy_message_to_current_chat(self, message_content):
         """Delegate to chat_controller."""
         self.chat_controller.copy_message_to_current_chat(message_content)
 
+    @Slot()
     def export_debug_log(self):
         """Export current chat session and debug info to a timestamped file."""
         from datetime import datetime
@@ -1291,6 +707,7 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Export Error", f"Failed to export debug log: {e}")
 
+    @Slot(str)
     def on_message_copied(self, kind: str):
         msg = "Copied to clipboard"
         if kind == "message":
@@ -1302,86 +719,6 @@ class MainWindow(QMainWindow):
         except Exception:
             pass
 
-    def on_file_renamed(self, old_path, new_path):
-        """Update open editor tabs when a file is renamed from the sidebar."""
-        try:
-            self.editor.update_open_file_path(old_path, new_path)
-            # Record operation and clear redo stack
-            self.file_ops_history.append({"type": "rename", "old": old_path, "new": new_path})
-            self.file_ops_redo.clear()
-            self.statusBar().showMessage(f"Renamed: {os.path.basename(old_path)} → {os.path.basename(new_path)}", 3000)
-        except Exception as e:
-            # Non-critical; just log
-            print(f"WARN: Failed to update editor after rename: {e}")
-
-    def on_file_moved(self, old_path, new_path):
-        """Update open editor tabs when a file is moved from the sidebar."""
-        try:
-            self.editor.update_open_file_path(old_path, new_path)
-            # Record operation and clear redo stack
-            self.file_ops_history.append({"type": "move", "old": old_path, "new": new_path})
-            self.file_ops_redo.clear()
-            self.statusBar().showMessage(f"Moved: {os.path.basename(old_path)} → {os.path.basename(new_path)}", 3000)
-        except Exception as e:
-            print(f"WARN: Failed to update editor after move: {e}")
-
-    def _perform_move(self, src, dst):
-        """Move/rename path with basic validation and conflict checking."""
-        if not os.path.exists(src):
-            QMessageBox.warning(self, "Not Found", f"Source does not exist: {src}")
-            return False
-        if os.path.exists(dst):
-            reply = QMessageBox.question(
-                self, "File Exists",
-                f"{os.path.basename(dst)} exists. Overwrite?",
-                QMessageBox.Yes | QMessageBox.No
-            )
-            if reply != QMessageBox.Yes:
-                return False
-            # If overwriting a file with a folder or vice versa could be unsafe; rely on shutil semantics
-        try:
-            shutil.move(src, dst)
-            return True
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to move: {e}")
-            return False
-
-    def undo_file_change(self):
-        """Undo the last file rename/move."""
-        if not self.file_ops_history:
-            self.statusBar().showMessage("No file changes to undo", 2000)
-            return
-        op = self.file_ops_history.pop()
-        src = op["new"]
-        dst = op["old"]
-        if self._perform_move(src, dst):
-            # Update editor tabs
-            try:
-                self.editor.update_open_file_path(src, dst)
-            except Exception:
-                pass
-            # Push to redo stack
-            self.file_ops_redo.append(op)
-            self.statusBar().showMessage(f"Undid {op['type']}: {os.path.basename(src)} → {os.path.basename(dst)}", 3000)
-
-    def redo_file_change(self):
-        """Redo the last undone file rename/move."""
-        if not self.file_ops_redo:
-            self.statusBar().showMessage("No file changes to redo", 2000)
-            return
-        op = self.file_ops_redo.pop()
-        src = op["old"]
-        dst = op["new"]
-        if self._perform_move(src, dst):
-            # Update editor tabs
-            try:
-                self.editor.update_open_file_path(src, dst)
-            except Exception:
-                pass
-            # Push back to history
-            self.file_ops_history.append(op)
-            self.statusBar().showMessage(f"Redid {op['type']}: {os.path.basename(src)} → {os.path.basename(dst)}", 3000)
-
     def _update_token_dashboard(self, token_usage=None, token_breakdown=None):
         """Update the status bar token dashboard with latest counts.
 
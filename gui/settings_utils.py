@@ -0,0 +1,15 @@
+"""Helpers for reading values back from QSettings."""
+
+
+def settings_list(settings, key):
+    """Return the list stored under key, or an empty list.
+
+    QSettings hands back a one-item list as the bare item (a plain string
+    for the INI backend) and an empty one as None, so wrap those.
+    """
+    value = settings.value(key, [])
+    if isinstance(value, list):
+        return value
+    if value is None or value == "":
+        return []
+    return [value]
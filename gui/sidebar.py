@@ -1,9 +1,11 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QTreeView, QFileSystemModel, QHeaderView, QMenu, QInputDialog, QMessageBox, QFileDialog, QStyledItemDelegate, QScrollArea, QLabel, QToolBar, QApplication, QStyle
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QTreeView, QFileSystemModel, QHeaderView, QMenu, QInputDialog, QMessageBox, QFileDialog, QStyledItemDelegate, QScrollArea, QLabel, QToolBar, QStyle
 from PySide6.QtCore import QDir, Qt, QFileInfo, Signal, QRect, QSize, QAbstractItemModel, QModelIndex
-from PySide6.QtGui import QPainter, QColor, QBrush, QIcon, QAction
+from PySide6.QtGui import QPainter, QColor, QBrush, QAction
 import os
 import shutil
 
+from gui.icons import get_icon
+
 
 class IndexStatusDelegate(QStyledItemDelegate):
     """Custom delegate to draw index status indicators next to files."""
@@ -196,37 +198,30 @@ class ProjectSection(QWidget):
         self.toolbar.setFloatable(False)
         self.toolbar.setStyleSheet("QToolBar { border: none; border-bottom: 1px solid #ddd; padding: 2px; }")
         
-        # Get standard icons from application style
-        style = QApplication.instance().style()
-        
         # New File
-        new_file_act = QAction(style.standardIcon(QStyle.SP_FileIcon), "New File", self)
+        new_file_act = QAction(get_icon(QStyle.SP_FileIcon), "New File", self)
         new_file_act.setStatusTip("Create a new file")
-        new_file_act.triggered.connect(lambda: self.create_new_file())
+        new_file_act.triggered.connect(self._on_toolbar_new_file)
         self.toolbar.addAction(new_file_act)
         
         # New Folder
-        new_folder_act = QAction(style.standardIcon(QStyle.SP_DirIcon), "New Folder", self)
+        new_folder_act = QAction(get_icon(QStyle.SP_DirIcon), "New Folder", self)
         new_folder_act.setStatusTip("Create a new folder")
-        new_folder_act.triggered.connect(lambda: self.create_new_folder())
+        new_folder_act.triggered.connect(self._on_toolbar_new_folder)
         self.toolbar.addAction(new_folder_act)
         
         self.toolbar.addSeparator()
         
         # Rename
-        rename_act = QAction(QIcon.fromTheme("edit-rename"), "Rename", self)
-        if rename_act.icon().isNull():
-            rename_act.setIcon(style.standardIcon(QStyle.SP_FileDialogDetailedView))
+        rename_act = QAction(get_icon(("edit-rename", QStyle.SP_FileDialogDetailedView)), "Rename", self)
         rename_act.setStatusTip("Rename selected file/folder")
-        rename_act.triggered.connect(lambda: self._on_toolbar_rename())
+        rename_act.triggered.connect(self._on_toolbar_rename)
         self.toolbar.addAction(rename_act)
         
         # Delete
-        delete_act = QAction(QIcon.fromTheme("edit-delete"), "Delete", self)
-        if delete_act.icon().isNull():
-            delete_act.setIcon(style.standardIcon(QStyle.SP_TrashIcon))
+        delete_act = QAction(get_icon(("edit-delete", QStyle.SP_TrashIcon)), "Delete", self)
         delete_act.setStatusTip("Delete selected file/folder")
-        delete_act.triggered.connect(lambda: self._on_toolbar_delete())
+        delete_act.triggered.connect(self._on_toolbar_delete)
         self.toolbar.addAction(delete_act)
         
         self.layout.addWidget(self.toolbar)
@@ -253,7 +248,7 @@ class ProjectSection(QWidget):
         self.model.setReadOnly(False)
         
         # Relay signals
-        self.tree.moved.connect(lambda old, new: self.file_moved.emit(old, new))
+        self.tree.moved.connect(self.file_moved)
         self.tree.doubleClicked.connect(self._on_tree_double_clicked)
         
         # Add tree with stretch
@@ -273,6 +268,14 @@ class ProjectSection(QWidget):
         if hasattr(self, 'parent_sidebar'):
             self.parent_sidebar._on_section_toggled(self, is_expanded)
     
+    def _on_toolbar_new_file(self):
+        """Create a new file from the toolbar (triggered's checked flag is not an index)."""
+        self.create_new_file()
+
+    def _on_toolbar_new_folder(self):
+        """Create a new folder from the toolbar."""
+        self.create_new_folder()
+
     def _on_toolbar_rename(self):
         """Rename the currently selected item."""
         index = self.tree.currentIndex()
@@ -4,6 +4,9 @@ import re
 from spellchecker import SpellChecker
 from core.dictionary import CustomDictionary
 
+# Lowercase words, allowing one apostrophe or hyphen part (don't, well-known)
+_WORD_RE = re.compile(r'\b[a-z]+(?:\'[a-z]+|(?<!\')[-][a-z]+)?\b')
+
 
 class InkwellSpellChecker:
     """Spell-checker integrated with custom dictionary."""
@@ -47,7 +50,7 @@ class InkwellSpellChecker:
             return set()
         
         # Extract words (alphanumeric + apostrophes/hyphens)
-        words = re.findall(r'\b[a-z]+(?:\'[a-z]+|(?<!\')[-][a-z]+)?\b', text.lower())
+        words = _WORD_RE.findall(text.lower())
         
         # Find misspelled words
         misspelled = self.spell_checker.unknown(words)
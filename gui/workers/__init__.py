@@ -4,16 +4,37 @@ This package contains worker threads for various long-running operations:
 - ChatWorker: LLM chat interactions
 - ToolWorker: Tool execution
 - IndexWorker: RAG indexing
+- ReindexWorker: Re-indexing files after they are saved
+- SaveWorker: Writing a saved file to disk
+- FileReadWorker: Reading a file before opening it
+- RagQueryWorker: Retrieving RAG context for a chat message
+- ModelInfoWorker: Listing models and their capabilities
 
-Workers use QThread to keep the UI responsive during operations.
+All of them are PoolWorkers, QRunnables started on the global QThreadPool
+with their signals on ``worker.signals``, so the UI stays responsive during
+the operation and threads are reused between runs. start_pooled() starts
+one and keeps it alive until it is done.
 """
 
+from .pool_worker import PoolWorker, start_pooled
 from .chat_worker import ChatWorker
 from .tool_worker import ToolWorker
 from .index_worker import IndexWorker
+from .reindex_worker import ReindexWorker
+from .save_worker import SaveWorker
+from .file_read_worker import FileReadWorker
+from .rag_query_worker import RagQueryWorker
+from .model_info_worker import ModelInfoWorker
 
 __all__ = [
+    "PoolWorker",
+    "start_pooled",
     "ChatWorker",
     "ToolWorker",
     "IndexWorker",
+    "ReindexWorker",
+    "SaveWorker",
+    "FileReadWorker",
+    "RagQueryWorker",
+    "ModelInfoWorker",
 ]
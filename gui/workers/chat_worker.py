@@ -1,25 +1,60 @@
-"""Worker thread for LLM chat responses."""
+"""Worker for LLM chat responses."""
 
-from PySide6.QtCore import QThread, Signal
+import hashlib
 
+from PySide6.QtCore import QObject, Signal
+
+from .pool_worker import PoolWorker
+
+
+def _chunk_text(chunk):
+    """Text of a RAG context chunk (dict with metadata, or plain string)."""
+    if isinstance(chunk, dict):
+        return chunk.get("text") or ""
+    return str(chunk) if chunk is not None else ""
+
+
+def _unique_context(context):
+    """Drop empty chunks and repeats of the same text, keeping the first (best ranked)."""
+    unique, seen = [], set()
+    for chunk in context or []:
+        text = _chunk_text(chunk).strip()
+        if not text:
+            continue
+        chunk_id = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        if chunk_id not in seen:
+            seen.add(chunk_id)
+            unique.append(chunk)
+    return unique
+
+
+class ChatWorkerSignals(QObject):
+    """Signals emitted by ChatWorker (QRunnable cannot carry signals itself)."""
 
-class ChatWorker(QThread):
-    """Worker thread for handling LLM chat interactions."""
-    
     response_received = Signal(str)
     response_chunk = Signal(str)  # Emit answer chunks as they arrive
     response_thinking_start = Signal()  # Signal when model enters thinking phase
     response_thinking_chunk = Signal(str)  # Emit thinking tokens
     response_thinking_done = Signal()  # Signal when thinking phase ends
     progress_update = Signal(str)  # Emit human-readable progress updates
+    done = Signal()  # Always emitted last
+
+
+class ChatWorker(PoolWorker):
+    """Runs one LLM chat request on the shared thread pool."""
+
+    signals_class = ChatWorkerSignals
 
     def __init__(self, provider, chat_history, model, context, system_prompt, images=None, enabled_tools=None, mode="edit", structured_enabled: bool = False, schema_id: str | None = None):
         super().__init__()
         self.provider = provider
-        # Create a copy of the history so we don't modify the original reference if we tweak it for the API
-        self.chat_history = list(chat_history) 
+        # Snapshot each message: the UI thread may edit or prune history dicts
+        # in place while this request is still running. Shallow dict copies
+        # share the (immutable) content strings, so this stays cheap.
+        self.chat_history = [dict(msg) for msg in chat_history]
         self.model = model
-        self.context = context
+        # Drop empty and duplicate chunks up front so they never reach the prompt
+        self.context = _unique_context(context)
         self.system_prompt = system_prompt
         self.images = images
         self.enabled_tools = enabled_tools  # Optional set of enabled tool names
@@ -29,6 +64,12 @@ class ChatWorker(QThread):
         self.schema_id = schema_id
 
     def run(self):
+        try:
+            self._run()
+        finally:
+            self.signals.done.emit()
+
+    def _run(self):
         # Construct the messages list for the LLM
         messages = []
 
@@ -42,8 +83,8 @@ class ChatWorker(QThread):
             
             # 3. Last User Message + RAG Context
             last_msg = self.chat_history[-1]
-            content = last_msg['content']
-            
+            # Collect the pieces and join once; RAG context can be tens of KB
+            parts = [last_msg['content']]
             if self.context:
                 context_chunks = []
                 footnotes = []
@@ -66,15 +107,16 @@ class ChatWorker(QThread):
                     else:
                         context_chunks.append(str(chunk))
 
-                context_str = "\n\n".join(context_chunks)
                 if footnotes:
-                    footnote_block = "\n".join(footnotes)
-                    context_str += f"\n\nCitations:\n{footnote_block}"
-                    content += "\n\nWhen referencing context, include footnotes like [^1] that match the Citations section."
-                content += f"\n\nContext:\n{context_str}"
+                    parts.append("\n\nWhen referencing context, include footnotes like [^1] that match the Citations section.")
+                parts.append("\n\nContext:\n")
+                parts.append("\n\n".join(context_chunks))
+                if footnotes:
+                    parts.append("\n\nCitations:\n")
+                    parts.append("\n".join(footnotes))
 
             # Reinforce the edit format instructions
-            content += (
+            parts.append(
                 "\n\nREMINDER: Prefer compact PATCH directives when small changes suffice. "
                 "PATCH syntax: :::PATCH path:::\\nL42: old => new\\n...\\n:::END::: . "
                 "Use :::UPDATE path:::\\n<full content>\\n:::END::: only when needed."
@@ -84,10 +126,12 @@ class ChatWorker(QThread):
             from core.tool_base import get_registry
             tool_instructions = get_registry().get_tool_instructions(self.enabled_tools)
             if tool_instructions:
-                content += "\n\n" + tool_instructions
+                parts.append("\n\n")
+                parts.append(tool_instructions)
                 print(f"DEBUG: Added tool instructions to prompt (enabled_tools={self.enabled_tools})")
             else:
                 print(f"DEBUG: No tool instructions available (enabled_tools={self.enabled_tools})")
+            content = "".join(parts)
             
             msg = {"role": last_msg['role'], "content": content}
             if self.images:
@@ -124,7 +168,7 @@ class ChatWorker(QThread):
                 else:
                     msg = str(event)
                 if msg:
-                    self.progress_update.emit(msg)
+                    self.signals.progress_update.emit(msg)
             
             # Structured responses: determine response_format if enabled
             use_structured = False
@@ -143,10 +187,10 @@ class ChatWorker(QThread):
             # Check if provider supports streaming
             if self.provider.supports_streaming:
                 # Use streaming - provider has real streaming capability
-                full_response = ""
+                # Answer pieces, joined once at the end of the stream
+                answer_parts = []
                 thinking_started = False
                 in_thinking = False
-                thinking_buffer = ""
 
                 start_markers = ["<think>", "<THINK>", "<|start_of_thought|>", "<|startofthought|>"]
                 end_markers = ["</think>", "<|end_of_thought|>", "<|endofthought|>"]
@@ -180,18 +224,18 @@ class ChatWorker(QThread):
                             start_idx = find_first(start_markers, text)
                             if start_idx == -1:
                                 # Entire text is normal answer
-                                full_response += text
-                                self.response_chunk.emit(text)
+                                answer_parts.append(text)
+                                self.signals.response_chunk.emit(text)
                                 break
                             # Emit any leading answer text before thinking starts
                             leading = text[:start_idx]
                             if leading:
-                                full_response += leading
-                                self.response_chunk.emit(leading)
+                                answer_parts.append(leading)
+                                self.signals.response_chunk.emit(leading)
                             in_thinking = True
                             if not thinking_started:
                                 thinking_started = True
-                                self.response_thinking_start.emit()
+                                self.signals.response_thinking_start.emit()
                             # Skip marker
                             consumed = marker_len(start_markers, text, start_idx)
                             text = text[start_idx + consumed:]
@@ -199,26 +243,24 @@ class ChatWorker(QThread):
                             end_idx = find_first(end_markers, text)
                             if end_idx == -1:
                                 # Entire chunk is thinking
-                                thinking_buffer += text
-                                self.response_thinking_chunk.emit(text)
+                                self.signals.response_thinking_chunk.emit(text)
                                 break
                             # Emit thinking up to end marker
                             thinking_part = text[:end_idx]
                             if thinking_part:
-                                thinking_buffer += thinking_part
-                                self.response_thinking_chunk.emit(thinking_part)
+                                self.signals.response_thinking_chunk.emit(thinking_part)
                             # Exit thinking state and skip marker
                             consumed_end = marker_len(end_markers, text, end_idx)
                             in_thinking = False
-                            self.response_thinking_done.emit()
+                            self.signals.response_thinking_done.emit()
                             text = text[end_idx + consumed_end:]
 
                 # If stream ends while still in thinking, close it
                 if in_thinking:
-                    self.response_thinking_done.emit()
+                    self.signals.response_thinking_done.emit()
                 
                 # Emit full response for completion (answer only)
-                self.response_received.emit(full_response)
+                self.signals.response_received.emit("".join(answer_parts))
             else:
                 # Fall back to non-streaming
                 try:
@@ -231,10 +273,10 @@ class ChatWorker(QThread):
                         response = self.provider.chat(messages, model=self.model)
                     else:
                         response = self.provider.chat(messages, model=self.model)
-                self.response_received.emit(response)
+                self.signals.response_received.emit(response)
         except Exception as e:
             import traceback
             print(f"ERROR: Exception in ChatWorker.run():")
             traceback.print_exc()
             response = f"Error calling LLM provider: {str(e)}"
-            self.response_received.emit(response)
+            self.signals.response_received.emit(response)
@@ -0,0 +1,31 @@
+"""Worker for reading a file before it is opened in the editor."""
+
+from PySide6.QtCore import QObject, Signal
+
+from .pool_worker import PoolWorker
+
+
+class FileReadWorkerSignals(QObject):
+    """Signals emitted by FileReadWorker."""
+
+    loaded = Signal(str, object)  # path, content (None if it could not be read)
+
+
+class FileReadWorker(PoolWorker):
+    """Runs a read function for one path on the shared thread pool."""
+
+    signals_class = FileReadWorkerSignals
+
+    def __init__(self, read_file, path):
+        super().__init__()
+        self.read_file = read_file
+        self.path = path
+
+    def run(self):
+        content = None
+        try:
+            content = self.read_file(self.path)
+        except Exception as e:
+            print(f"Error reading {self.path}: {e}")
+        finally:
+            self.signals.loaded.emit(self.path, content)
@@ -1,64 +1,43 @@
 """Worker thread for RAG indexing operations."""
 
-from PySide6.QtCore import QThread, Signal
-import os
+import threading
 
+from PySide6.QtCore import QObject, Signal
 
-class IndexWorker(QThread):
-    """Indexes the entire project with cancel support to allow clean shutdown."""
-    
-    finished = Signal()
+from .pool_worker import PoolWorker
+
+
+class IndexWorkerSignals(QObject):
+    """Signals emitted by IndexWorker."""
+
+    finished = Signal()  # Always emitted, also after cancel or errors
     progress = Signal(int, int, str)  # current, total, current_file
 
+
+class IndexWorker(PoolWorker):
+    """Indexes the entire project with cancel support to allow clean shutdown."""
+
+    signals_class = IndexWorkerSignals
+
     def __init__(self, rag_engine):
         super().__init__()
         self.rag_engine = rag_engine
-        self.is_cancelled = False
+        self._stop = threading.Event()
+
+    @property
+    def is_cancelled(self):
+        return self._stop.is_set()
 
     def cancel(self):
-        self.is_cancelled = True
+        self._stop.set()
 
     def run(self):
-        project_path = self.rag_engine.project_path
-        
-        # Collect all files to index with their sizes
-        files_to_index = []
-        excluded_dirs = {".inkwell_rag", ".debug", ".git", "node_modules", "__pycache__", "venv", ".venv"}
-
-        for root, dirs, files in os.walk(project_path):
-            # Prune excluded directories so os.walk does not descend into them
-            dirs[:] = [d for d in dirs if d not in excluded_dirs]
-
-            if any(excluded in root for excluded in excluded_dirs):
-                continue
-            for file in files:
-                if file.endswith((".md", ".txt")):
-                    path = os.path.join(root, file)
-                    try:
-                        size = os.path.getsize(path)
-                        files_to_index.append((path, size))
-                    except Exception:
-                        # If we can't get size, add with size 0
-                        files_to_index.append((path, 0))
-        
-        # Sort by size (smallest first)
-        files_to_index.sort(key=lambda x: x[1])
-        
-        total_files = len(files_to_index)
-        
-        # Index files in order of size
-        for current, (path, size) in enumerate(files_to_index, 1):
-            if self.is_cancelled:
-                break
-            
-            self.progress.emit(current, total_files, path)
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                if self.is_cancelled:
-                    break
-                self.rag_engine.index_file(path, content)
-            except Exception as e:
-                print(f"Error indexing {path}: {e}")
-        
-        self.finished.emit()
+        try:
+            self.rag_engine.index_project(
+                progress_callback=self.signals.progress.emit,
+                stop_event=self._stop,
+            )
+        except Exception as e:
+            print(f"Error indexing project: {e}")
+        finally:
+            self.signals.finished.emit()
@@ -0,0 +1,45 @@
+"""Worker for reading the model list and capabilities from a provider."""
+
+from PySide6.QtCore import QObject, Signal
+
+from .pool_worker import PoolWorker
+
+
+class ModelInfoWorkerSignals(QObject):
+    """Signals emitted by ModelInfoWorker."""
+
+    finished = Signal(list, list, object)  # models, vision models, loaded models (None if unknown)
+
+
+class ModelInfoWorker(PoolWorker):
+    """Lists a provider's models and checks each for vision on the shared thread pool.
+
+    Both can be an HTTP roundtrip per model, so they stay off the UI thread.
+    current_model is checked for vision even if the provider does not list it.
+    """
+
+    signals_class = ModelInfoWorkerSignals
+
+    def __init__(self, provider, refresh=False, current_model=None):
+        super().__init__()
+        self.provider = provider
+        self.refresh = refresh  # bypass the provider's own model list cache
+        self.current_model = current_model
+
+    def run(self):
+        models, vision_models, loaded_models = [], [], None
+        try:
+            try:
+                models = list(self.provider.list_models(refresh=self.refresh))
+            except TypeError:
+                models = list(self.provider.list_models())
+            checked = list(models)
+            if self.current_model and self.current_model not in checked:
+                checked.append(self.current_model)
+            vision_models = [m for m in checked if self.provider.is_vision_model(m)]
+            if hasattr(self.provider, "get_loaded_models"):
+                loaded_models = self.provider.get_loaded_models(refresh=self.refresh)
+        except Exception as e:
+            print(f"DEBUG: Reading model info failed: {e}")
+        finally:
+            self.signals.finished.emit(models, vision_models, loaded_models)
@@ -0,0 +1,31 @@
+"""Base class and start helper for workers run on a QThreadPool."""
+
+from PySide6.QtCore import QRunnable, QThreadPool
+
+
+class PoolWorker(QRunnable):
+    """QRunnable whose signals live on ``self.signals``.
+
+    QRunnable cannot carry signals itself, so subclasses name a QObject
+    holding them in ``signals_class``. Qt's auto-delete is off: the owner
+    holds the worker (see start_pooled) until its last signal is delivered.
+    """
+
+    signals_class = None
+
+    def __init__(self):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.signals = self.signals_class()
+
+
+def start_pooled(worker, owner_set, done_signal, pool=None):
+    """Start worker on pool (default: the global pool).
+
+    The worker stays in owner_set until done_signal, which must be emitted
+    exactly once on every path through run().
+    """
+    owner_set.add(worker)
+    done_signal.connect(lambda *_: owner_set.discard(worker))
+    (pool or QThreadPool.globalInstance()).start(worker)
+    return worker
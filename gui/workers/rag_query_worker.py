@@ -0,0 +1,45 @@
+"""Worker for retrieving RAG context for a chat message."""
+
+from PySide6.QtCore import QObject, Signal
+
+from .pool_worker import PoolWorker
+
+
+class RagQueryWorkerSignals(QObject):
+    """Signals emitted by RagQueryWorker."""
+
+    finished = Signal(object, object)  # list of chunks (empty if the query failed), query embedding or None
+
+
+class RagQueryWorker(PoolWorker):
+    """Embeds a query and searches the RAG index on the shared thread pool.
+
+    With n_results=0 the search is skipped; embed_query also returns the
+    query's embedding for the semantic response cache.
+    """
+
+    signals_class = RagQueryWorkerSignals
+
+    def __init__(self, rag_engine, query, n_results=3, embed_query=False):
+        super().__init__()
+        self.rag_engine = rag_engine
+        self.query = query
+        self.n_results = n_results
+        self.embed_query = embed_query
+
+    def run(self):
+        context = []
+        vector = None
+        try:
+            if self.n_results:
+                context = self.rag_engine.query(self.query, n_results=self.n_results, include_metadata=True)
+        except Exception as e:
+            print(f"DEBUG: RAG query failed: {e}")
+        try:
+            if self.embed_query:
+                # Usually a hit in the engine's embedding cache after the query above
+                vector = self.rag_engine.embed(self.query)
+        except Exception as e:
+            print(f"DEBUG: Query embedding failed: {e}")
+        finally:
+            self.signals.finished.emit(context, vector)
@@ -0,0 +1,41 @@
+"""Worker for re-embedding saved files into the RAG index."""
+
+from PySide6.QtCore import QObject, Signal
+
+from .pool_worker import PoolWorker
+
+
+class ReindexWorkerSignals(QObject):
+    """Signals emitted by ReindexWorker."""
+
+    finished = Signal()  # Always emitted, even if some files failed
+
+
+class ReindexWorker(PoolWorker):
+    """Updates the RAG index for a batch of changed files on the shared thread pool."""
+
+    signals_class = ReindexWorkerSignals
+
+    def __init__(self, rag_engine, files, removed=()):
+        super().__init__()
+        self.rag_engine = rag_engine
+        self.files = dict(files)  # path -> content, or None to read it from disk
+        self.removed = list(removed)  # paths whose chunks are dropped first
+
+    def run(self):
+        try:
+            for path in self.removed:
+                try:
+                    self.rag_engine.remove_file(path)
+                except Exception as e:
+                    print(f"DEBUG: RAG remove failed for {path}: {e}")
+            for path, content in self.files.items():
+                try:
+                    if content is None:
+                        with open(path, 'r', encoding='utf-8') as f:
+                            content = f.read()
+                    self.rag_engine.index_file(path, content)
+                except Exception as e:
+                    print(f"DEBUG: RAG reindex failed for {path}: {e}")
+        finally:
+            self.signals.finished.emit()
@@ -0,0 +1,37 @@
+"""Worker for writing a saved file to disk."""
+
+import threading
+
+from PySide6.QtCore import QObject, Signal
+
+from .pool_worker import PoolWorker
+
+
+class SaveWorkerSignals(QObject):
+    """Signals emitted by SaveWorker."""
+
+    saved = Signal(str)  # path
+    failed = Signal(str, str)  # path, error message
+
+
+class SaveWorker(PoolWorker):
+    """Writes one file's content on the shared thread pool."""
+
+    signals_class = SaveWorkerSignals
+
+    def __init__(self, path, content):
+        super().__init__()
+        self.path = path
+        self.content = content
+        self.done_event = threading.Event()  # lets shutdown wait for the write
+
+    def run(self):
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(self.content)
+        except Exception as e:
+            self.signals.failed.emit(self.path, str(e))
+        else:
+            self.signals.saved.emit(self.path)
+        finally:
+            self.done_event.set()
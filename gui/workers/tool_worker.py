@@ -1,13 +1,21 @@
-"""Worker thread for executing LLM tools."""
+"""Worker for executing LLM tools."""
 
-from PySide6.QtCore import QThread, Signal
+from PySide6.QtCore import QObject, Signal
 from core.tool_base import get_registry
 
+from .pool_worker import PoolWorker
 
-class ToolWorker(QThread):
-    """Worker thread for executing LLM tools."""
-    
-    finished = Signal(str, object)  # result_text, extra_data (e.g. image results)
+
+class ToolWorkerSignals(QObject):
+    """Signals emitted by ToolWorker."""
+
+    finished = Signal(str, object)  # result_text, extra_data (e.g. image results); emitted once
+
+
+class ToolWorker(PoolWorker):
+    """Runs one tool call on the shared thread pool."""
+
+    signals_class = ToolWorkerSignals
 
     def __init__(self, tool_name, query, enabled_tools=None, project_manager=None):
         super().__init__()
@@ -22,16 +30,16 @@ class ToolWorker(QThread):
         try:
             registry = get_registry()
             if self.enabled_tools is not None and self.tool_name not in self.enabled_tools:
-                self.finished.emit(f"Error: Tool '{self.tool_name}' is disabled in this project", None)
+                self.signals.finished.emit(f"Error: Tool '{self.tool_name}' is disabled in this project", None)
                 return
             tool = registry.get_tool(self.tool_name)
             
             if tool is None:
-                self.finished.emit(f"Error: Unknown tool '{self.tool_name}'", None)
+                self.signals.finished.emit(f"Error: Unknown tool '{self.tool_name}'", None)
                 return
             
             if not tool.is_available():
-                self.finished.emit(f"Error: Tool '{self.tool_name}' is not available (missing dependencies)", None)
+                self.signals.finished.emit(f"Error: Tool '{self.tool_name}' is not available (missing dependencies)", None)
                 return
             
             # Merge project settings with extra_settings
@@ -47,7 +55,7 @@ class ToolWorker(QThread):
             
             # Execute the tool with settings
             result_text, extra_data = tool.execute(self.query, settings=settings)
-            self.finished.emit(result_text, extra_data)
+            self.signals.finished.emit(result_text, extra_data)
             
         except Exception as e:
-            self.finished.emit(f"Tool Error: {e}", None)
+            self.signals.finished.emit(f"Tool Error: {e}", None)
@@ -0,0 +1,166 @@
+"""Tests for ChatController response parsing and request assembly."""
+
+from types import SimpleNamespace
+
+from gui.controllers.chat_controller import (
+    ChatController,
+    MAX_HISTORY_CHARS,
+    MAX_HISTORY_MESSAGES,
+    MAX_OPEN_FILE_CHARS,
+    MAX_PENDING_EDITS,
+)
+
+
+def _make_controller():
+    window = SimpleNamespace(
+        project_manager=SimpleNamespace(root_path=None),
+        editor=SimpleNamespace(get_current_file=lambda: (None, None)),
+    )
+    return ChatController(window)
+
+
+def test_update_blocks_record_one_pending_edit_each():
+    controller = _make_controller()
+    response = (
+        "Here you go.\n"
+        ":::UPDATE notes.md:::\nfirst\n:::END:::\n"
+        "And another.\n"
+        ":::UPDATE chapter.md:::\nsecond\n:::END:::\n"
+    )
+
+    display = controller._parse_with_legacy_system(response)
+
+    assert len(controller.pending_edits) == 2
+    assert sorted(content for _, content in controller.pending_edits.values()) == ["first", "second"]
+    for edit_id in controller.pending_edits:
+        assert f'href="edit:{edit_id}"' in display
+    assert ":::UPDATE" not in display
+
+
+def test_pending_edits_are_bounded_and_ids_are_not_message_indexes():
+    controller = _make_controller()
+    response = ":::UPDATE notes.md:::\nbody\n:::END:::\n"
+
+    for _ in range(MAX_PENDING_EDITS + 5):
+        controller._parse_with_legacy_system(response)
+
+    assert len(controller.pending_edits) == MAX_PENDING_EDITS
+    for edit_id in controller.pending_edits:
+        # ChatWidget treats numeric edit: links as inline message edits
+        assert not edit_id.lstrip("-").isdigit()
+
+
+def test_history_window_keeps_recent_turns_from_a_user_message():
+    controller = _make_controller()
+    for i in range(10):
+        controller.chat_history.append({"role": "user", "content": f"q{i}"})
+        controller.chat_history.append({"role": "assistant", "content": f"a{i}"})
+    controller.chat_history.append({"role": "user", "content": "latest"})
+
+    window = controller._history_window()
+
+    assert len(window) <= MAX_HISTORY_MESSAGES
+    assert window[0]["role"] == "user"
+    assert window[-1]["content"] == "latest"
+
+
+def test_history_window_drops_old_turns_past_the_character_budget():
+    controller = _make_controller()
+    pasted = "x" * (MAX_HISTORY_CHARS // 2)
+    for i in range(3):
+        controller.chat_history.append({"role": "user", "content": pasted})
+        controller.chat_history.append({"role": "assistant", "content": f"a{i}"})
+    controller.chat_history.append({"role": "user", "content": "latest"})
+
+    window = controller._history_window()
+
+    assert sum(len(m["content"]) for m in window) <= MAX_HISTORY_CHARS
+    assert window[0]["role"] == "user"
+    assert window[-1]["content"] == "latest"
+
+    # An oversized newest message is still sent on its own
+    controller.chat_history.append({"role": "user", "content": "y" * (MAX_HISTORY_CHARS + 1)})
+    assert controller._history_window() == controller.chat_history[-1:]
+
+
+def test_plain_prose_response_is_returned_unchanged():
+    controller = _make_controller()
+    response = "The chapter reads well; consider tightening the opening paragraph."
+
+    assert controller._parse_with_legacy_system(response) is response
+    assert controller.pending_edits == {}
+
+
+def test_generate_image_block_reads_prompt_and_workflow():
+    requests = []
+    controller = _make_controller()
+    controller.window.open_image_studio = lambda: None
+    controller.window.image_gen = SimpleNamespace(
+        generate_from_agent=lambda prompt, workflow: requests.append((prompt, workflow))
+    )
+    response = (
+        "Sure.\n"
+        ":::GENERATE_IMAGE:::\n"
+        "Prompt: a lighthouse at dusk\n"
+        "  workflow: sdxl_basic.json\n"
+        ":::END:::\n"
+        ":::GENERATE_IMAGE:::\n"
+        "just a fox in snow\n"
+        ":::END:::\n"
+        ":::GENERATE_IMAGE:::\n"
+        "prompt: first draft\n"
+        "PROMPT: second draft\n"
+        ":::END:::\n"
+    )
+
+    display = controller._parse_with_legacy_system(response)
+
+    assert requests == [
+        ("a lighthouse at dusk", "sdxl_basic.json"),
+        ("just a fox in snow", None),
+        ("second draft", None),
+    ]
+    assert 'Generating image for: "a lighthouse at dusk"' in display
+
+
+def test_open_tabs_are_added_to_prompt_parts():
+    controller = _make_controller()
+    paths = ["/p/active.md", "/p/other.md", "/p/pinned.md"]
+    tabs = [SimpleNamespace(property=lambda name, p=p: p) for p in paths]
+    controller.window.editor.tabs = SimpleNamespace(count=lambda: len(tabs), widget=lambda i: tabs[i])
+    controller.window.project_manager.read_file = lambda path: f"text of {path}"
+    controller.window.rag_engine = None
+    parts, breakdown = ["base"], {}
+
+    files, tokens = controller._collect_open_files("/p/active.md", parts, breakdown, {"/p/pinned.md"})
+
+    assert files == [f"/p/other.md ({tokens} tokens)"]
+    assert parts == ["base", "\nOpen File (/p/other.md):\ntext of /p/other.md\n"]
+    assert tokens > 0 and breakdown == {"Open tab: /p/other.md": tokens}
+
+
+def test_large_active_file_keeps_its_tail_with_line_offset_in_ask_mode():
+    controller = _make_controller()
+    controller.chat_mode = "ask"
+    lines = [f"line {n}" for n in range(1, 20001)]
+    content = "\n".join(lines)
+
+    block, tokens = controller._active_file_block("/p/novel.md", content)
+
+    assert len(block) < MAX_OPEN_FILE_CHARS + 200
+    assert block.rstrip().endswith("line 20000")
+    header = block.split("\n")[2]
+    first = int(header.rsplit(" ", 1)[1].rstrip("]"))
+    assert block.split("\n")[3] == f"line {first}"
+    assert controller._active_file_block("/p/novel.md", content) == (block, tokens)
+
+
+def test_large_active_file_is_sent_whole_in_edit_mode():
+    # UPDATE blocks replace the complete file, so the model must see all of it
+    controller = _make_controller()
+    content = "\n".join(f"line {n}" for n in range(1, 20001))
+
+    block, _ = controller._active_file_block("/p/novel.md", content)
+
+    assert content in block
+    assert "omitted" not in block
@@ -0,0 +1,82 @@
+"""Tests for ChatWorker prompt assembly."""
+
+from gui.workers import ChatWorker
+
+
+class _RecordingProvider:
+    supports_streaming = False
+
+    def __init__(self):
+        self.messages = None
+
+    def chat(self, messages, model=None, progress_callback=None):
+        self.messages = messages
+        return "ok"
+
+
+def test_context_is_appended_to_last_user_message_only():
+    provider = _RecordingProvider()
+    history = [
+        {"role": "user", "content": "first"},
+        {"role": "assistant", "content": "reply"},
+        {"role": "user", "content": "second"},
+    ]
+    context = [
+        {"text": "Chapter one text", "metadata": {"source": "ch1.md", "start_line": 1, "end_line": 3}},
+        {"text": "   ", "metadata": {"source": "blank.md"}},
+        "",
+    ]
+
+    ChatWorker(provider, history, "m", context, "system").run()
+
+    sent = provider.messages
+    assert sent[0] == {"role": "system", "content": "system"}
+    assert sent[1:3] == history[:2]
+    last = sent[-1]["content"]
+    assert last.startswith("second\n\nWhen referencing context")
+    assert "\n\nContext:\n[^1] Chapter one text" in last
+    assert "\n\nCitations:\n[^1]: ch1.md#L1-L3" in last
+    assert "blank.md" not in last
+    # The caller's history is left untouched
+    assert history[-1]["content"] == "second"
+
+
+def test_no_context_section_when_context_is_empty():
+    provider = _RecordingProvider()
+
+    ChatWorker(provider, [{"role": "user", "content": "hi"}], "m", ["", "  "], None).run()
+
+    assert provider.messages[0]["role"] == "user"
+    assert "Context:" not in provider.messages[0]["content"]
+
+
+def test_repeated_chunk_text_is_sent_once():
+    provider = _RecordingProvider()
+    context = [
+        {"text": "Shared boilerplate", "metadata": {"source": "a.md"}},
+        {"text": "Unique scene", "metadata": {"source": "b.md"}},
+        {"text": "Shared boilerplate\n", "metadata": {"source": "copy/a.md"}},
+    ]
+
+    ChatWorker(provider, [{"role": "user", "content": "hi"}], "m", context, None).run()
+
+    last = provider.messages[-1]["content"]
+    assert last.count("Shared boilerplate") == 1
+    assert "[^2] Unique scene" in last
+    assert "copy/a.md" not in last
+
+
+def test_history_is_snapshotted_at_construction():
+    provider = _RecordingProvider()
+    history = [
+        {"role": "user", "content": "draft"},
+        {"role": "assistant", "content": "reply"},
+        {"role": "user", "content": "next"},
+    ]
+    worker = ChatWorker(provider, history, "m", [], None)
+
+    # Edits made on the UI thread after the request was queued
+    history[0]["content"] = "edited"
+
+    worker.run()
+    assert provider.messages[0]["content"] == "draft"
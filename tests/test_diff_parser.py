@@ -5,7 +5,7 @@ Tests DiffParser parsing of various edit formats.
 
 import pytest
 from unittest.mock import Mock
-from core.diff_parser import DiffParser
+from core.diff_parser import DiffParser, find_generate_image_blocks, find_update_blocks
 from core.path_resolver import PathResolver
 
 
@@ -260,6 +260,18 @@ content
         assert len(batch.edits) == 0
         assert batch.summary is None
     
+    def test_plain_prose_skips_format_parsers(self, parser):
+        """Responses without ::: or ``` markers never reach the regex parsers."""
+        diff_parser, pm = parser
+        for name in ("_parse_update_blocks", "_parse_patch_blocks",
+                     "_parse_unified_diffs", "_parse_fallback_code_blocks"):
+            setattr(diff_parser, name, Mock(side_effect=AssertionError(name)))
+        
+        batch = diff_parser.parse_response("Summary: tightened the opening paragraph.", "notes.md")
+        
+        assert len(batch.edits) == 0
+        assert batch.summary == "tightened the opening paragraph."
+    
     def test_non_text_extension_handling(self, parser):
         """Test handling of non-text file extensions."""
         diff_parser, pm = parser
@@ -276,6 +288,51 @@ some text content
         assert batch.edits[0].file_path == "image.txt"
 
 
+class TestFindUpdateBlocks:
+    """Tests for the linear :::UPDATE::: scanner."""
+
+    def test_spans_paths_and_end_markers(self):
+        text = (
+            "Intro\n"
+            ":::UPDATE  a.md :::\nfirst\n:::END:::\n"
+            "mid\n"
+            ":::UPDATE b.md:::\nsecond\n:::END\n"
+            ":::UPDATE c.md:::\nthird\n:::"
+        )
+
+        blocks = find_update_blocks(text)
+
+        assert [(path, content.strip()) for _, _, path, content in blocks] == [
+            ("a.md", "first"), ("b.md", "second"), ("c.md", "third"),
+        ]
+        start, end, _, _ = blocks[0]
+        assert text[start:end] == ":::UPDATE  a.md :::\nfirst\n:::END:::"
+        assert text[blocks[2][1]:] == ""
+
+    def test_unterminated_or_malformed_blocks_are_ignored(self):
+        assert find_update_blocks(":::UPDATE a.md:::\nno end marker") == []
+        assert find_update_blocks(":::UPDATE a.md::: no newline") == []
+        assert find_update_blocks(":::UPDATE" * 5000) == []
+
+
+
+class TestFindGenerateImageBlocks:
+    """Tests for the linear :::GENERATE_IMAGE::: scanner."""
+
+    def test_bodies_and_end_markers(self):
+        text = (
+            ":::GENERATE_IMAGE:::\n\nprompt: a fox\nworkflow: w.json  \n:::END:::\n"
+            "between\n"
+            ":::GENERATE_IMAGE:::\njust text\n:::"
+        )
+
+        assert find_generate_image_blocks(text) == ["prompt: a fox\nworkflow: w.json", "just text"]
+
+    def test_unterminated_or_malformed_blocks_are_ignored(self):
+        assert find_generate_image_blocks(":::GENERATE_IMAGE::: inline :::END:::") == []
+        assert find_generate_image_blocks(":::GENERATE_IMAGE:::\nno end marker") == []
+        assert find_generate_image_blocks(":::GENERATE_IMAGE:::\n" * 5000) == [""] * 2500
+
 class TestPatchApplication:
     """Tests for patch application logic."""
     
@@ -0,0 +1,59 @@
+"""Tests for IndexWorker and RAGEngine.index_project progress and cancellation."""
+
+from core.rag import RAGEngine
+from gui.workers import IndexWorker
+
+
+def _make_project(tmp_path):
+    (tmp_path / "long.md").write_text("a much longer chapter", encoding="utf-8")
+    (tmp_path / "short.txt").write_text("hi", encoding="utf-8")
+    (tmp_path / "image.png").write_bytes(b"\x89PNG")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "skip.md").write_text("ignored", encoding="utf-8")
+
+
+def _recording_engine(tmp_path):
+    engine = RAGEngine(str(tmp_path))
+    engine.indexed = []
+    engine.index_file = lambda path, content, **kwargs: engine.indexed.append((path, kwargs))
+    engine.bm25_rebuilds = 0
+
+    def rebuild():
+        engine.bm25_rebuilds += 1
+
+    engine._rebuild_bm25 = rebuild
+    return engine
+
+
+def test_indexes_text_files_smallest_first_with_progress(tmp_path):
+    _make_project(tmp_path)
+    engine = _recording_engine(tmp_path)
+    worker = IndexWorker(engine)
+    progress, finished = [], []
+    worker.signals.progress.connect(lambda cur, total, path: progress.append((cur, total, path)))
+    worker.signals.finished.connect(lambda: finished.append(True))
+
+    worker.run()
+
+    names = [p.rsplit("/", 1)[-1] for p, _ in engine.indexed]
+    assert names == ["short.txt", "long.md"]
+    assert [(cur, total) for cur, total, _ in progress] == [(1, 2), (2, 2)]
+    # BM25 is rebuilt once for the whole project, not per file
+    assert all(kwargs.get("update_bm25") is False for _, kwargs in engine.indexed)
+    assert engine.bm25_rebuilds == 1
+    assert finished == [True]
+
+
+def test_cancel_stops_indexing_but_still_finishes(tmp_path):
+    _make_project(tmp_path)
+    engine = _recording_engine(tmp_path)
+    worker = IndexWorker(engine)
+    finished = []
+    worker.signals.finished.connect(lambda: finished.append(True))
+
+    worker.cancel()
+    worker.run()
+
+    assert worker.is_cancelled
+    assert engine.indexed == []
+    assert finished == [True]
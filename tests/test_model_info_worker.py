@@ -0,0 +1,69 @@
+"""Tests for ModelInfoWorker and RagQueryWorker."""
+
+from gui.workers import ModelInfoWorker, RagQueryWorker
+
+
+class FakeProvider:
+    def list_models(self):
+        return ["llama3", "llava"]
+
+    def is_vision_model(self, name):
+        return name == "llava"
+
+
+class BrokenEngine:
+    def query(self, text, n_results=3, include_metadata=False):
+        raise RuntimeError("embedder offline")
+
+    def embed(self, text):
+        raise RuntimeError("embedder offline")
+
+
+class FakeEngine:
+    def query(self, text, n_results=3, include_metadata=False):
+        return [{"text": "Ada is 36.", "metadata": {}}][:n_results]
+
+    def embed(self, text):
+        return [1.0, 0.0]
+
+
+def test_model_info_reports_vision_models():
+    worker = ModelInfoWorker(FakeProvider())
+    results = []
+    worker.signals.finished.connect(lambda *args: results.append(args))
+
+    worker.run()
+
+    assert results == [(["llama3", "llava"], ["llava"], None)]
+
+
+def test_model_info_checks_an_unlisted_current_model():
+    worker = ModelInfoWorker(FakeProvider(), current_model="llava:custom")
+    provider = worker.provider
+    provider.is_vision_model = lambda name: name.startswith("llava")
+    results = []
+    worker.signals.finished.connect(lambda *args: results.append(args))
+
+    worker.run()
+
+    assert results == [(["llama3", "llava"], ["llava", "llava:custom"], None)]
+
+
+def test_failed_rag_query_still_finishes_with_no_context():
+    worker = RagQueryWorker(BrokenEngine(), "who is Ada?", embed_query=True)
+    results = []
+    worker.signals.finished.connect(lambda *args: results.append(args))
+
+    worker.run()
+
+    assert results == [([], None)]
+
+
+def test_rag_query_can_return_only_the_query_embedding():
+    worker = RagQueryWorker(FakeEngine(), "who is Ada?", n_results=0, embed_query=True)
+    results = []
+    worker.signals.finished.connect(lambda *args: results.append(args))
+
+    worker.run()
+
+    assert results == [([], [1.0, 0.0])]
@@ -0,0 +1,46 @@
+"""Tests for the PoolWorker base and start_pooled."""
+
+from PySide6.QtCore import QObject, Signal
+
+from gui.workers import PoolWorker, start_pooled
+
+
+class _EchoSignals(QObject):
+    done = Signal(str)
+
+
+class _EchoWorker(PoolWorker):
+    signals_class = _EchoSignals
+
+    def __init__(self, text):
+        super().__init__()
+        self.text = text
+
+    def run(self):
+        self.signals.done.emit(self.text)
+
+
+class _InlinePool:
+    """Runs workers on start(), recording who held them meanwhile."""
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.held = None
+
+    def start(self, worker):
+        self.held = worker in self.owner
+        worker.run()
+
+
+def test_start_pooled_holds_the_worker_until_done():
+    owner, results = set(), []
+    pool = _InlinePool(owner)
+    worker = _EchoWorker("hi")
+    worker.signals.done.connect(results.append)
+
+    start_pooled(worker, owner, worker.signals.done, pool=pool)
+
+    assert not worker.autoDelete()
+    assert pool.held is True
+    assert results == ["hi"]
+    assert owner == set()
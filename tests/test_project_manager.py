@@ -0,0 +1,72 @@
+"""Tests for ProjectManager file reads."""
+
+import base64
+import os
+
+from core.project import ProjectManager, legacy_project_settings_key, project_settings_key
+
+
+def test_read_file_cache_tracks_changes_on_disk(tmp_path):
+    pm = ProjectManager()
+    pm.open_project(str(tmp_path))
+    path = tmp_path / "chapter.md"
+    path.write_text("draft one", encoding="utf-8")
+
+    assert pm.read_file("chapter.md") == "draft one"
+    assert pm.read_file(str(path)) == "draft one"
+
+    # Edited outside the app: a new mtime means a fresh read
+    path.write_text("draft two, longer", encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert pm.read_file("chapter.md") == "draft two, longer"
+
+    # Saving through the manager drops the cached copy
+    pm.save_file("chapter.md", "final")
+    assert pm.read_file("chapter.md") == "final"
+
+    path.unlink()
+    assert pm.read_file("chapter.md") is None
+
+
+def test_image_base64_is_reencoded_only_when_the_file_changes(tmp_path):
+    pm = ProjectManager()
+    pm.open_project(str(tmp_path))
+    path = tmp_path / "cover.png"
+    path.write_bytes(b"first")
+
+    assert pm.get_image_base64("cover.png") == base64.b64encode(b"first").decode()
+    assert pm.get_image_base64(str(path)) is pm.get_image_base64(str(path))
+
+    path.write_bytes(b"second image")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert pm.get_image_base64("cover.png") == base64.b64encode(b"second image").decode()
+
+    path.unlink()
+    assert pm.get_image_base64("cover.png") is None
+
+
+def test_project_settings_key_is_short_and_stable():
+    key = project_settings_key("/home/user/novel")
+    assert key == project_settings_key("/home/user/novel")
+    assert len(key) == 16
+    assert key != project_settings_key("/home/user/novel2")
+    assert key != legacy_project_settings_key("/home/user/novel")
+
+
+def test_project_structure_is_rebuilt_when_a_directory_changes(tmp_path):
+    pm = ProjectManager()
+    pm.open_project(str(tmp_path))
+    (tmp_path / "notes").mkdir()
+    (tmp_path / "notes" / "one.md").write_text("1", encoding="utf-8")
+
+    first = pm.get_project_structure()
+    assert "one.md" in first
+    assert pm.get_project_structure() is first
+
+    notes = tmp_path / "notes"
+    (notes / "two.md").write_text("2", encoding="utf-8")
+    st = notes.stat()
+    os.utime(notes, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert "two.md" in pm.get_project_structure()
@@ -0,0 +1,35 @@
+"""Tests for RAGEngine's query-embedding cache."""
+
+from core.rag import RAGEngine
+
+
+def test_embed_reuses_cached_vectors(tmp_path):
+    engine = RAGEngine(str(tmp_path))
+    calls = []
+
+    def fake_embedder(texts):
+        calls.append(texts)
+        return [[float(len(texts[0])), 1.0]]
+
+    engine._embedder = fake_embedder
+
+    first = engine.embed("Who is the narrator?")
+    again = engine.embed("Who is the narrator?  ")
+    other = engine.embed("Where does it happen?")
+
+    assert first == again == [20.0, 1.0]
+    assert other == [21.0, 1.0]
+    assert len(calls) == 2
+    # The embedder sees the same stripped text the cache key is made from
+    assert calls == [["Who is the narrator?"], ["Where does it happen?"]]
+
+
+def test_embed_result_does_not_depend_on_call_order(tmp_path):
+    engine = RAGEngine(str(tmp_path))
+    engine._embedder = lambda texts: [[float(len(texts[0]))]]
+
+    padded_first = engine.embed("  q  ")
+    engine._query_embed_cache.clear()
+    plain_first = engine.embed("q")
+
+    assert padded_first == plain_first == [1.0]
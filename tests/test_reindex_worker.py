@@ -0,0 +1,41 @@
+"""Tests for ReindexWorker."""
+
+from gui.workers import ReindexWorker
+
+
+class FakeEngine:
+    def __init__(self):
+        self.calls = []
+
+    def remove_file(self, path):
+        self.calls.append(("remove", path))
+
+    def index_file(self, path, content):
+        self.calls.append(("index", path, content))
+
+
+def test_removes_then_indexes_reading_missing_content_from_disk(tmp_path):
+    moved = tmp_path / "new.md"
+    moved.write_text("moved text", encoding="utf-8")
+    engine = FakeEngine()
+    worker = ReindexWorker(engine, {"/p/saved.md": "saved text", str(moved): None}, removed=["/p/old.md"])
+    finished = []
+    worker.signals.finished.connect(lambda: finished.append(True))
+
+    worker.run()
+
+    assert engine.calls == [
+        ("remove", "/p/old.md"),
+        ("index", "/p/saved.md", "saved text"),
+        ("index", str(moved), "moved text"),
+    ]
+    assert finished == [True]
+
+
+def test_unreadable_file_does_not_stop_the_batch(tmp_path):
+    engine = FakeEngine()
+    worker = ReindexWorker(engine, {str(tmp_path / "gone.md"): None, "/p/a.md": "a"})
+
+    worker.run()
+
+    assert engine.calls == [("index", "/p/a.md", "a")]
@@ -0,0 +1,81 @@
+"""Tests for the exact-match chat response cache."""
+
+from core.persistent_cache import PersistentCache
+from core.response_cache import ResponseCache, SemanticResponseCache
+
+
+def _key(message, **options):
+    history = [{"role": "user", "content": message}]
+    return ResponseCache.make_key("llama3", "system", history, [], **options)
+
+
+def test_key_depends_on_request():
+    assert _key("hi") == _key("hi")
+    assert _key("hi") != _key("hello")
+    assert _key("hi", mode="edit") != _key("hi", mode="ask")
+    # Set ordering must not change the key
+    assert _key("hi", enabled_tools={"A", "B"}) == _key("hi", enabled_tools={"B", "A"})
+
+
+def test_lru_eviction_and_ttl():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # touch "a" so "b" is least recent
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+    expired = ResponseCache(ttl_seconds=-1)
+    expired.set("a", "1")
+    assert expired.get("a") is None
+
+
+def test_semantic_cache_matches_similar_vectors_within_scope():
+    cache = SemanticResponseCache(threshold=0.9)
+    cache.set("scope", [1.0, 0.0, 0.0, 0.0], "answer")
+
+    assert cache.get("scope", [0.98, 0.05, 0.0, 0.0]) == "answer"
+    assert cache.get("scope", [0.0, 1.0, 0.0, 0.0]) is None
+    assert cache.get("other-scope", [1.0, 0.0, 0.0, 0.0]) is None
+
+
+def test_semantic_cache_evicts_oldest_from_buckets():
+    cache = SemanticResponseCache(max_entries=1)
+    cache.set("s", [1.0, 0.0], "first")
+    cache.set("s", [0.0, 1.0], "second")
+
+    assert cache.get("s", [1.0, 0.0]) is None
+    assert cache.get("s", [0.0, 1.0]) == "second"
+    assert sum(len(ids) for ids in cache.buckets.values()) == cache.tables
+
+
+def test_persistent_store_survives_a_new_cache(tmp_path):
+    db_path = tmp_path / "cache.db"
+    first = ResponseCache(store=PersistentCache(db_path))
+    first.set(_key("hi"), "hello there")
+    first.store.close()
+
+    # A fresh in-memory cache (new session) finds the answer on disk
+    second = ResponseCache(store=PersistentCache(db_path))
+    assert second.get(_key("hi")) == "hello there"
+    assert second.get(_key("other")) is None
+
+    # Expired rows are not returned
+    stale = ResponseCache(ttl_seconds=-1, store=PersistentCache(db_path))
+    assert stale.get(_key("hi")) is None
+
+    second.clear()
+    assert ResponseCache(store=PersistentCache(db_path)).get(_key("hi")) is None
+
+
+def test_persistent_store_round_trips_embeddings(tmp_path):
+    store = PersistentCache(tmp_path / "cache.db")
+    store.set_embedding("model:abc", [0.5, -1.25, 3.0])
+
+    assert store.get_embedding("model:abc") == [0.5, -1.25, 3.0]
+    assert store.get_embedding("model:missing") is None
+
+    store.clear_embeddings()
+    assert store.get_embedding("model:abc") is None
@@ -0,0 +1,29 @@
+"""Tests for SaveWorker."""
+
+from gui.workers import SaveWorker
+
+
+def test_writes_content_and_reports_saved(tmp_path):
+    path = tmp_path / "chapter.md"
+    worker = SaveWorker(str(path), "Once upon a time")
+    saved, failed = [], []
+    worker.signals.saved.connect(saved.append)
+    worker.signals.failed.connect(lambda p, err: failed.append(p))
+
+    worker.run()
+
+    assert path.read_text(encoding="utf-8") == "Once upon a time"
+    assert saved == [str(path)] and failed == []
+    assert worker.done_event.is_set()
+
+
+def test_reports_failure(tmp_path):
+    path = tmp_path / "missing_dir" / "chapter.md"
+    worker = SaveWorker(str(path), "text")
+    failed = []
+    worker.signals.failed.connect(lambda p, err: failed.append((p, bool(err))))
+
+    worker.run()
+
+    assert failed == [(str(path), True)]
+    assert worker.done_event.is_set()
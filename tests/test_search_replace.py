@@ -4,7 +4,8 @@
 import sys
 from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout
 from gui.editors.code_editor import CodeEditor
-from gui.editors.search_replace import SearchReplaceWidget
+from PySide6.QtCore import QThreadPool
+from gui.editors.search_replace import SearchReplaceWidget, _ci_literal_replace, _get_search_pool
 
 def test_search_replace():
     app = QApplication(sys.argv)
@@ -54,5 +55,49 @@ def test_search_replace():
     
     print("\n✅ All search & replace operations completed successfully!")
 
+
+def test_find_all_counts_non_overlapping_matches():
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    editor = CodeEditor()
+    editor.setPlainText("Hello World\nHello Python\nhello javascript\nHELLO RUST")
+    search_widget = SearchReplaceWidget(editor=editor)
+
+    assert len(search_widget._find_all_in_editor("hello", False, False)) == 4
+    assert len(search_widget._find_all_in_editor("Hello", False, True)) == 2
+    # Matches do not overlap, like regex Find All and Replace All
+    editor.setPlainText("aaaa")
+    assert [m[0] for m in search_widget._find_all_in_editor("aa", False, True)] == [0, 2]
+    editor.setPlainText("Hello World\nHello Python\nhello javascript\nHELLO RUST")
+    matches = search_widget._find_all_in_editor(r"h\w+o", True, False)
+    assert [m[0] for m in matches] == [0, 12, 25, 42]
+
+
+
+def test_risky_find_all_runs_on_the_search_pool():
+    app = QApplication.instance() or QApplication(sys.argv)
+    editor = CodeEditor()
+    editor.setPlainText("aab ab b aaab")
+    search_widget = SearchReplaceWidget(editor=editor)
+
+    search_widget.search_input.setText("(a+)+b")
+    search_widget.regex_checkbox.setChecked(True)
+    search_widget.find_all()
+
+    pool = _get_search_pool()
+    assert pool is not QThreadPool.globalInstance() and pool.maxThreadCount() == 1
+    assert search_widget.match_count_label.text() == "Matches: searching..."
+    pool.waitForDone()
+    app.processEvents()
+    assert search_widget.match_count_label.text() == "Matches: 3"
+
+
+def test_ci_literal_replace_is_literal_and_counts():
+    assert _ci_literal_replace("Hello hello HELLO x", "hello", "Hi") == ("Hi Hi Hi x", 3)
+    # Replacement text is not interpreted as a regex template
+    assert _ci_literal_replace("a.b A.B", "a.b", r"\1") == (r"\1 \1", 2)
+    assert _ci_literal_replace("nothing here", "zzz", "y") == ("nothing here", 0)
+
+
 if __name__ == "__main__":
     test_search_replace()
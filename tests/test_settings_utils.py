@@ -0,0 +1,19 @@
+"""Tests for reading lists back from QSettings."""
+
+from PySide6.QtCore import QSettings
+
+from gui.settings_utils import settings_list
+
+
+def test_settings_list_normalizes_ini_round_trips(tmp_path):
+    settings = QSettings(str(tmp_path / "test.ini"), QSettings.IniFormat)
+    settings.setValue("many", ["/a", "/b"])
+    settings.setValue("one", ["/a"])
+    settings.setValue("none", [])
+    settings.sync()
+
+    reread = QSettings(str(tmp_path / "test.ini"), QSettings.IniFormat)
+    assert settings_list(reread, "many") == ["/a", "/b"]
+    assert settings_list(reread, "one") == ["/a"]
+    assert settings_list(reread, "none") == []
+    assert settings_list(reread, "missing") == []
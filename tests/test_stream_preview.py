@@ -0,0 +1,47 @@
+"""Tests for the incremental streaming preview in the chat widget."""
+
+from gui.chat import StreamPreview
+
+
+def _feed_all(chunks):
+    preview = StreamPreview()
+    for chunk in chunks:
+        preview.feed(chunk)
+    return preview
+
+
+def test_plain_text_is_escaped():
+    preview = _feed_all(["Hello ", "<world>"])
+    assert "Hello &lt;world&gt;" in preview.render()
+    assert preview.text() == "Hello <world>"
+
+
+def test_update_block_content_is_hidden():
+    text = "Before\n:::UPDATE notes.md:::\nsecret body\n:::END:::\nAfter"
+    preview = _feed_all([text])
+    rendered = preview.render()
+    assert "secret body" not in rendered
+    assert "[Edit for notes.md]" in rendered
+    assert "Before" in rendered and "After" in rendered
+
+
+def test_markers_split_across_chunks():
+    text = "Intro :::UPDATE a/b.md:::\nline one\nline two\n:::END::: done"
+    for size in (1, 2, 3, 7):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        preview = StreamPreview()
+        for chunk in chunks:
+            preview.feed(chunk)
+            rendered = preview.render()  # redraw after every chunk
+            assert "line one" not in rendered
+            assert ":::UPDA" not in rendered
+        assert "[Edit for a/b.md]" in rendered
+        assert rendered.endswith(" done</div>")
+        assert preview.text() == text
+
+
+def test_open_block_shows_progress():
+    preview = _feed_all(["Here:\n:::UPDATE ch1.md:::\nOnce upon"])
+    rendered = preview.render()
+    assert "[Writing ch1.md…]" in rendered
+    assert "Once upon" not in rendered
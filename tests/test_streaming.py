@@ -1,6 +1,7 @@
 """Test streaming responses - verifies supports_streaming flag and implementation."""
 
 from core.llm import OllamaProvider, LMStudioProvider, LMStudioNativeProvider
+from core.llm.base import LLMProvider
 
 
 def test_supports_streaming_flags():
@@ -12,7 +13,7 @@ def test_supports_streaming_flags():
     lm_studio_native = LMStudioNativeProvider()
     
     print(f"  OllamaProvider.supports_streaming = {ollama.supports_streaming}")
-    assert ollama.supports_streaming == False, "Ollama should be False initially"
+    assert ollama.supports_streaming == True, "Ollama should stream via chat(stream=True)"
     
     print(f"  LMStudioProvider.supports_streaming = {lm_studio_openai.supports_streaming}")
     assert lm_studio_openai.supports_streaming == False, "LM Studio OpenAI should be False initially"
@@ -23,10 +24,15 @@ def test_supports_streaming_flags():
     print("✓ All flags set correctly\n")
 
 
+class _NonStreamingProvider(LLMProvider):
+    def chat(self, messages, model=None):
+        return "hello"
+
+
 def test_fallback_streaming():
     """Test that non-streaming providers fallback to regular chat_stream()."""
-    print("Testing fallback streaming (Ollama)...")
-    provider = OllamaProvider()
+    print("Testing fallback streaming (base provider)...")
+    provider = _NonStreamingProvider()
     messages = [{"role": "user", "content": "Say 'hello'"}]
     
     chunks = list(provider.chat_stream(messages))
@@ -36,6 +42,29 @@ def test_fallback_streaming():
     print("✓ Fallback streaming works\n")
 
 
+def test_ollama_streaming_yields_fragments():
+    """Ollama chat_stream() yields each streamed message fragment."""
+    class FakeClient:
+        def chat(self, model, messages, stream=False):
+            assert stream is True
+            return iter([
+                {"message": {"content": "Hel"}},
+                {"message": {"content": ""}},
+                {"message": {"content": "lo"}},
+            ])
+
+    provider = OllamaProvider()
+    fake = FakeClient()
+    fake._client = provider.client._client
+    provider.client = fake
+    events = []
+
+    chunks = list(provider.chat_stream([{"role": "user", "content": "hi"}], progress_callback=events.append))
+
+    assert chunks == ["Hel", "lo"]
+    assert [e["phase"] for e in events] == ["connecting", "receiving", "complete"]
+
+
 def test_native_sdk_streaming():
     """Test real streaming from LM Studio Native SDK."""
     print("Testing real streaming (LM Studio Native)...")
@@ -0,0 +1,42 @@
+"""Unit tests for workflow_manager module.
+
+Tests placeholder extraction and its per-workflow cache.
+"""
+
+import json
+
+import pytest
+
+from core.workflow_manager import WorkflowManager
+
+
+class TestWorkflowManager:
+    """Tests for WorkflowManager class."""
+
+    @pytest.fixture
+    def assets_dir(self, tmp_path):
+        """Create an assets folder with a single API-format workflow."""
+        workflows = tmp_path / "workflows"
+        workflows.mkdir()
+        workflow = {"1": {"inputs": {"text": "%PROMPT%", "seed": "%SEED%", "neg": "%PROMPT%"}}}
+        (workflows / "basic.json").write_text(json.dumps(workflow))
+        return str(tmp_path)
+
+    def test_get_placeholders_sorted_unique(self, assets_dir):
+        manager = WorkflowManager(assets_dir)
+        assert manager.get_placeholders("basic") == ["PROMPT", "SEED"]
+        assert manager.get_placeholders("missing") == []
+
+    def test_get_placeholders_cached_until_reload(self, assets_dir):
+        manager = WorkflowManager(assets_dir)
+        first = manager.get_placeholders("basic")
+        first.append("MUTATED")
+        # Callers get a copy, so the cached list is untouched
+        assert manager.get_placeholders("basic") == ["PROMPT", "SEED"]
+
+        manager.workflows["basic"] = {"1": {"inputs": {"w": "%WIDTH%"}}}
+        assert manager.get_placeholders("basic") == ["PROMPT", "SEED"]
+
+        manager.reload_workflows()
+        assert manager.get_placeholders("basic") == ["PROMPT", "SEED"]
+        assert "basic" in manager._placeholder_cache